@@ -13,6 +13,9 @@ from investing.models.base import Base
 from investing.models.portfolio import Portfolio
 from investing.models.holding import Holding
 from investing.models.transaction import Transaction
+from investing.models.etf_universe import EtfUniverse
+from investing.models.price_history import PriceBar
+from investing.models.portfolio_valuation import PortfolioValuation
 # from investing.models.user import User  <-- Uncomment if you created a User model
 
 def init_db():
@@ -1,17 +1,13 @@
 from fastapi import Depends
-from sqlalchemy.orm import Session
-from investing.models.base import get_session
-from investing.services.market_data import AlphaVantageClient, CachedMarketDataService
+from investing.models.base import get_async_session
+from investing.services.market_data import AlphaVantageClient, AsyncAlphaVantageClient, CachedMarketDataService
 from investing.services.allocation_engine import AllocationEngine
 import os
 
-# 1. Database Dependency
-def get_db():
-    session = get_session()
-    try:
+# 1. Database Dependency (AsyncSession; sync engine code can use session.run_sync)
+async def get_db():
+    async with get_async_session() as session:
         yield session
-    finally:
-        session.close()
 
 # 2. Market Data Service (Singleton-ish)
 _market_service = None
@@ -22,7 +18,8 @@ def get_market_service():
         api_key = os.getenv("ALPHA_VANTAGE_API_KEY", "demo")
         redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
         client = AlphaVantageClient(api_key=api_key)
-        _market_service = CachedMarketDataService(client, redis_url)
+        async_client = AsyncAlphaVantageClient(api_key=api_key)
+        _market_service = CachedMarketDataService(client, redis_url, async_client=async_client)
     return _market_service
 
 # 3. Allocation Engine (New Singleton)
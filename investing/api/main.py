@@ -1,12 +1,30 @@
-from fastapi import FastAPI, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from datetime import datetime
+from uuid import UUID
+import base64
+import csv
+import io
+import json
+from typing import AsyncIterator, Dict, List, Literal, Optional, Tuple
 
 from investing.api import schemas
 from investing.api.dependencies import get_db, get_market_service, get_allocation_engine
 from investing.services.market_data import CachedMarketDataService, TickerNotFound, APIError
-from investing.services.allocation_engine import AllocationEngine
+from investing.services.allocation_engine import AllocationEngine, ETFAllocation
+from investing.services.rate_limiter import get_rate_limiter
+from investing.models.base import get_pool_metrics
+from investing.repositories.portfolio_repository import PortfolioRepository
+from investing.repositories.valuation_repository import PortfolioValuationRepository
+from investing.config import (
+    RECOMMEND_BATCH_STREAM_THRESHOLD,
+    TRANSACTIONS_PAGE_MAX,
+    TRANSACTIONS_EXPORT_BATCH_SIZE,
+)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 app = FastAPI(
     title="WealthWise Investing Service",
@@ -15,33 +33,40 @@ app = FastAPI(
 )
 
 @app.get("/health", response_model=schemas.HealthResponse)
-def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     db_status = "unknown"
     try:
         # Simple check
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         db_status = "connected"
     except Exception as e:
         db_status = f"disconnected: {str(e)}"
 
     status_code = "healthy" if db_status == "connected" else "degraded"
+    tokens = await get_rate_limiter().remaining_tokens_async()
+    pool = get_pool_metrics().get("async", {})
     
     return schemas.HealthResponse(
         status=status_code,
         timestamp=datetime.utcnow(),
         services={
             "database": db_status,
+            "alpha_vantage_tokens": f"{tokens:.2f}",
+            "db_pool_in_use": str(pool.get("in_use", 0)),
+            "db_pool_peak_in_use": str(pool.get("peak_in_use", 0)),
+            "db_pool_wait_avg_ms": f"{pool.get('avg_wait_ms', 0.0):.2f}",
+            "db_pool_wait_max_ms": f"{pool.get('max_wait_ms', 0.0):.2f}",
             "version": "0.2.0"
         }
     )
 
 @app.get("/market/price/{ticker}", response_model=schemas.PriceResponse)
-def get_price(
+async def get_price(
     ticker: str,
     service: CachedMarketDataService = Depends(get_market_service)
 ):
     try:
-        price = service.get_price(ticker)
+        price = await service.get_price_async(ticker)
         return schemas.PriceResponse(
             ticker=ticker.upper(),
             price=price,
@@ -60,9 +85,9 @@ def get_price(
         )
 
 @app.post("/portfolio/recommend", response_model=schemas.PortfolioRecommendation)
-def recommend_portfolio(
+async def recommend_portfolio(
     request: schemas.RecommendRequest,
-    db: Session = Depends(get_db),  # <--- NEW: We need DB access here
+    db: AsyncSession = Depends(get_db),  # <--- NEW: We need DB access here
     engine: AllocationEngine = Depends(get_allocation_engine),
     market: CachedMarketDataService = Depends(get_market_service)
 ):
@@ -73,7 +98,7 @@ def recommend_portfolio(
     try:
         # 1. Get Target Weights (The "Brain")
         # CRITICAL FIX: We pass 'db' so the engine can check Momentum Scores
-        allocations = engine.recommend_portfolio(
+        allocations = await engine.recommend_portfolio_async(
             request.balance, 
             request.risk_profile,
             db=db 
@@ -82,30 +107,203 @@ def recommend_portfolio(
         raise HTTPException(status_code=400, detail=str(e))
 
     # 2. Enrich with Real-Time Prices (The "Market")
+    # One batched lookup: cache hits in a single round trip, misses fetched concurrently
+    tickers = [alloc.ticker for alloc in allocations]
+    try:
+        prices = await market.get_prices_async(tickers)
+    except (TickerNotFound, APIError) as e:
+        raise _pricing_failed(e, tickers)
+
+    return _build_recommendation(request, allocations, prices, datetime.utcnow())
+
+@app.post("/portfolio/recommend/batch", response_model=schemas.BatchRecommendation)
+async def recommend_portfolio_batch(
+    batch: schemas.BatchRecommendRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+    engine: AllocationEngine = Depends(get_allocation_engine),
+    market: CachedMarketDataService = Depends(get_market_service)
+):
+    """
+    Allocations for many (balance, risk_profile) pairs in one call.
+    The momentum winner and every ticker price are resolved once per batch.
+    Large batches (or Accept: application/x-ndjson) are streamed one JSON object per line.
+    Batches over RECOMMEND_BATCH_MAX_ITEMS are rejected by schema validation (422).
+    """
+    try:
+        allocation_sets = await engine.recommend_portfolios_async(
+            [(r.balance, r.risk_profile) for r in batch.requests],
+            db=db
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    tickers = list(dict.fromkeys(a.ticker for allocs in allocation_sets for a in allocs))
+    try:
+        prices = await market.get_prices_async(tickers)
+    except (TickerNotFound, APIError) as e:
+        raise _pricing_failed(e, tickers)
+
+    timestamp = datetime.utcnow()
+    results = (
+        _build_recommendation(request, allocations, prices, timestamp)
+        for request, allocations in zip(batch.requests, allocation_sets)
+    )
+
+    wants_ndjson = NDJSON_MEDIA_TYPE in http_request.headers.get("accept", "")
+    if wants_ndjson or len(batch.requests) > RECOMMEND_BATCH_STREAM_THRESHOLD:
+        return StreamingResponse(
+            (rec.model_dump_json() + "\n" for rec in results),
+            media_type=NDJSON_MEDIA_TYPE
+        )
+
+    return schemas.BatchRecommendation(timestamp=timestamp, results=list(results))
+
+def _pricing_failed(e: Exception, tickers: List[str]) -> HTTPException:
+    """503 naming the asset that could not be priced (the service tags errors with their ticker)."""
+    ticker = getattr(e, "ticker", None) or (tickers[0] if len(tickers) == 1 else None)
+    asset = f"asset {ticker}" if ticker else "assets"
+    return HTTPException(status_code=503, detail=f"Unable to price {asset}: {str(e)}")
+
+def _build_recommendation(
+    request: schemas.RecommendRequest,
+    allocations: List[ETFAllocation],
+    prices: Dict[str, float],
+    timestamp: datetime
+) -> schemas.PortfolioRecommendation:
+    """Prices target weights for one balance."""
     result_allocations = []
     
     for alloc in allocations:
-        try:
-            current_price = market.get_price(alloc.ticker)
-        except (TickerNotFound, APIError) as e:
-            raise HTTPException(
-                status_code=503, 
-                detail=f"Unable to price asset {alloc.ticker}: {str(e)}"
-            )
-        
         # Calculate dollar amount
         dollar_amount = request.balance * alloc.weight
 
         result_allocations.append(schemas.ETFRecommendation(
             ticker=alloc.ticker,
             weight=alloc.weight,
-            current_price=current_price,
+            current_price=prices[alloc.ticker],
             allocation_amount=round(dollar_amount, 2)
         ))
 
     return schemas.PortfolioRecommendation(
         risk_profile=request.risk_profile,
         total_balance=request.balance,
-        timestamp=datetime.utcnow(),
+        timestamp=timestamp,
         allocations=result_allocations
     )
+
+
+# --- Transaction History ---
+
+def _encode_cursor(key: Tuple[datetime, UUID]) -> str:
+    transaction_date, transaction_id = key
+    raw = f"{transaction_date.isoformat()}|{transaction_id.hex}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        transaction_date, transaction_id = raw.split("|")
+        return datetime.fromisoformat(transaction_date), UUID(transaction_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _transaction_record(row) -> dict:
+    return schemas.TransactionOut(
+        id=row.id,
+        transaction_date=row.transaction_date,
+        transaction_type=row.transaction_type.value,
+        ticker=row.ticker,
+        shares=row.shares,
+        price_per_share=row.price_per_share,
+        total_amount=row.total_amount
+    ).model_dump(mode="json")
+
+@app.get("/portfolio/{portfolio_id}/transactions", response_model=schemas.TransactionPage)
+async def list_transactions(
+    portfolio_id: UUID,
+    limit: int = Query(50, ge=1, le=TRANSACTIONS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    A portfolio's transactions, newest first.
+    Keyset pagination: follow next_cursor until it is null.
+    """
+    after = _decode_cursor(cursor) if cursor else None
+
+    def read_page(session):
+        repo = PortfolioRepository(session)
+        if repo.get_by_id(portfolio_id) is None:
+            return None
+        return repo.get_transactions_page(portfolio_id, limit=limit, after=after)
+
+    page = await db.run_sync(read_page)
+    if page is None:
+        raise HTTPException(status_code=404, detail=f"Portfolio {portfolio_id} not found")
+
+    rows, next_key = page
+    return schemas.TransactionPage(
+        items=[_transaction_record(row) for row in rows],
+        next_cursor=_encode_cursor(next_key) if next_key else None
+    )
+
+@app.get("/portfolio/{portfolio_id}/transactions/export")
+async def export_transactions(
+    portfolio_id: UUID,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full history as NDJSON or CSV, streamed from a server-side cursor.
+    Memory stays at one fetch batch no matter how many rows the portfolio has.
+    """
+    exists = await db.run_sync(lambda session: PortfolioRepository(session).get_by_id(portfolio_id))
+    if exists is None:
+        raise HTTPException(status_code=404, detail=f"Portfolio {portfolio_id} not found")
+
+    # The stream outlives this handler, so it reads through its own session on the same engine
+    bind = db.bind
+    stmt = PortfolioRepository.transactions_query(portfolio_id, columns=PortfolioRepository.EXPORT_COLUMNS)
+    fields = list(schemas.TransactionOut.model_fields)
+
+    async def stream() -> AsyncIterator[str]:
+        if format == "csv":
+            yield ",".join(fields) + "\n"
+        async with AsyncSession(bind=bind) as session:
+            result = await session.stream(stmt.execution_options(yield_per=TRANSACTIONS_EXPORT_BATCH_SIZE))
+            async for partition in result.partitions():
+                records = [_transaction_record(row) for row in partition]
+                if format == "csv":
+                    buffer = io.StringIO()
+                    csv.DictWriter(buffer, fieldnames=fields, lineterminator="\n").writerows(records)
+                    yield buffer.getvalue()
+                else:
+                    yield "".join(json.dumps(record) + "\n" for record in records)
+
+    if format == "csv":
+        return StreamingResponse(
+            stream(),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="transactions_{portfolio_id}.csv"'}
+        )
+    return StreamingResponse(stream(), media_type=NDJSON_MEDIA_TYPE)
+
+
+# --- Valuation ---
+
+@app.get("/portfolio/{portfolio_id}/valuation", response_model=schemas.PortfolioValuationOut)
+async def get_portfolio_valuation(portfolio_id: UUID, db: AsyncSession = Depends(get_db)):
+    """
+    Total value, unrealized P&L and drift from the portfolio_valuations snapshot
+    (one primary-key read). Snapshots are written when a portfolio is created or
+    traded; one that predates the table is computed here without being stored.
+    """
+    def read_valuation(session):
+        valuations = PortfolioValuationRepository(session)
+        return valuations.get(portfolio_id) or valuations.compute(portfolio_id)
+
+    valuation = await db.run_sync(read_valuation)
+    if valuation is None:
+        raise HTTPException(status_code=404, detail=f"Portfolio {portfolio_id} not found")
+    return schemas.PortfolioValuationOut.model_validate(valuation, from_attributes=True)
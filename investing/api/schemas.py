@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 from typing import Dict, List, Optional, Literal
+from uuid import UUID
+from investing.config import RECOMMEND_BATCH_MAX_ITEMS
 
 # --- Existing Response Models ---
 class HealthResponse(BaseModel):
@@ -39,4 +41,48 @@ class PortfolioRecommendation(BaseModel):
     risk_profile: str
     total_balance: float
     timestamp: datetime
-    allocations: List[ETFRecommendation]
\ No newline at end of file
+    allocations: List[ETFRecommendation]
+
+# --- Batch Recommendations ---
+
+class BatchRecommendRequest(BaseModel):
+    # Capped here so an oversized batch fails validation before its items are validated
+    requests: List[RecommendRequest] = Field(
+        ..., min_length=1, max_length=RECOMMEND_BATCH_MAX_ITEMS, description="(balance, risk_profile) pairs"
+    )
+
+class BatchRecommendation(BaseModel):
+    timestamp: datetime
+    results: List[PortfolioRecommendation]
+
+
+# --- Transaction History ---
+
+class TransactionOut(BaseModel):
+    id: UUID
+    transaction_date: datetime
+    transaction_type: str
+    ticker: Optional[str] = None
+    shares: Optional[float] = None
+    price_per_share: Optional[float] = None
+    total_amount: float
+
+class TransactionPage(BaseModel):
+    items: List[TransactionOut]
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= to get the next (older) page")
+
+
+# --- Valuation ---
+
+class PortfolioValuationOut(BaseModel):
+    portfolio_id: UUID
+    cash_balance: float
+    market_value: float
+    cost_basis: float
+    total_value: float
+    unrealized_pnl: float
+    drift: Optional[float] = Field(
+        None, description="0 = on target weights for the risk profile, 1 = fully off target; null if the profile has no targets"
+    )
+    unpriced_positions: int = Field(..., description="Holdings with no market price, valued at cost")
+    valued_at: datetime
@@ -20,6 +20,14 @@ DATABASE_URL = os.getenv(
     "postgresql://wld@localhost:5432/wealthwise_investing"
 )
 
+# Connection pool (Postgres). SQLite dev/test databases use WAL or a StaticPool instead.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))  # 0 disables
+
 # Application Settings
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 DEBUG = ENVIRONMENT == "development"
@@ -33,6 +41,26 @@ API_PORT = int(os.getenv("API_PORT", "8001"))
 CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "300"))  # 5 minutes
 RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "5"))
 
+# In-process (L1) price cache in front of Redis. TTL must stay below CACHE_TTL_SECONDS.
+L1_CACHE_TTL_SECONDS = float(os.getenv("L1_CACHE_TTL_SECONDS", "60"))
+L1_CACHE_MAX_ENTRIES = int(os.getenv("L1_CACHE_MAX_ENTRIES", "256"))
+
+# How long AllocationEngine trusts its in-memory ETF universe before re-checking the watermark
+UNIVERSE_SNAPSHOT_TTL_SECONDS = float(os.getenv("UNIVERSE_SNAPSHOT_TTL_SECONDS", "60"))
+
+# Harvester concurrency (throughput is bounded by RATE_LIMIT_PER_MINUTE, not by workers)
+HARVEST_MAX_WORKERS = int(os.getenv("HARVEST_MAX_WORKERS", "4"))
+HARVEST_TICKER_TIMEOUT_SECONDS = float(os.getenv("HARVEST_TICKER_TIMEOUT_SECONDS", "120"))
+HARVEST_MAX_ATTEMPTS = int(os.getenv("HARVEST_MAX_ATTEMPTS", "3"))
+
+# /portfolio/recommend/batch: hard cap per call, and size above which the response is streamed as NDJSON
+RECOMMEND_BATCH_MAX_ITEMS = int(os.getenv("RECOMMEND_BATCH_MAX_ITEMS", "10000"))
+RECOMMEND_BATCH_STREAM_THRESHOLD = int(os.getenv("RECOMMEND_BATCH_STREAM_THRESHOLD", "500"))
+
+# Transaction history: largest page size, and rows per server-side cursor fetch when exporting
+TRANSACTIONS_PAGE_MAX = int(os.getenv("TRANSACTIONS_PAGE_MAX", "500"))
+TRANSACTIONS_EXPORT_BATCH_SIZE = int(os.getenv("TRANSACTIONS_EXPORT_BATCH_SIZE", "1000"))
+
 
 def validate_config() -> bool:
     """Validate that required configuration is present.
@@ -80,9 +80,43 @@ CREATE TABLE IF NOT EXISTS transactions (
     timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- PRICE HISTORY (Local copy of daily closes, filled incrementally by the harvester)
+CREATE TABLE IF NOT EXISTS price_history (
+    ticker VARCHAR(10) NOT NULL,
+    date DATE NOT NULL,
+    close DOUBLE PRECISION NOT NULL,
+    
+    -- The PK doubles as the (ticker, date) range index
+    PRIMARY KEY (ticker, date)
+);
+
+-- PORTFOLIO VALUATIONS (Materialized read model, refreshed on trades and price updates)
+CREATE TABLE IF NOT EXISTS portfolio_valuations (
+    portfolio_id UUID PRIMARY KEY REFERENCES portfolios(id) ON DELETE CASCADE,
+    
+    cash_balance DECIMAL(12, 2) NOT NULL,
+    market_value DECIMAL(14, 2) NOT NULL,
+    cost_basis DECIMAL(14, 2) NOT NULL,
+    total_value DECIMAL(14, 2) NOT NULL,
+    unrealized_pnl DECIMAL(14, 2) NOT NULL,
+    
+    -- Distance from the risk profile's target weights (0 = on target; NULL = profile has no targets)
+    drift DOUBLE PRECISION
+        CHECK (drift >= 0 AND drift <= 1),
+    
+    -- Holdings without a market price (valued at cost)
+    unpriced_positions INTEGER NOT NULL DEFAULT 0,
+    
+    valued_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- 4. INDEXES
 CREATE INDEX IF NOT EXISTS idx_portfolios_user_id ON portfolios(user_id);
 CREATE INDEX IF NOT EXISTS idx_holdings_portfolio_id ON holdings(portfolio_id);
+-- Price updates: find every portfolio holding a ticker
+CREATE INDEX IF NOT EXISTS idx_holdings_ticker ON holdings(ticker);
 CREATE INDEX IF NOT EXISTS idx_transactions_portfolio_id ON transactions(portfolio_id);
 -- Speed up "Get my latest trades"
 CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions(timestamp DESC);
+-- Keyset pagination / export of one portfolio's history: seek on (timestamp, id)
+CREATE INDEX IF NOT EXISTS idx_transactions_portfolio_timestamp_id ON transactions(portfolio_id, timestamp DESC, id DESC);
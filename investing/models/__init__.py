@@ -5,6 +5,8 @@ from investing.models.portfolio import Portfolio
 from investing.models.holding import Holding
 from investing.models.transaction import Transaction, TransactionType
 from investing.models.etf_universe import EtfUniverse
+from investing.models.price_history import PriceBar
+from investing.models.portfolio_valuation import PortfolioValuation
 
 __all__ = [
     "Base",
@@ -16,4 +18,6 @@ __all__ = [
     "Transaction",
     "TransactionType",
     "EtfUniverse",
+    "PriceBar",
+    "PortfolioValuation",
 ]
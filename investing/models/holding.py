@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import String, Numeric, ForeignKey, UniqueConstraint
+from sqlalchemy import String, Numeric, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from investing.models.base import Base, GUID
 
@@ -16,4 +16,6 @@ class Holding(Base):
 
     __table_args__ = (
         UniqueConstraint('portfolio_id', 'ticker', name='uq_portfolio_ticker'),
+        # Price updates fan out to every portfolio holding the ticker
+        Index('ix_holdings_ticker', 'ticker'),
     )
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""Connection pool configuration and metrics for get_engine / get_async_engine."""
+import threading
+import time
+from typing import Any, Dict
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from investing.config import (
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_TIMEOUT_MS,
+)
+
+
+class PoolMetrics:
+    """Checkout wait time and in-use connection counts for one engine's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "avg_wait_ms": 1000 * self.total_wait_seconds / self.checkouts if self.checkouts else 0.0,
+                "max_wait_ms": 1000 * self.max_wait_seconds,
+            }
+
+
+class _CheckoutTimer:
+    """Times how long callers block in the pool before getting a connection."""
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_CheckoutTimer, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_CheckoutTimer, AsyncAdaptedQueuePool):
+    pass
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(database_url: str, is_async: bool = False) -> Dict[str, Any]:
+    """create_engine / create_async_engine keyword arguments for a database URL."""
+    url = make_url(database_url)
+
+    if _is_memory_sqlite(url):
+        # One shared connection, or every checkout would see a different empty DB
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+
+    options: Dict[str, Any] = {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+    if url.get_backend_name() == "postgresql" and DB_STATEMENT_TIMEOUT_MS > 0:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+
+    return options
+
+
+def _enable_sqlite_wal(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the harvester's writes; busy_timeout waits out short locks
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def instrument_engine(engine: Engine) -> PoolMetrics:
+    """Attaches pool metrics (and WAL for file-backed SQLite). Pass engine.sync_engine for async engines."""
+    metrics = PoolMetrics()
+    if isinstance(engine.pool, _CheckoutTimer):
+        engine.pool.metrics = metrics
+    event.listen(engine, "checkout", metrics.on_checkout)
+    event.listen(engine, "checkin", metrics.on_checkin)
+
+    if engine.url.get_backend_name() == "sqlite" and not _is_memory_sqlite(engine.url):
+        event.listen(engine, "connect", _enable_sqlite_wal)
+
+    return metrics
@@ -0,0 +1,33 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Integer, Numeric, Float, ForeignKey, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from investing.models.base import Base, GUID
+
+class PortfolioValuation(Base):
+    """
+    Materialized valuation of one portfolio (read model).
+    Kept current by PortfolioValuationRepository whenever holdings, cash
+    or ETF prices change, so reads are a single primary-key lookup.
+    """
+    __tablename__ = "portfolio_valuations"
+
+    portfolio_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("portfolios.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    cash_balance: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
+    market_value: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False)
+    cost_basis: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False)
+    total_value: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False)
+    unrealized_pnl: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False)
+
+    # Total variation distance from the risk profile's target weights (0 = on target, 1 = nothing in common).
+    # NULL when the risk profile has no target allocation.
+    drift: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    # Holdings with no known market price (valued at cost)
+    unpriced_positions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    valued_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,15 @@
+from datetime import date
+from sqlalchemy import String, Float, Date
+from sqlalchemy.orm import Mapped, mapped_column
+from investing.models.base import Base
+
+class PriceBar(Base):
+    """
+    One daily closing price per ticker.
+    Local copy of the Alpha Vantage daily series so harvests only fetch new bars.
+    """
+    __tablename__ = "price_history"
+
+    ticker: Mapped[str] = mapped_column(String(10), primary_key=True)
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    close: Mapped[float] = mapped_column(Float, nullable=False)
@@ -1,7 +1,7 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import String, Numeric, ForeignKey, Enum, DateTime
+from sqlalchemy import String, Numeric, ForeignKey, Enum, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from investing.models.base import Base, GUID
 
@@ -24,4 +24,9 @@ class Transaction(Base):
     transaction_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    portfolio = relationship("Portfolio")
\ No newline at end of file
+    portfolio = relationship("Portfolio")
+
+    __table_args__ = (
+        # Keyset pagination: newest-first seek on (transaction_date, id) per portfolio
+        Index("ix_transactions_portfolio_date_id", "portfolio_id", "transaction_date", "id"),
+    )
\ No newline at end of file
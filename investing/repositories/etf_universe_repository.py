@@ -0,0 +1,63 @@
+from typing import List, Dict
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from investing.models.etf_universe import EtfUniverse
+
+class EtfUniverseRepository:
+    """
+    Data Access Object for the ETF universe (daily momentum scores).
+    """
+
+    # Keeps a multi-row VALUES statement well under SQLite's bound-parameter limit
+    UPSERT_CHUNK_SIZE = 500
+
+    _INSERT_BY_DIALECT = {
+        "postgresql": postgresql.insert,
+        "sqlite": sqlite.insert,
+    }
+
+    def __init__(self, session: Session):
+        self._session = session
+
+    def bulk_upsert(self, rows: List[Dict]) -> int:
+        """
+        Writes all rows with INSERT ... ON CONFLICT (ticker) DO UPDATE.
+        Rows need: ticker, sector, momentum_score, volatility, last_price.
+        An existing row keeps its sector; scores, price and last_analyzed are refreshed.
+        """
+        if not rows:
+            return 0
+
+        dialect = self._session.get_bind().dialect.name
+        insert = self._INSERT_BY_DIALECT.get(dialect)
+        if insert is None:
+            # Portable fallback (one merge per row) for dialects without ON CONFLICT
+            for row in rows:
+                existing = self._session.get(EtfUniverse, row["ticker"])
+                if existing:
+                    existing.momentum_score = row["momentum_score"]
+                    existing.volatility = row["volatility"]
+                    existing.last_price = row["last_price"]
+                else:
+                    self._session.add(EtfUniverse(**row))
+            self._session.flush()
+            return len(rows)
+
+        for start in range(0, len(rows), self.UPSERT_CHUNK_SIZE):
+            stmt = insert(EtfUniverse).values(rows[start:start + self.UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[EtfUniverse.ticker],
+                set_={
+                    "momentum_score": stmt.excluded.momentum_score,
+                    "volatility": stmt.excluded.volatility,
+                    "last_price": stmt.excluded.last_price,
+                    # onupdate= is not applied to ON CONFLICT updates
+                    "last_analyzed": func.now(),
+                }
+            )
+            self._session.execute(stmt)
+
+        # Bulk statements bypass the identity map; drop stale cached instances
+        self._session.expire_all()
+        return len(rows)
@@ -1,11 +1,84 @@
-from typing import Optional, List
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Optional, List, Tuple
 from uuid import UUID
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete, bindparam, column, literal, tuple_, values, Numeric, Select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from investing.models.base import GUID
 from investing.models.portfolio import Portfolio
 from investing.models.holding import Holding
 from investing.models.transaction import Transaction, TransactionType
+from investing.repositories.valuation_repository import PortfolioValuationRepository
+
+@dataclass(frozen=True)
+class TradeLeg:
+    """One ticker of a multi-leg order (e.g. a rebalance)."""
+    ticker: str
+    side: TransactionType
+    shares: float
+    price: float
+
+
+@dataclass(frozen=True)
+class BulkOrder:
+    """One order in a cross-portfolio batch (e.g. the scheduled deposit sweep)."""
+    portfolio_id: UUID
+    ticker: str
+    side: TransactionType
+    shares: float
+    price: float
+
+
+@dataclass
+class OrderResult:
+    order: BulkOrder
+    status: str  # "filled" | "rejected"
+    error: Optional[str] = None
+
+    @property
+    def filled(self) -> bool:
+        return self.status == "filled"
+
+
+def _validate_leg(side: TransactionType, shares: float, price: float):
+    if side not in (TransactionType.BUY, TransactionType.SELL):
+        raise ValueError(f"Unsupported trade side: {side}")
+    if shares <= 0:
+        raise ValueError("Shares must be positive")
+    if price < 0:
+        raise ValueError("Price cannot be negative")
+
+
+def _apply_leg(
+    balance: float,
+    position: Tuple[float, float],
+    side: TransactionType,
+    shares: float,
+    price: float
+) -> Tuple[float, Tuple[float, float]]:
+    """
+    Trade math on plain numbers: (balance, (shares, avg_cost)) after one leg.
+    Raises ValueError on insufficient funds/shares.
+    """
+    total_cost = float(shares) * float(price)
+    current_shares, current_avg_cost = position
+
+    if side == TransactionType.BUY:
+        if balance < total_cost:
+            raise ValueError(f"Insufficient funds: Balance ${balance}, Cost ${total_cost}")
+        # Calculate Weighted Average Cost
+        new_shares = current_shares + float(shares)
+        new_avg_cost = (current_shares * current_avg_cost + total_cost) / new_shares
+        return balance - total_cost, (new_shares, new_avg_cost)
+
+    if current_shares < shares:
+        raise ValueError(f"Insufficient shares: Owned {current_shares}, Selling {shares}")
+    # Selling does NOT change average cost per share
+    return balance + total_cost, (current_shares - float(shares), current_avg_cost)
+
 
 class PortfolioRepository:
     """
@@ -13,13 +86,22 @@ class PortfolioRepository:
     Handles ACID transactions for trading.
     """
 
+    # Rows per set-based statement in execute_bulk_orders (bound-parameter limits)
+    BULK_CHUNK_SIZE = 500
+
+    _INSERT_BY_DIALECT = {
+        "postgresql": postgresql.insert,
+        "sqlite": sqlite.insert,
+    }
+
     def __init__(self, session: Session):
         self._session = session
+        self._valuations = PortfolioValuationRepository(session)
 
     # --- PORTFOLIO OPERATIONS ---
 
     def create_portfolio(self, user_id: UUID, risk_profile: str) -> Portfolio:
-        """Creates a new portfolio."""
+        """Creates a new portfolio (and its first valuation snapshot)."""
         portfolio = Portfolio(
             user_id=user_id,
             risk_profile=risk_profile,
@@ -28,6 +110,7 @@ class PortfolioRepository:
         )
         self._session.add(portfolio)
         self._session.flush()
+        self._valuations.refresh([portfolio.id])
         return portfolio
 
     def get_by_user_id(self, user_id: UUID) -> Optional[Portfolio]:
@@ -48,6 +131,7 @@ class PortfolioRepository:
             
         portfolio.cash_balance = new_balance
         self._session.flush()
+        self._valuations.refresh([portfolio_id])
         return portfolio
 
     # --- HOLDING OPERATIONS ---
@@ -77,8 +161,58 @@ class PortfolioRepository:
             self._session.add(holding)
         
         self._session.flush()
+        self._valuations.refresh([portfolio_id])
         return holding
 
+    # --- TRANSACTION HISTORY (keyset pagination on ix_transactions_portfolio_date_id) ---
+
+    # Columns of the /transactions/export stream (plain rows, no ORM identity map)
+    EXPORT_COLUMNS = (
+        Transaction.id,
+        Transaction.transaction_date,
+        Transaction.transaction_type,
+        Transaction.ticker,
+        Transaction.shares,
+        Transaction.price_per_share,
+        Transaction.total_amount,
+    )
+
+    @staticmethod
+    def transactions_query(
+        portfolio_id: UUID,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        columns: Tuple = (Transaction,)
+    ) -> Select:
+        """
+        A portfolio's transactions, newest first.
+        `after` is the (transaction_date, id) of the last row already seen; the
+        row-value comparison lets the index seek instead of skipping OFFSET rows.
+        """
+        stmt = select(*columns).where(Transaction.portfolio_id == portfolio_id)
+        if after is not None:
+            after_date, after_id = after
+            stmt = stmt.where(
+                tuple_(Transaction.transaction_date, Transaction.id) < tuple_(
+                    literal(after_date, Transaction.transaction_date.type),
+                    literal(after_id, Transaction.id.type)
+                )
+            )
+        return stmt.order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+
+    def get_transactions_page(
+        self,
+        portfolio_id: UUID,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> Tuple[List[Transaction], Optional[Tuple[datetime, UUID]]]:
+        """Returns (page, key of the next page or None when this is the last page)."""
+        stmt = self.transactions_query(portfolio_id, after).limit(limit + 1)
+        rows = list(self._session.execute(stmt).scalars().all())
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1].transaction_date, rows[-1].id)
+
     # --- ATOMIC TRANSACTION OPERATIONS (Chunk 9) ---
 
     def execute_trade(
@@ -90,18 +224,28 @@ class PortfolioRepository:
         price: float
     ) -> Transaction:
         """
-        Executes a trade with ACID guarantees.
-        
-        1. Locks portfolio row.
-        2. Validates funds/shares.
-        3. Updates Balance.
-        4. Updates/Creates Holding (with Weighted Avg Cost).
-        5. Logs Transaction.
+        Executes a single trade with ACID guarantees.
+        Shorthand for a one-leg execute_trades().
         """
-        if shares <= 0:
-            raise ValueError("Shares must be positive")
-        if price < 0:
-            raise ValueError("Price cannot be negative")
+        return self.execute_trades(portfolio_id, [TradeLeg(ticker, side, shares, price)])[0]
+
+    def execute_trades(self, portfolio_id: UUID, legs: Iterable[TradeLeg]) -> List[Transaction]:
+        """
+        Executes several trades on one portfolio as a unit.
+
+        1. Locks the portfolio row once.
+        2. Loads every affected holding in one IN query.
+        3. Validates funds/shares leg by leg (in order, so sells fund later buys)
+           and computes Weighted Avg Cost in memory. Any failure raises before
+           anything is modified.
+        4. Applies balance + holding changes and bulk-inserts the transactions.
+        5. Refreshes the portfolio's row in portfolio_valuations.
+        """
+        legs = list(legs)
+        for leg in legs:
+            _validate_leg(leg.side, leg.shares, leg.price)
+        if not legs:
+            return []
 
         # 1. LOCK THE PORTFOLIO (Pessimistic Lock)
         # with_for_update() generates 'SELECT ... FOR UPDATE' in Postgres.
@@ -112,78 +256,227 @@ class PortfolioRepository:
         if not portfolio:
             raise ValueError(f"Portfolio {portfolio_id} not found")
 
-        total_cost = float(shares) * float(price)
-        current_balance = float(portfolio.cash_balance)
-
-        # 2. VALIDATION & BALANCE UPDATE
-        if side == TransactionType.BUY:
-            if current_balance < total_cost:
-                raise ValueError(f"Insufficient funds: Balance ${current_balance}, Cost ${total_cost}")
-            portfolio.cash_balance = current_balance - total_cost
-        
-        elif side == TransactionType.SELL:
-            # We check share sufficiency later when fetching holdings, 
-            # but we update cash now (Optimistic math, verified by DB logic later)
-            portfolio.cash_balance = current_balance + total_cost
-
-        # 3. HOLDING UPDATE
-        # Get current holding (if any)
+        # 2. LOAD ALL AFFECTED HOLDINGS
+        tickers = {leg.ticker for leg in legs}
         holding_stmt = select(Holding).where(
             Holding.portfolio_id == portfolio_id,
-            Holding.ticker == ticker
+            Holding.ticker.in_(tickers)
         )
-        current_holding = self._session.execute(holding_stmt).scalars().first()
-        
-        current_shares = float(current_holding.shares) if current_holding else 0.0
-        current_avg_cost = float(current_holding.avg_cost_per_share) if current_holding else 0.0
-
-        new_shares = 0.0
-        new_avg_cost = 0.0
-
-        if side == TransactionType.BUY:
-            # Calculate Weighted Average Cost
-            total_current_value = current_shares * current_avg_cost
-            total_new_value = float(shares) * float(price)
-            new_shares = current_shares + float(shares)
-            new_avg_cost = (total_current_value + total_new_value) / new_shares
-        
-        elif side == TransactionType.SELL:
-            if current_shares < shares:
-                raise ValueError(f"Insufficient shares: Owned {current_shares}, Selling {shares}")
-            
-            new_shares = current_shares - float(shares)
-            # Selling does NOT change average cost per share
-            new_avg_cost = current_avg_cost
-
-        # Save Holding State
-        if new_shares == 0:
-            if current_holding:
-                self._session.delete(current_holding)
-        else:
-            if current_holding:
+        holdings: Dict[str, Holding] = {
+            h.ticker: h for h in self._session.execute(holding_stmt).scalars().all()
+        }
+
+        # 3. VALIDATE & COMPUTE (in memory; nothing is touched until every leg passes)
+        balance = float(portfolio.cash_balance)
+        positions = {
+            ticker: (float(h.shares), float(h.avg_cost_per_share)) for ticker, h in holdings.items()
+        }
+        rows = []
+
+        for leg in legs:
+            balance, positions[leg.ticker] = _apply_leg(
+                balance, positions.get(leg.ticker, (0.0, 0.0)), leg.side, leg.shares, leg.price
+            )
+            rows.append({
+                "portfolio_id": portfolio_id,
+                "ticker": leg.ticker,
+                "transaction_type": leg.side,
+                "shares": leg.shares,
+                "price_per_share": leg.price,
+                "total_amount": float(leg.shares) * float(leg.price),
+            })
+
+        # 4. APPLY BALANCE + HOLDING STATE
+        portfolio.cash_balance = balance
+
+        for ticker in tickers:
+            new_shares, new_avg_cost = positions[ticker]
+            current_holding = holdings.get(ticker)
+            if new_shares == 0:
+                if current_holding:
+                    self._session.delete(current_holding)
+            elif current_holding:
                 current_holding.shares = new_shares
                 current_holding.avg_cost_per_share = new_avg_cost
             else:
-                new_holding = Holding(
+                self._session.add(Holding(
                     portfolio_id=portfolio_id, 
                     ticker=ticker, 
                     shares=new_shares, 
                     avg_cost_per_share=new_avg_cost
+                ))
+
+        # 5. LOG TRANSACTIONS (Audit Trail): autoflushes the changes above, then one bulk INSERT
+        # (caller handles commit)
+        transactions = list(self._session.scalars(insert(Transaction).returning(Transaction, sort_by_parameter_order=True), rows))
+
+        # 6. REFRESH THE VALUATION SNAPSHOT (same transaction as the trade)
+        self._valuations.refresh([portfolio_id])
+        return transactions
+
+    # --- CROSS-PORTFOLIO BULK EXECUTION ---
+
+    def execute_bulk_orders(self, orders: Iterable[BulkOrder]) -> List[OrderResult]:
+        """
+        Executes a batch of orders across many portfolios (scheduled sweeps).
+
+        Unlike execute_trades, each order succeeds or fails on its own; results
+        come back in input order. Orders on the same portfolio apply in input order.
+
+        1. Locks every affected portfolio in ascending id order (no deadlocks
+           between concurrent batches).
+        2. Loads the affected holdings and runs the trade math in memory.
+        3. Writes balances, holdings and transactions as set-based SQL:
+           UPDATE ... FROM (VALUES ...), INSERT ... ON CONFLICT, one DELETE per
+           chunk and a bulk INSERT of the transaction log.
+        4. Refreshes portfolio_valuations for every portfolio that traded.
+        """
+        orders = list(orders)
+        results = [OrderResult(order=order, status="filled") for order in orders]
+        valid: List[OrderResult] = []
+        for result in results:
+            order = result.order
+            try:
+                _validate_leg(order.side, order.shares, order.price)
+                valid.append(result)
+            except ValueError as e:
+                result.status, result.error = "rejected", str(e)
+        if not valid:
+            return results
+
+        insert_stmt = self._INSERT_BY_DIALECT.get(self._session.get_bind().dialect.name)
+        if insert_stmt is None:
+            return self._execute_orders_one_by_one(results, valid)
+
+        # 1. LOCK (deterministic order)
+        portfolio_ids = sorted({r.order.portfolio_id for r in valid}, key=str)
+        balances = self._lock_balances(portfolio_ids)
+        tickers = {r.order.ticker for r in valid}
+        positions = self._load_positions(list(balances), tickers)
+
+        # 2. SIMULATE
+        touched_positions = set()
+        transactions = []
+        for result in valid:
+            order = result.order
+            if order.portfolio_id not in balances:
+                result.status, result.error = "rejected", f"Portfolio {order.portfolio_id} not found"
+                continue
+
+            key = (order.portfolio_id, order.ticker)
+            try:
+                balances[order.portfolio_id], positions[key] = _apply_leg(
+                    balances[order.portfolio_id], positions.get(key, (0.0, 0.0)),
+                    order.side, order.shares, order.price
                 )
-                self._session.add(new_holding)
-
-        # 4. LOG TRANSACTION (Audit Trail)
-        transaction = Transaction(
-            portfolio_id=portfolio_id,
-            ticker=ticker,
-            transaction_type=side,
-            shares=shares,
-            price_per_share=price,
-            total_amount=total_cost
-        )
-        self._session.add(transaction)
-        
-        # 5. FLUSH (Send to DB, but don't commit yet - caller handles commit)
-        self._session.flush()
-        
-        return transaction
\ No newline at end of file
+            except ValueError as e:
+                result.status, result.error = "rejected", str(e)
+                continue
+
+            touched_positions.add(key)
+            transactions.append({
+                "portfolio_id": order.portfolio_id,
+                "ticker": order.ticker,
+                "transaction_type": order.side,
+                "shares": order.shares,
+                "price_per_share": order.price,
+                "total_amount": float(order.shares) * float(order.price),
+            })
+
+        # 3. WRITE (set-based)
+        touched_portfolios = {pid for pid, _ in touched_positions}
+        self._write_balances([(pid, balances[pid]) for pid in portfolio_ids if pid in touched_portfolios])
+        self._write_positions(insert_stmt, [(key, positions[key]) for key in sorted(touched_positions, key=str)])
+        if transactions:
+            self._session.execute(insert(Transaction.__table__), transactions)
+        self._valuations.refresh(touched_portfolios)
+
+        # Bulk statements bypass the identity map; drop stale cached instances
+        self._session.expire_all()
+        return results
+
+    def _chunks(self, items: List) -> Iterable[List]:
+        for start in range(0, len(items), self.BULK_CHUNK_SIZE):
+            yield items[start:start + self.BULK_CHUNK_SIZE]
+
+    def _lock_balances(self, portfolio_ids: List[UUID]) -> Dict[UUID, float]:
+        """SELECT ... FOR UPDATE in ascending id order; returns current cash per portfolio."""
+        balances = {}
+        for chunk in self._chunks(portfolio_ids):
+            stmt = (
+                select(Portfolio.id, Portfolio.cash_balance)
+                .where(Portfolio.id.in_(chunk))
+                .order_by(Portfolio.id)
+                .with_for_update()
+            )
+            balances.update({pid: float(cash) for pid, cash in self._session.execute(stmt)})
+        return balances
+
+    def _load_positions(self, portfolio_ids: List[UUID], tickers: set) -> Dict[Tuple[UUID, str], Tuple[float, float]]:
+        positions = {}
+        for chunk in self._chunks(sorted(portfolio_ids, key=str)):
+            stmt = select(
+                Holding.portfolio_id, Holding.ticker, Holding.shares, Holding.avg_cost_per_share
+            ).where(Holding.portfolio_id.in_(chunk), Holding.ticker.in_(tickers))
+            for pid, ticker, shares, avg_cost in self._session.execute(stmt):
+                positions[(pid, ticker)] = (float(shares), float(avg_cost))
+        return positions
+
+    def _write_balances(self, balances: List[Tuple[UUID, float]]):
+        portfolios = Portfolio.__table__
+        if self._session.get_bind().dialect.name == "postgresql":
+            for chunk in self._chunks(balances):
+                new = values(
+                    column("id", GUID()), column("cash_balance", Numeric(10, 2)), name="new_balances"
+                ).data(chunk)
+                self._session.execute(
+                    update(portfolios)
+                    .where(portfolios.c.id == new.c.id)
+                    .values(cash_balance=new.c.cash_balance)
+                )
+        elif balances:
+            # SQLite has no column-aliased VALUES; one executemany instead
+            self._session.execute(
+                update(portfolios)
+                .where(portfolios.c.id == bindparam("pid"))
+                .values(cash_balance=bindparam("cash")),
+                [{"pid": pid, "cash": cash} for pid, cash in balances]
+            )
+
+    def _write_positions(self, insert_stmt, positions: List[Tuple[Tuple[UUID, str], Tuple[float, float]]]):
+        """Upserts non-empty positions and deletes the ones sold down to zero."""
+        upserts = [
+            {"id": uuid.uuid4(), "portfolio_id": pid, "ticker": ticker, "shares": shares, "avg_cost_per_share": avg_cost}
+            for (pid, ticker), (shares, avg_cost) in positions
+            if shares != 0
+        ]
+        closed = [key for key, (shares, _) in positions if shares == 0]
+
+        if upserts:
+            # One statement, executemany: compiled once, batched into multi-row VALUES by the driver layer
+            stmt = insert_stmt(Holding.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Holding.portfolio_id, Holding.ticker],
+                set_={
+                    "shares": stmt.excluded.shares,
+                    "avg_cost_per_share": stmt.excluded.avg_cost_per_share,
+                }
+            )
+            self._session.execute(stmt, upserts)
+
+        holdings = Holding.__table__
+        for chunk in self._chunks(closed):
+            self._session.execute(
+                delete(holdings).where(tuple_(holdings.c.portfolio_id, holdings.c.ticker).in_(chunk))
+            )
+
+    def _execute_orders_one_by_one(self, results: List[OrderResult], valid: List[OrderResult]) -> List[OrderResult]:
+        """Portable fallback for dialects without ON CONFLICT: one savepoint per order."""
+        for result in valid:
+            order = result.order
+            try:
+                with self._session.begin_nested():
+                    self.execute_trade(order.portfolio_id, order.ticker, order.side, order.shares, order.price)
+            except ValueError as e:
+                result.status, result.error = "rejected", str(e)
+        return results
@@ -0,0 +1,61 @@
+from datetime import date
+from typing import Optional, List, Dict
+import pandas as pd
+from sqlalchemy import select, func, insert
+from sqlalchemy.orm import Session
+from investing.models.price_history import PriceBar
+
+class PriceHistoryRepository:
+    """
+    Data Access Object for the local daily price history.
+    Keyed by (ticker, date); bars are append-only.
+    """
+
+    def __init__(self, session: Session):
+        self._session = session
+
+    def get_last_date(self, ticker: str) -> Optional[date]:
+        stmt = select(func.max(PriceBar.date)).where(PriceBar.ticker == ticker)
+        return self._session.execute(stmt).scalar()
+
+    def get_last_dates(self, tickers: List[str]) -> Dict[str, Optional[date]]:
+        """Last stored bar per ticker in one grouped query (None if never stored)."""
+        stmt = (
+            select(PriceBar.ticker, func.max(PriceBar.date))
+            .where(PriceBar.ticker.in_(tickers))
+            .group_by(PriceBar.ticker)
+        )
+        found = dict(self._session.execute(stmt).all())
+        return {ticker: found.get(ticker) for ticker in tickers}
+
+    def get_history(self, ticker: str, limit: int = 100) -> pd.DataFrame:
+        """Returns the latest `limit` bars as a DataFrame ('date', 'price'), sorted Oldest -> Newest."""
+        stmt = (
+            select(PriceBar.date, PriceBar.close)
+            .where(PriceBar.ticker == ticker)
+            .order_by(PriceBar.date.desc())
+            .limit(limit)
+        )
+        rows = self._session.execute(stmt).all()
+        if not rows:
+            return pd.DataFrame(columns=['date', 'price'])
+
+        df = pd.DataFrame(rows, columns=['date', 'price'])
+        df['date'] = pd.to_datetime(df['date'])
+        return df.sort_values('date').reset_index(drop=True)
+
+    def add_bars(self, ticker: str, history: pd.DataFrame, after: Optional[date] = None) -> int:
+        """
+        Inserts bars newer than `after` (all bars if None) in one executemany.
+        Returns the number of rows written.
+        """
+        rows = []
+        for bar_date, price in zip(history['date'], history['price']):
+            bar_date = pd.Timestamp(bar_date).date()
+            if after is None or bar_date > after:
+                rows.append({"ticker": ticker, "date": bar_date, "close": float(price)})
+
+        if rows:
+            self._session.execute(insert(PriceBar), rows)
+            self._session.flush()
+        return len(rows)
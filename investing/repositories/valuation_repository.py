@@ -0,0 +1,189 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from investing.models.portfolio import Portfolio
+from investing.models.holding import Holding
+from investing.models.etf_universe import EtfUniverse
+from investing.models.price_history import PriceBar
+from investing.models.portfolio_valuation import PortfolioValuation
+from investing.services.allocation_engine import AllocationEngine
+
+# Shared by repositories created without an engine (loads etfs.json once)
+_default_engine: Optional[AllocationEngine] = None
+
+
+def _get_default_engine() -> AllocationEngine:
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = AllocationEngine()
+    return _default_engine
+
+
+class PortfolioValuationRepository:
+    """
+    Data Access Object for the portfolio_valuations read model.
+
+    refresh() recomputes the rows of the given portfolios from holdings, cash and
+    the latest price per ticker (newest price_history close, else
+    etf_universe.last_price) in one joined read per chunk, then upserts them.
+    PortfolioRepository calls it after every trade; the harvester calls
+    refresh_for_tickers() after it writes new prices. get() is then a single
+    primary-key read.
+    """
+
+    REFRESH_CHUNK_SIZE = 500
+
+    _INSERT_BY_DIALECT = {
+        "postgresql": postgresql.insert,
+        "sqlite": sqlite.insert,
+    }
+
+    def __init__(self, session: Session, engine: Optional[AllocationEngine] = None):
+        self._session = session
+        self._engine = engine
+
+    def get(self, portfolio_id: UUID) -> Optional[PortfolioValuation]:
+        stmt = select(PortfolioValuation).where(PortfolioValuation.portfolio_id == portfolio_id)
+        return self._session.execute(stmt).scalars().first()
+
+    def compute(self, portfolio_id: UUID) -> Optional[PortfolioValuation]:
+        """Values one portfolio without storing the result (None if it does not exist)."""
+        rows = self._compute([portfolio_id])
+        return PortfolioValuation(**rows[0]) if rows else None
+
+    def refresh(self, portfolio_ids: Iterable[UUID]) -> int:
+        """Recomputes and upserts the valuations of these portfolios. Returns rows written."""
+        portfolio_ids = sorted(set(portfolio_ids), key=str)
+        written = 0
+        for start in range(0, len(portfolio_ids), self.REFRESH_CHUNK_SIZE):
+            rows = self._compute(portfolio_ids[start:start + self.REFRESH_CHUNK_SIZE])
+            self._upsert(rows)
+            written += len(rows)
+        return written
+
+    def refresh_for_tickers(self, tickers: Iterable[str]) -> int:
+        """Refreshes every portfolio holding one of these tickers (after a price change)."""
+        tickers = list(set(tickers))
+        if not tickers:
+            return 0
+        stmt = select(Holding.portfolio_id).where(Holding.ticker.in_(tickers)).distinct()
+        return self.refresh(self._session.execute(stmt).scalars().all())
+
+    def refresh_all(self) -> int:
+        """Backfill: recomputes every portfolio."""
+        return self.refresh(self._session.execute(select(Portfolio.id)).scalars().all())
+
+    def _compute(self, portfolio_ids: List[UUID]) -> List[Dict]:
+        # Newest stored close for the holding's ticker (a primary-key range scan on price_history)
+        latest_close = (
+            select(PriceBar.close)
+            .where(PriceBar.ticker == Holding.ticker)
+            .order_by(PriceBar.date.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        # portfolios LEFT JOIN holdings LEFT JOIN etf_universe: one row per position (or one for an empty portfolio)
+        stmt = (
+            select(
+                Portfolio.id, Portfolio.cash_balance, Portfolio.risk_profile,
+                Holding.ticker, Holding.shares, Holding.avg_cost_per_share,
+                func.coalesce(latest_close, EtfUniverse.last_price)
+            )
+            .outerjoin(Holding, Holding.portfolio_id == Portfolio.id)
+            .outerjoin(EtfUniverse, EtfUniverse.ticker == Holding.ticker)
+            .where(Portfolio.id.in_(portfolio_ids))
+        )
+
+        portfolios = {}
+        positions = defaultdict(list)
+        for pid, cash, risk_profile, ticker, shares, avg_cost, last_price in self._session.execute(stmt):
+            portfolios[pid] = (float(cash), risk_profile)
+            if ticker is not None:
+                positions[pid].append((ticker, float(shares), float(avg_cost), last_price))
+
+        now = datetime.utcnow()
+        return [
+            self._value(pid, cash, risk_profile, positions[pid], now)
+            for pid, (cash, risk_profile) in portfolios.items()
+        ]
+
+    def _value(self, portfolio_id: UUID, cash: float, risk_profile: str, positions: List, valued_at: datetime) -> Dict:
+        market_values: Dict[str, float] = {}
+        cost_basis = 0.0
+        unpriced = 0
+        for ticker, shares, avg_cost, last_price in positions:
+            if last_price is None:
+                # No market price for this ticker: carry it at cost
+                unpriced += 1
+                last_price = avg_cost
+            market_values[ticker] = shares * float(last_price)
+            cost_basis += shares * avg_cost
+
+        market_value = sum(market_values.values())
+        total_value = cash + market_value
+
+        return {
+            "portfolio_id": portfolio_id,
+            "cash_balance": round(cash, 2),
+            "market_value": round(market_value, 2),
+            "cost_basis": round(cost_basis, 2),
+            "total_value": round(total_value, 2),
+            "unrealized_pnl": round(market_value - cost_basis, 2),
+            "drift": self._drift(market_values, cash, total_value, risk_profile),
+            "unpriced_positions": unpriced,
+            "valued_at": valued_at,
+        }
+
+    def _drift(
+        self, market_values: Dict[str, float], cash: float, total_value: float, risk_profile: str
+    ) -> Optional[float]:
+        """
+        Half the sum of |actual - target| weights, with cash as an untargeted position.
+        Targets are the untilted recommendation for this balance and risk profile, so
+        drift does not move with the daily momentum pick. None for a risk profile the
+        engine has no targets for: a read-model refresh must never fail a trade.
+        """
+        engine = self._engine or _get_default_engine()
+        if risk_profile not in engine.RISK_PROFILES:
+            return None
+        if total_value <= 0:
+            return 0.0
+        targets = {a.ticker: a.weight for a in engine.recommend_portfolio(total_value, risk_profile)}
+        actual = {ticker: value / total_value for ticker, value in market_values.items()}
+
+        gap = sum(abs(actual.get(t, 0.0) - targets.get(t, 0.0)) for t in actual.keys() | targets.keys())
+        return min(1.0, round((gap + cash / total_value) / 2, 6))
+
+    def _upsert(self, rows: List[Dict]):
+        if not rows:
+            return
+
+        insert = self._INSERT_BY_DIALECT.get(self._session.get_bind().dialect.name)
+        if insert is None:
+            # Portable fallback (one merge per row) for dialects without ON CONFLICT
+            for row in rows:
+                self._session.merge(PortfolioValuation(**row))
+            self._session.flush()
+            return
+
+        stmt = insert(PortfolioValuation.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PortfolioValuation.portfolio_id],
+            set_={
+                name: stmt.excluded[name]
+                for name in rows[0] if name != "portfolio_id"
+            }
+        )
+        self._session.execute(stmt, rows)
+
+        # Bulk statements bypass the identity map; drop stale cached valuations
+        for row in rows:
+            cached = self._session.identity_map.get(
+                self._session.identity_key(PortfolioValuation, row["portfolio_id"])
+            )
+            if cached is not None:
+                self._session.expire(cached)
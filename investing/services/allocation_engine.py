@@ -1,23 +1,64 @@
+import asyncio
 import json
 import math
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import List, Tuple, Literal, Dict, Optional
-from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Tuple, Literal, Dict, Optional, Mapping, Iterable
+from dataclasses import dataclass, field, replace
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
 from investing.models.etf_universe import EtfUniverse
+from investing.config import UNIVERSE_SNAPSHOT_TTL_SECONDS
 
 @dataclass
 class ETFAllocation:
     ticker: str
     weight: float  # 0.0 to 1.0
 
+
+# Bumped by notify_universe_changed(); engines in this process reload on the next call.
+_universe_version = 0
+
+
+def notify_universe_changed():
+    """Called by the harvester after it rewrites etf_universe."""
+    global _universe_version
+    _universe_version += 1
+
+
+# (etf_count, risk_profile, momentum_winner) -> ((ticker, weight), ...)
+RecommendationTable = Mapping[Tuple[int, str, Optional[str]], Tuple[Tuple[str, float], ...]]
+
+
+@dataclass(frozen=True)
+class UniverseSnapshot:
+    """Immutable copy of etf_universe ranked by momentum (best first)."""
+    ranked: Tuple[Tuple[str, float], ...]
+    watermark: Tuple[Optional[datetime], int]  # (max last_analyzed, row count)
+    version: int
+    checked_at: float
+    table: RecommendationTable = field(default_factory=lambda: MappingProxyType({}), compare=False)
+
+    @property
+    def winner(self) -> Optional[str]:
+        # Negative top score means a market-wide drawdown: no tilt
+        if self.ranked and self.ranked[0][1] > 0:
+            return self.ranked[0][0]
+        return None
+
 class AllocationEngine:
     """
     Determines ETF recommendations based on user balance, risk profile,
     AND dynamic market data (Sector Momentum).
     """
 
+    # Every ticker _get_base_allocations() can hand out; the harvester keeps their prices current
+    CORE_TICKERS: Tuple[str, ...] = ("VOO", "VTI", "VXUS", "BND", "AGG")
+
     # (lower_inclusive, upper_exclusive, etf_count)
     BALANCE_TIERS: List[Tuple[float, float, int]] = [
         (0, 100, 1),
@@ -26,11 +67,21 @@ class AllocationEngine:
         (2000, float('inf'), 4)
     ]
 
-    def __init__(self, data_path: Path = None):
+    RISK_PROFILES: Tuple[str, ...] = ("conservative", "balanced", "growth")
+
+    def __init__(self, data_path: Path = None, snapshot_ttl: float = UNIVERSE_SNAPSHOT_TTL_SECONDS):
         if data_path is None:
             base_path = Path(__file__).parent.parent
             data_path = base_path / "data" / "etfs.json"
         self._etf_map = self._load_etf_data(data_path)
+        self._snapshot_ttl = snapshot_ttl
+        self._snapshot: Optional[UniverseSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        # Separate lock for the async path: a threading.Lock held across an awaited
+        # query would block the event loop thread for every other request.
+        self._snapshot_async_lock = asyncio.Lock()
+        # Used when no DB is available (no momentum data -> no tilt)
+        self._static_table = self._compile_table([None])
 
     def _load_etf_data(self, path: Path) -> dict:
         if not path.exists():
@@ -61,21 +112,108 @@ class AllocationEngine:
         else:
             raise ValueError(f"No allocation map for {count} ETFs")
 
+    def invalidate_snapshot(self):
+        """Forces the next recommendation to reload the universe."""
+        with self._snapshot_lock:
+            self._snapshot = None
+
+    def get_universe_snapshot(self, db: Session) -> UniverseSnapshot:
+        """
+        Returns the in-memory ranked universe.
+
+        Within the TTL this does no DB I/O. After it, one aggregate query compares
+        the (max last_analyzed, count) watermark and the rows are reloaded only if
+        the harvester changed them. notify_universe_changed() forces a reload.
+        """
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if (
+            snapshot is not None
+            and snapshot.version == _universe_version
+            and now - snapshot.checked_at < self._snapshot_ttl
+        ):
+            return snapshot
+
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == _universe_version:
+                if now - snapshot.checked_at < self._snapshot_ttl:
+                    return snapshot
+                if self._read_watermark(db) == snapshot.watermark:
+                    snapshot = replace(snapshot, checked_at=now)
+                    self._snapshot = snapshot
+                    return snapshot
+
+            snapshot = self._load_snapshot(db, now)
+            self._snapshot = snapshot
+            return snapshot
+
+    async def get_universe_snapshot_async(self, db: AsyncSession) -> UniverseSnapshot:
+        """Same as get_universe_snapshot for an AsyncSession (DB reads via run_sync)."""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if (
+            snapshot is not None
+            and snapshot.version == _universe_version
+            and now - snapshot.checked_at < self._snapshot_ttl
+        ):
+            return snapshot
+
+        async with self._snapshot_async_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == _universe_version:
+                if now - snapshot.checked_at < self._snapshot_ttl:
+                    return snapshot
+                if await db.run_sync(self._read_watermark) == snapshot.watermark:
+                    snapshot = replace(snapshot, checked_at=now)
+                    self._snapshot = snapshot
+                    return snapshot
+
+            snapshot = await db.run_sync(self._load_snapshot, now)
+            self._snapshot = snapshot
+            return snapshot
+
+    def _read_watermark(self, db: Session) -> Tuple[Optional[datetime], int]:
+        stmt = select(func.max(EtfUniverse.last_analyzed), func.count(EtfUniverse.ticker))
+        latest, count = db.execute(stmt).one()
+        return latest, count
+
+    def _load_snapshot(self, db: Session, now: float) -> UniverseSnapshot:
+        version = _universe_version
+        stmt = select(EtfUniverse).order_by(EtfUniverse.momentum_score.desc())
+        rows = db.execute(stmt).scalars().all()
+
+        stamps = [r.last_analyzed for r in rows if r.last_analyzed is not None]
+        ranked = tuple((r.ticker, r.momentum_score) for r in rows)
+        # Any positively-scored ticker can be the winner; None covers the no-tilt case
+        candidates = [None] + [ticker for ticker, score in ranked if score > 0]
+        return UniverseSnapshot(
+            ranked=ranked,
+            watermark=(max(stamps) if stamps else None, len(rows)),
+            version=version,
+            checked_at=now,
+            table=self._compile_table(candidates)
+        )
+
+    def _compile_table(self, winners: Iterable[Optional[str]]) -> RecommendationTable:
+        """Precomputes every (tier, risk profile, winner) combination into a read-only map."""
+        counts = sorted({count for _, _, count in self.BALANCE_TIERS})
+        table = {
+            (count, risk_profile, winner): self._compute_weights(count, risk_profile, winner)
+            for winner in winners
+            for count in counts
+            for risk_profile in self.RISK_PROFILES
+        }
+        return MappingProxyType(table)
+
     def _get_momentum_winner(self, db: Session) -> Optional[str]:
         """
-        Queries the database for the sector ETF with the highest momentum score.
+        Returns the sector ETF with the highest momentum score, from the snapshot.
         Returns None if no data exists or scores are negative (market crash).
         """
         if db is None:
             return None
-            
-        # Fetch top momentum score
-        stmt = select(EtfUniverse).order_by(EtfUniverse.momentum_score.desc()).limit(1)
-        winner = db.execute(stmt).scalars().first()
-        
-        if winner and winner.momentum_score > 0:
-            return winner.ticker
-        return None
+        return self.get_universe_snapshot(db).winner
 
     def recommend_portfolio(
         self, 
@@ -85,21 +223,86 @@ class AllocationEngine:
     ) -> List[ETFAllocation]:
         """
         Returns target portfolio with weights adjusted for risk AND market momentum.
+        Served from the precompiled table: one dict lookup per call.
         """
-        # 1. Determine Tier
-        count = self.get_etf_count(balance)
-        tier_key = f"tier{count}"
-        
-        # 2. Tier 1 Override (Capital Constraint)
+        return self.recommend_portfolios([(balance, risk_profile)], db=db)[0]
+
+    async def recommend_portfolio_async(
+        self,
+        balance: float,
+        risk_profile: Literal["conservative", "balanced", "growth"] = "balanced",
+        db: AsyncSession = None
+    ) -> List[ETFAllocation]:
+        """recommend_portfolio for async callers (API routes)."""
+        return (await self.recommend_portfolios_async([(balance, risk_profile)], db=db))[0]
+
+    def recommend_portfolios(
+        self,
+        requests: Iterable[Tuple[float, str]],
+        db: Session = None
+    ) -> List[List[ETFAllocation]]:
+        """
+        Batch version of recommend_portfolio for (balance, risk_profile) pairs.
+        The universe snapshot is resolved once for the whole batch.
+        """
+        requests = self._validate_requests(requests)
+        snapshot = self.get_universe_snapshot(db) if db is not None else None
+        return self._lookup(requests, snapshot)
+
+    async def recommend_portfolios_async(
+        self,
+        requests: Iterable[Tuple[float, str]],
+        db: AsyncSession = None
+    ) -> List[List[ETFAllocation]]:
+        """recommend_portfolios for async callers; never blocks the event loop on the DB."""
+        requests = self._validate_requests(requests)
+        snapshot = await self.get_universe_snapshot_async(db) if db is not None else None
+        return self._lookup(requests, snapshot)
+
+    def _validate_requests(self, requests: Iterable[Tuple[float, str]]) -> List[Tuple[float, str]]:
+        requests = list(requests)
+        for _, risk_profile in requests:
+            if risk_profile not in self.RISK_PROFILES:
+                raise ValueError(f"Invalid risk profile: {risk_profile}")
+        return requests
+
+    def _lookup(
+        self,
+        requests: List[Tuple[float, str]],
+        snapshot: Optional[UniverseSnapshot]
+    ) -> List[List[ETFAllocation]]:
+        """Serves each request from the snapshot's table (static table without a DB)."""
+        if snapshot is None:
+            table, winner = self._static_table, None
+        else:
+            table, winner = snapshot.table, snapshot.winner
+
+        return [
+            [
+                ETFAllocation(ticker=t, weight=w)
+                for t, w in table[(self.get_etf_count(balance), risk_profile, winner)]
+            ]
+            for balance, risk_profile in requests
+        ]
+
+    def _compute_weights(
+        self,
+        count: int,
+        risk_profile: str,
+        momentum_ticker: Optional[str]
+    ) -> Tuple[Tuple[str, float], ...]:
+        """
+        Procedural allocation for one (tier, risk profile, winner) combination.
+        Only called when compiling the recommendation table.
+        """
+        # 1. Tier 1 Override (Capital Constraint)
         if count == 1:
-            return [ETFAllocation(ticker="VOO", weight=1.0)]
+            return (("VOO", 1.0),)
 
         # 3. Get Base Weights
         weights = self._get_base_allocations(count)
 
         # 4. DYNAMIC INJECTION (Phase 2 Logic)
-        momentum_ticker = self._get_momentum_winner(db)
-        
         if momentum_ticker:
             # The Strategy: We want to free up 30% (0.30) for the winner.
             target_tilt = 0.30
@@ -154,8 +357,8 @@ class AllocationEngine:
                     weights[stock_ticker] = new_stock
 
         # 6. Clean up zero weights and return
-        return [
-            ETFAllocation(ticker=k, weight=v) 
+        return tuple(
+            (k, v)
             for k, v in weights.items() 
             if v > 0.01 # Filter out near-zero weights
-        ]
+        )
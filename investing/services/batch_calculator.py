@@ -1,5 +1,8 @@
 import math
 from dataclasses import dataclass
+from typing import Tuple
+import numpy as np
+from numpy.typing import ArrayLike
 
 @dataclass
 class BatchRecommendation:
@@ -13,6 +16,8 @@ class BatchCalculator:
     Minimizes: Transaction Fees + Opportunity Cost (Cash Drag)
     """
 
+    MAX_DAYS_TO_WAIT = 365
+
     def calculate_optimal_batch(
         self,
         daily_accumulation: float,
@@ -52,12 +57,12 @@ class BatchCalculator:
 
         days_to_wait = optimal_batch / daily_accumulation
 
-        # 4. Cap at 365 days (Pragmatism override)
-        if days_to_wait > 365:
+        # 4. Cap at MAX_DAYS_TO_WAIT (Pragmatism override)
+        if days_to_wait > self.MAX_DAYS_TO_WAIT:
             return BatchRecommendation(
-                batch_size_dollars=daily_accumulation * 365,
-                days_to_wait=365,
-                reasoning="Optimal waiting period exceeds 1 year. Capped at 365 days for practicality."
+                batch_size_dollars=daily_accumulation * self.MAX_DAYS_TO_WAIT,
+                days_to_wait=self.MAX_DAYS_TO_WAIT,
+                reasoning=f"Optimal waiting period exceeds 1 year. Capped at {self.MAX_DAYS_TO_WAIT} days for practicality."
             )
 
         return BatchRecommendation(
@@ -65,3 +70,53 @@ class BatchCalculator:
             days_to_wait=int(days_to_wait),
             reasoning=f"Waiting {int(days_to_wait)} days minimizes the sum of fees (${fixed_cost_per_trade}) and opportunity cost."
         )
+
+    def calculate_optimal_batch_vectorized(
+        self,
+        daily_accumulation: ArrayLike,
+        fixed_cost_per_trade: ArrayLike,
+        expected_daily_return: ArrayLike = 0.0003
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Array version of calculate_optimal_batch for a whole user base in one call.
+        Inputs broadcast against each other (scalars are fine).
+
+        Returns:
+            (batch_size_dollars, days_to_wait): float64 and int64 arrays with the
+            same zero-cost and MAX_DAYS_TO_WAIT cap rules as the scalar version.
+
+        Raises:
+            ValueError: If any element fails the scalar version's validation.
+        """
+        accumulation, cost, daily_return = np.broadcast_arrays(
+            np.asarray(daily_accumulation, dtype=np.float64),
+            np.asarray(fixed_cost_per_trade, dtype=np.float64),
+            np.asarray(expected_daily_return, dtype=np.float64)
+        )
+
+        # 1. Validation (whole batch is rejected, like one bad scalar call)
+        if not np.all(accumulation > 0):
+            raise ValueError("Daily accumulation must be positive")
+
+        if not np.all(daily_return > 0):
+            raise ValueError("Expected daily return must be positive")
+
+        if not np.all(cost >= 0):
+            raise ValueError("Fixed cost cannot be negative")
+
+        # 2. Core Math (an underflowing denominator gives inf, which the cap absorbs)
+        with np.errstate(divide="ignore", over="ignore"):
+            optimal_batch = np.sqrt((2 * cost) / (accumulation * daily_return))
+        days = optimal_batch / accumulation
+
+        # 3. Cap at MAX_DAYS_TO_WAIT, then zero-cost -> invest immediately
+        capped = days > self.MAX_DAYS_TO_WAIT
+        free = cost == 0
+
+        batch_sizes = np.where(capped, accumulation * self.MAX_DAYS_TO_WAIT, np.round(optimal_batch, 2))
+        days_to_wait = np.where(capped, self.MAX_DAYS_TO_WAIT, days).astype(np.int64)
+
+        batch_sizes[free] = 0.0
+        days_to_wait[free] = 0
+
+        return batch_sizes, days_to_wait
@@ -1,22 +1,111 @@
 import time
 import logging
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, List, Dict, Optional
+import pandas as pd
 from sqlalchemy.orm import Session
 from investing.models.base import get_session_context
-from investing.models.etf_universe import EtfUniverse
+from investing.repositories.etf_universe_repository import EtfUniverseRepository
+from investing.repositories.price_history_repository import PriceHistoryRepository
+from investing.repositories.valuation_repository import PortfolioValuationRepository
 from investing.services.market_data import AlphaVantageClient
+from investing.services.allocation_engine import AllocationEngine, notify_universe_changed
 from investing.services.quant_engine import QuantEngine
-from investing.config import ALPHA_VANTAGE_API_KEY
+from investing.exceptions import APIKeyExhausted, TickerNotFound
+from investing.config import (
+    ALPHA_VANTAGE_API_KEY,
+    HARVEST_MAX_WORKERS,
+    HARVEST_TICKER_TIMEOUT_SECONDS,
+    HARVEST_MAX_ATTEMPTS,
+)
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# US equities close 16:00 ET; by 21:00 UTC the day's bar is published.
+MARKET_CLOSE_UTC_HOUR = 21
+
+
+def latest_session_date(now: Optional[datetime] = None) -> date:
+    """Date of the most recent completed trading session (weekends skipped, holidays not)."""
+    now = now or datetime.now(timezone.utc)
+    day = now.date()
+    if now.hour < MARKET_CLOSE_UTC_HOUR:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+@dataclass
+class FetchOutcome:
+    """Result of downloading one ticker's history (runs on a worker thread)."""
+    ticker: str
+    history: Optional[pd.DataFrame] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class TickerResult:
+    ticker: str
+    status: str  # "updated" | "skipped" | "failed"
+    attempts: int = 0
+    momentum: Optional[float] = None
+    volatility: Optional[float] = None
+    score: Optional[float] = None
+    last_price: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class HarvestReport:
+    results: List[TickerResult] = field(default_factory=list)
+    # Core holdings: prices stored for valuations, never scored
+    prices: List[TickerResult] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    def by_status(self, status: str) -> List[TickerResult]:
+        return [r for r in self.results if r.status == status]
+
+    @property
+    def updated(self) -> List[TickerResult]:
+        return self.by_status("updated")
+
+    @property
+    def skipped(self) -> List[TickerResult]:
+        return self.by_status("skipped")
+
+    @property
+    def failed(self) -> List[TickerResult]:
+        return self.by_status("failed")
+
+    def summary(self) -> str:
+        lines = [
+            f"{len(self.updated)} updated, {len(self.skipped)} skipped, "
+            f"{len(self.failed)} failed in {self.elapsed_seconds:.1f}s"
+        ]
+        if self.prices:
+            priced = sum(1 for r in self.prices if r.status == "updated")
+            lines.append(f"{priced}/{len(self.prices)} core holding price(s) updated")
+        for r in self.failed + [r for r in self.prices if r.status == "failed"]:
+            lines.append(f"   ❌ {r.ticker} after {r.attempts} attempt(s): {r.error}")
+        return "\n".join(lines)
+
+
 class Harvester:
     """
     Background service to fetch sector data, calculate momentum,
     and update the ETF Universe database.
+
+    Downloads run on a bounded worker pool; the shared rate limiter inside
+    the client decides how fast they actually go. DB work stays on the
+    calling thread (one session). Retries happen here only: the client makes
+    a single request per attempt, bounded by the ticker's deadline.
     """
-    
+
     # Standard SPDR Sector ETFs
     SECTOR_WATCHLIST = {
         "XLK": "Technology",
@@ -26,62 +115,189 @@ class Harvester:
         "XLP": "Consumer Staples",
     }
 
-    def __init__(self):
-        self.client = AlphaVantageClient(api_key=ALPHA_VANTAGE_API_KEY)
+    # Allocation core holdings: priced for portfolio valuations, never momentum candidates
+    HOLDINGS_WATCHLIST = AllocationEngine.CORE_TICKERS
+
+    # Bars handed to QuantEngine (same span as one compact download)
+    HISTORY_WINDOW = 100
+
+    def __init__(
+        self,
+        max_workers: int = HARVEST_MAX_WORKERS,
+        ticker_timeout: float = HARVEST_TICKER_TIMEOUT_SECONDS,
+        max_attempts: int = HARVEST_MAX_ATTEMPTS
+    ):
+        self.client = AlphaVantageClient(api_key=ALPHA_VANTAGE_API_KEY, max_retries=1)
         self.quant = QuantEngine()
+        self.max_workers = max_workers
+        self.ticker_timeout = ticker_timeout
+        self.max_attempts = max_attempts
 
-    def run(self):
+    def run(self) -> HarvestReport:
         """Execute the daily harvest."""
         logger.info("🚜 Starting Sector Harvest...")
-        
+        started = time.monotonic()
+        report = HarvestReport()
+
         with get_session_context() as session:
+            holdings = [t for t in self.HOLDINGS_WATCHLIST if t not in self.SECTOR_WATCHLIST]
+            to_fetch = self._tickers_to_fetch(session) + self._tickers_to_fetch(session, holdings)
+            downloads = self._fetch_all(to_fetch)
+
             for ticker, sector in self.SECTOR_WATCHLIST.items():
-                self._process_ticker(session, ticker, sector)
-                
-                # Rate Limit Protection (4 calls/min safe zone)
-                logger.info("zzZ Sleeping 15s to respect API limits...")
-                time.sleep(15)
+                outcome = downloads.get(ticker)
+                if outcome is not None and outcome.error is not None:
+                    report.results.append(TickerResult(
+                        ticker=ticker, status="failed", attempts=outcome.attempts, error=outcome.error
+                    ))
+                    continue
+                history = outcome.history if outcome is not None else None
+                result = self._process_ticker(session, ticker, sector, history)
+                result.attempts = outcome.attempts if outcome is not None else 0
+                report.results.append(result)
+
+            # All metrics first, then one upsert for the whole universe
+            written = EtfUniverseRepository(session).bulk_upsert([
+                {
+                    "ticker": r.ticker,
+                    "sector": self.SECTOR_WATCHLIST[r.ticker],
+                    "momentum_score": r.momentum,
+                    "volatility": r.volatility,
+                    "last_price": r.last_price,
+                }
+                for r in report.updated
+            ])
+            logger.info(f"Upserted {written} ETF universe row(s).")
+
+            report.prices = [self._store_prices(session, ticker, downloads.get(ticker)) for ticker in holdings]
+
+            # New prices: revalue the portfolios holding them, in the same commit
+            repriced = [r.ticker for r in report.updated + report.prices if r.status == "updated"]
+            revalued = PortfolioValuationRepository(session).refresh_for_tickers(repriced)
+            logger.info(f"Refreshed {revalued} portfolio valuation(s).")
+
+        # Committed: let in-process allocation engines drop their snapshot
+        if report.updated:
+            notify_universe_changed()
+
+        report.elapsed_seconds = time.monotonic() - started
+        logger.info(f"✅ Harvest Complete. {report.summary()}")
+        return report
+
+    def _tickers_to_fetch(self, session: Session, tickers: Optional[Iterable[str]] = None) -> List[str]:
+        """Tickers (default: the sector watchlist) whose stored history is missing bars since the latest completed session."""
+        latest = latest_session_date()
+        tickers = list(self.SECTOR_WATCHLIST if tickers is None else tickers)
+        if not tickers:
+            return []
+        last_dates = PriceHistoryRepository(session).get_last_dates(tickers)
+
+        stale = []
+        for ticker, last in last_dates.items():
+            if last is not None and last >= latest:
+                logger.info(f"{ticker}: history current (last bar {last}). No API call.")
+            else:
+                stale.append(ticker)
+        return stale
+
+    def _fetch_all(self, tickers: List[str]) -> Dict[str, FetchOutcome]:
+        """Downloads histories concurrently. Never raises; failures are reported per ticker."""
+        if not tickers:
+            return {}
 
-        logger.info("✅ Harvest Complete.")
+        outcomes: Dict[str, FetchOutcome] = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tickers))) as pool:
+            futures = {pool.submit(self._fetch_history, ticker): ticker for ticker in tickers}
+            for future in as_completed(futures):
+                outcome = future.result()
+                outcomes[outcome.ticker] = outcome
+        return outcomes
 
-    def _process_ticker(self, session: Session, ticker: str, sector: str):
+    def _fetch_history(self, ticker: str) -> FetchOutcome:
+        """
+        Fetches one ticker with retries and exponential backoff.
+        The per-ticker time budget covers the rate-limiter wait, each request and
+        the backoff sleeps. Unknown tickers and an exhausted quota are not retried.
+        """
+        outcome = FetchOutcome(ticker=ticker)
+        deadline = time.monotonic() + self.ticker_timeout
+
+        while outcome.attempts < self.max_attempts:
+            outcome.attempts += 1
+            try:
+                outcome.history = self.client.fetch_daily_history(ticker, deadline=deadline)
+                outcome.error = None
+                return outcome
+            except (TickerNotFound, APIKeyExhausted) as e:
+                outcome.error = str(e)
+                return outcome
+            except Exception as e:
+                outcome.error = str(e)
+                backoff = 2 ** outcome.attempts
+                if time.monotonic() + backoff >= deadline:
+                    outcome.error = f"timed out after {self.ticker_timeout:.0f}s: {e}"
+                    return outcome
+                logger.warning(f"{ticker}: attempt {outcome.attempts} failed ({e}), retrying in {backoff}s")
+                time.sleep(backoff)
+
+        return outcome
+
+    def _store_prices(self, session: Session, ticker: str, outcome: Optional[FetchOutcome]) -> TickerResult:
+        """Stores new bars for a core holding; valuations read its latest close from price_history."""
+        if outcome is None:
+            return TickerResult(ticker=ticker, status="skipped")
+        if outcome.error is not None:
+            return TickerResult(ticker=ticker, status="failed", attempts=outcome.attempts, error=outcome.error)
+
+        repo = PriceHistoryRepository(session)
+        added = repo.add_bars(ticker, outcome.history, after=repo.get_last_date(ticker))
+        latest = repo.get_history(ticker, limit=1)
+        return TickerResult(
+            ticker=ticker,
+            status="updated" if added else "skipped",
+            attempts=outcome.attempts,
+            last_price=float(latest.iloc[-1]['price']) if not latest.empty else None
+        )
+
+    def _process_ticker(
+        self,
+        session: Session,
+        ticker: str,
+        sector: str,
+        fetched: Optional[pd.DataFrame] = None
+    ) -> TickerResult:
+        """Stores newly fetched bars and scores the stored window (the universe row is written by run())."""
         try:
             logger.info(f"Processing {ticker} ({sector})...")
-            
-            # FIXED: Updated method name to match the Free Tier client
-            history = self.client.fetch_daily_history(ticker)
-            
+
+            repo = PriceHistoryRepository(session)
+            if fetched is not None:
+                added = repo.add_bars(ticker, fetched, after=repo.get_last_date(ticker))
+                logger.info(f"   -> Stored {added} new bar(s).")
+            history = repo.get_history(ticker, limit=self.HISTORY_WINDOW)
+
             if history.empty:
                 logger.warning(f"⚠️ No data found for {ticker}. Skipping.")
-                return
+                return TickerResult(ticker=ticker, status="skipped")
 
             # 2. Calculate Math
             mom, vol, score = self.quant.calculate_metrics(history)
-            last_price = history.iloc[-1]['price']
-            
+            last_price = float(history.iloc[-1]['price'])
+
             logger.info(f"   -> Score: {score:.4f} (Mom: {mom:.2%}, Vol: {vol:.2%})")
 
-            # 3. Upsert to Database
-            existing = session.query(EtfUniverse).get(ticker)
-            
-            if existing:
-                existing.momentum_score = mom
-                existing.volatility = vol
-                existing.last_price = last_price
-            else:
-                new_record = EtfUniverse(
-                    ticker=ticker,
-                    sector=sector,
-                    momentum_score=mom,
-                    volatility=vol,
-                    last_price=last_price
-                )
-                session.add(new_record)
-            
-            session.flush()
+            return TickerResult(
+                ticker=ticker,
+                status="updated",
+                momentum=mom,
+                volatility=vol,
+                score=score,
+                last_price=last_price
+            )
 
         except Exception as e:
             logger.error(f"❌ Failed to process {ticker}: {e}")
+            return TickerResult(ticker=ticker, status="failed", error=str(e))
 
 if __name__ == "__main__":
     harvester = Harvester()
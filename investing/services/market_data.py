@@ -1,12 +1,19 @@
 """Market data retrieval from Alpha Vantage API."""
 
+import asyncio
+import httpx
 import requests
+import requests.adapters
 import time
+import threading
 import pandas as pd
 import logging
 import os
-from typing import Optional, List, Dict, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, List, Dict, Union, Tuple, Callable, Awaitable
 import redis
+import redis.asyncio
 from redis.exceptions import ConnectionError, TimeoutError
 
 from investing.exceptions import (
@@ -16,15 +23,22 @@ from investing.exceptions import (
     APITimeout,
     ConfigurationError
 )
+from investing.config import L1_CACHE_TTL_SECONDS, L1_CACHE_MAX_ENTRIES
+from investing.services.rate_limiter import RateLimiter, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
-class AlphaVantageClient:
-    """Client for fetching real-time stock prices from Alpha Vantage API."""
+# Sentinel returned by _parse_payload when the attempt should be retried
+_RETRY = object()
+
+
+class _AlphaVantageBase:
+    """Request building and response parsing shared by the sync and async clients."""
     
     BASE_URL = "https://www.alphavantage.co/query"
+    POOL_SIZE = 10
     
-    def __init__(self, api_key: str, timeout: int = 10, max_retries: int = 3):
+    def __init__(self, api_key: str, timeout: int = 10, max_retries: int = 3, rate_limiter: RateLimiter = None):
         if not api_key:
             api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
         
@@ -34,30 +48,26 @@ class AlphaVantageClient:
         self.api_key = api_key
         self.timeout = timeout
         self.max_retries = max_retries
-    
-    def get_price(self, ticker: str) -> float:
-        """Get current real-time price (GLOBAL_QUOTE)."""
-        params = {
+        # Every request (including retries) draws from the provider-wide quota
+        self._limiter = rate_limiter or get_rate_limiter()
+
+    def _quote_params(self, ticker: str) -> Dict:
+        return {
             "function": "GLOBAL_QUOTE",
             "symbol": ticker.upper(),
             "apikey": self.api_key
         }
-        return self._make_request(params, "05. price", "Global Quote")
 
-    def fetch_daily_history(self, ticker: str) -> pd.DataFrame:
-        """
-        Fetches the last 100 days of daily adjusted closing prices.
-        Uses TIME_SERIES_DAILY (Free Tier compatible).
-        """
-        params = {
+    def _history_params(self, ticker: str) -> Dict:
+        return {
             "function": "TIME_SERIES_DAILY",
             "symbol": ticker.upper(),
             "outputsize": "compact",
             "apikey": self.api_key
         }
 
-        data = self._make_request(params, parse_key="Time Series (Daily)")
-
+    @staticmethod
+    def _history_to_frame(ticker: str, data: Optional[Dict]) -> pd.DataFrame:
         rows = []
         if data:
             for date_str, metrics in data.items():
@@ -77,55 +87,308 @@ class AlphaVantageClient:
         df = df.sort_values('date').reset_index(drop=True)
         return df
 
-    def _make_request(self, params: Dict, parse_key: str = None, root_key: str = None) -> Union[float, Dict, None]:
+    def _parse_payload(self, data: Dict, params: Dict, parse_key: str, root_key: str, last_attempt: bool):
+        """Interprets one decoded response. Returns the value, or _RETRY to try again."""
+        if "Note" in data:
+            note = data["Note"].lower()
+            if "call frequency" in note or "rate limit" in note:
+                raise APIKeyExhausted(data["Note"])
+
+        if "Error Message" in data:
+            raise TickerNotFound(f"Ticker '{params.get('symbol')}' not found")
+
+        if root_key:
+            if root_key not in data:
+                 if last_attempt:
+                     raise APIError(f"Missing '{root_key}' in response")
+                 return _RETRY
+            data = data[root_key]
+
+        if parse_key:
+            if isinstance(data, dict) and parse_key in data:
+                if "Time Series" in parse_key:
+                    return data[parse_key]
+                try:
+                    return float(data[parse_key])
+                except ValueError:
+                    return data[parse_key]
+
+        if parse_key is None and root_key is None:
+            return data
+        
+        if last_attempt:
+             return None
+        return _RETRY
+
+
+class AlphaVantageClient(_AlphaVantageBase):
+    """Client for fetching real-time stock prices from Alpha Vantage API."""
+    
+    def __init__(
+        self,
+        api_key: str,
+        timeout: int = 10,
+        max_retries: int = 3,
+        session: requests.Session = None,
+        rate_limiter: RateLimiter = None
+    ):
+        super().__init__(api_key, timeout, max_retries, rate_limiter)
+        # Keep-alive connection pool, reused across calls (and threads)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_SIZE)
+            session.mount("https://", adapter)
+        self._session = session
+    
+    def get_price(self, ticker: str) -> float:
+        """Get current real-time price (GLOBAL_QUOTE)."""
+        return self._make_request(self._quote_params(ticker), "05. price", "Global Quote")
+
+    def fetch_daily_history(self, ticker: str, deadline: Optional[float] = None) -> pd.DataFrame:
+        """
+        Fetches the last 100 days of daily adjusted closing prices.
+        Uses TIME_SERIES_DAILY (Free Tier compatible).
+
+        `deadline` (time.monotonic()) bounds the rate-limiter wait and the HTTP call.
+        """
+        data = self._make_request(self._history_params(ticker), parse_key="Time Series (Daily)", deadline=deadline)
+        return self._history_to_frame(ticker, data)
+
+    def close(self):
+        self._session.close()
+
+    @staticmethod
+    def _time_left(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise APITimeout("Request deadline exceeded")
+        return left
+
+    def _make_request(
+        self,
+        params: Dict,
+        parse_key: str = None,
+        root_key: str = None,
+        deadline: Optional[float] = None
+    ) -> Union[float, Dict, None]:
         for attempt in range(self.max_retries):
+            last_attempt = attempt == self.max_retries - 1
             try:
-                response = requests.get(self.BASE_URL, params=params, timeout=self.timeout)
+                self._limiter.acquire(timeout=self._time_left(deadline))
+                left = self._time_left(deadline)
+                timeout = self.timeout if left is None else min(self.timeout, left)
+                response = self._session.get(self.BASE_URL, params=params, timeout=timeout)
                 response.raise_for_status()
-                data = response.json()
-                
-                if "Note" in data:
-                    note = data["Note"].lower()
-                    if "call frequency" in note or "rate limit" in note:
-                        raise APIKeyExhausted(data["Note"])
-
-                if "Error Message" in data:
-                    raise TickerNotFound(f"Ticker '{params.get('symbol')}' not found")
-
-                if root_key:
-                    if root_key not in data:
-                         if attempt == self.max_retries - 1:
-                             raise APIError(f"Missing '{root_key}' in response")
-                         continue
-                    data = data[root_key]
-
-                if parse_key:
-                    if isinstance(data, dict) and parse_key in data:
-                        if "Time Series" in parse_key:
-                            return data[parse_key]
-                        try:
-                            return float(data[parse_key])
-                        except ValueError:
-                            return data[parse_key]
-
-                if parse_key is None and root_key is None:
-                    return data
-                
-                if attempt == self.max_retries - 1:
-                     return None
+                result = self._parse_payload(response.json(), params, parse_key, root_key, last_attempt)
+                if result is not _RETRY:
+                    return result
 
             except requests.Timeout:
-                if attempt == self.max_retries - 1: raise APITimeout("Request timed out")
+                if last_attempt: raise APITimeout("Request timed out")
                 time.sleep(0.5)
             except requests.RequestException as e:
-                if attempt == self.max_retries - 1: raise APIError(f"API request failed: {str(e)}")
+                if last_attempt: raise APIError(f"API request failed: {str(e)}")
                 time.sleep(0.5)
         
         return None
 
+
+class AsyncAlphaVantageClient(_AlphaVantageBase):
+    """
+    asyncio version of AlphaVantageClient backed by a pooled keep-alive httpx client.
+    Same retry and error semantics; lets API routes await prices without
+    occupying a threadpool worker.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: int = 10,
+        max_retries: int = 3,
+        http_client: httpx.AsyncClient = None,
+        rate_limiter: RateLimiter = None
+    ):
+        super().__init__(api_key, timeout, max_retries, rate_limiter)
+        if http_client is None:
+            http_client = httpx.AsyncClient(
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=self.POOL_SIZE, max_keepalive_connections=self.POOL_SIZE)
+            )
+        self._http = http_client
+
+    async def get_price(self, ticker: str) -> float:
+        """Get current real-time price (GLOBAL_QUOTE)."""
+        return await self._make_request(self._quote_params(ticker), "05. price", "Global Quote")
+
+    async def fetch_daily_history(self, ticker: str) -> pd.DataFrame:
+        """Fetches the last 100 days of daily closing prices (TIME_SERIES_DAILY)."""
+        data = await self._make_request(self._history_params(ticker), parse_key="Time Series (Daily)")
+        return self._history_to_frame(ticker, data)
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    async def _make_request(self, params: Dict, parse_key: str = None, root_key: str = None) -> Union[float, Dict, None]:
+        for attempt in range(self.max_retries):
+            last_attempt = attempt == self.max_retries - 1
+            try:
+                await self._limiter.acquire_async()
+                response = await self._http.get(self.BASE_URL, params=params, timeout=self.timeout)
+                response.raise_for_status()
+                result = self._parse_payload(response.json(), params, parse_key, root_key, last_attempt)
+                if result is not _RETRY:
+                    return result
+
+            except httpx.TimeoutException:
+                if last_attempt: raise APITimeout("Request timed out")
+                await asyncio.sleep(0.5)
+            except (httpx.HTTPError, ValueError) as e:
+                # ValueError covers undecodable JSON (requests folds it into RequestException)
+                if last_attempt: raise APIError(f"API request failed: {str(e)}")
+                await asyncio.sleep(0.5)
+
+        return None
+
+class LocalPriceCache:
+    """
+    Bounded in-process LRU cache with per-entry TTL.
+    Sits in front of Redis (L1) so hot tickers are served without a network hop.
+
+    With keep_stale=True expired entries are kept (until LRU eviction) so they
+    can still be served via get_stale() while a refresh is running.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = L1_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = L1_CACHE_TTL_SECONDS,
+        keep_stale: bool = False
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.keep_stale = keep_stale
+        self._entries: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # ticker -> (price, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, ticker: str) -> Optional[float]:
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None and not self.keep_stale:
+                    del self._entries[ticker]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(ticker)
+            self.hits += 1
+            return entry[0]
+
+    def get_stale(self, ticker: str) -> Optional[float]:
+        """Returns the last known price, even if expired. Does not touch the counters."""
+        with self._lock:
+            entry = self._entries.get(ticker)
+            return entry[0] if entry is not None else None
+
+    def set(self, ticker: str, price: float):
+        with self._lock:
+            self._entries[ticker] = (price, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(ticker)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class SingleFlight:
+    """
+    Request coalescing: while a call for a key is running, concurrent callers
+    for the same key wait for its outcome instead of starting their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: str, fn: Callable[[], float]) -> float:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = Future()
+                self._calls[key] = call
+
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn()
+            call.set_result(result)
+            return result
+        except Exception as e:
+            call.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of SingleFlight: concurrent awaiters share one task per key."""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[float]]) -> float:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        # shield: one cancelled awaiter must not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+
 class CachedMarketDataService:
-    def __init__(self, client: AlphaVantageClient, redis_url: str = None):
+    PRICE_TTL_SECONDS = 300
+    MAX_FETCH_WORKERS = 8
+
+    def __init__(
+        self,
+        client: AlphaVantageClient,
+        redis_url: str = None,
+        local_cache: LocalPriceCache = None,
+        stale_while_revalidate: bool = False,
+        async_client: AsyncAlphaVantageClient = None
+    ):
         self._client = client
+        self._async_client = async_client
+        self._async_flight = AsyncSingleFlight()
+        self._aredis = None
+        self._stale_while_revalidate = stale_while_revalidate
+        self._local = local_cache or LocalPriceCache(keep_stale=stale_while_revalidate)
+        self._flight = SingleFlight()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="price-refresh")
+        self.stale_hits = 0
         self._redis_available = False
         
         if not redis_url:
@@ -135,22 +398,237 @@ class CachedMarketDataService:
             self._redis = redis.from_url(redis_url, socket_connect_timeout=1)
             self._redis.ping()
             self._redis_available = True
+            self._aredis = redis.asyncio.from_url(redis_url, socket_connect_timeout=1)
             logger.info("✅ Redis connected successfully. Caching enabled.")
         except (ConnectionError, TimeoutError, Exception):
             self._redis_available = False
 
-    def get_price(self, ticker: str) -> float:
-        if not self._redis_available:
-            return self._client.get_price(ticker)
-        try:
-            cached = self._redis.get(f"price:{ticker}")
-            if cached: return float(cached)
-        except Exception: pass
-        
+    @staticmethod
+    def _price_key(ticker: str) -> str:
+        return f"price:{ticker}"
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the in-process L1 cache."""
+        return {**self._local.stats(), "stale_hits": self.stale_hits}
+
+    def _store(self, ticker: str, price: float):
+        self._local.set(ticker, price)
+        if self._redis_available:
+            try: self._redis.setex(self._price_key(ticker), self.PRICE_TTL_SECONDS, str(price))
+            except Exception: pass
+
+    def _fetch_and_store(self, ticker: str) -> float:
         price = self._client.get_price(ticker)
-        
+        self._store(ticker, price)
+        return price
+
+    def _serve_stale(self, ticker: str) -> Optional[float]:
+        """
+        Stale-while-revalidate: returns the expired L1 value (if any) and makes
+        sure exactly one background refresh is running for the ticker.
+        """
+        if not self._stale_while_revalidate:
+            return None
+        stale = self._local.get_stale(ticker)
+        if stale is None:
+            return None
+
+        self.stale_hits += 1
+        if not self._flight.in_flight(ticker):
+            self._refresher.submit(self._refresh, ticker)
+        return stale
+
+    def _refresh(self, ticker: str):
+        try:
+            self._flight.do(ticker, lambda: self._fetch_and_store(ticker))
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {ticker}: {e}")
+
+    def get_price(self, ticker: str) -> float:
+        local = self._local.get(ticker)
+        if local is not None:
+            return local
+
         if self._redis_available:
-            try: self._redis.setex(f"price:{ticker}", 300, str(price))
+            try:
+                cached = self._redis.get(self._price_key(ticker))
+                if cached:
+                    price = float(cached)
+                    self._local.set(ticker, price)
+                    return price
+            except Exception: pass
+
+        stale = self._serve_stale(ticker)
+        if stale is not None:
+            return stale
+        
+        # Only one upstream fetch per ticker; concurrent callers share its result
+        return self._flight.do(ticker, lambda: self._fetch_and_store(ticker))
+
+    def get_prices(self, tickers: List[str]) -> Dict[str, float]:
+        """
+        Batch version of get_price.
+
+        L1 hits are served from memory, Redis hits are resolved with a single
+        MGET, misses are fetched from the API concurrently and written back
+        in one pipelined SETEX.
+        Raises the first upstream error (in request order) if any ticker
+        could not be priced; prices that did resolve are still cached.
+        """
+        symbols = list(dict.fromkeys(tickers))
+        prices = self._from_local(symbols)
+
+        remote = [t for t in symbols if t not in prices]
+        if self._redis_available and remote:
+            try:
+                self._merge_remote(remote, self._redis.mget([self._price_key(t) for t in remote]), prices)
+            except Exception: pass
+
+        self._merge_stale(symbols, prices)
+        misses = [t for t in symbols if t not in prices]
+        if not misses:
+            return prices
+
+        fetched, errors = self._fetch_concurrently(misses)
+        prices.update(fetched)
+        for ticker, price in fetched.items():
+            self._local.set(ticker, price)
+
+        if self._redis_available and fetched:
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for ticker, price in fetched.items():
+                    pipe.setex(self._price_key(ticker), self.PRICE_TTL_SECONDS, str(price))
+                pipe.execute()
+            except Exception: pass
+
+        self._raise_first_error(misses, errors)
+        return prices
+
+    def _from_local(self, symbols: List[str]) -> Dict[str, float]:
+        prices: Dict[str, float] = {}
+        for ticker in symbols:
+            local = self._local.get(ticker)
+            if local is not None:
+                prices[ticker] = local
+        return prices
+
+    def _merge_remote(self, remote: List[str], values: List, prices: Dict[str, float]):
+        for ticker, value in zip(remote, values):
+            if value:
+                prices[ticker] = float(value)
+                self._local.set(ticker, prices[ticker])
+
+    def _merge_stale(self, symbols: List[str], prices: Dict[str, float]):
+        for ticker in symbols:
+            if ticker not in prices:
+                stale = self._serve_stale(ticker)
+                if stale is not None:
+                    prices[ticker] = stale
+
+    @staticmethod
+    def _raise_first_error(misses: List[str], errors: Dict[str, Exception]):
+        for ticker in misses:
+            if ticker in errors:
+                error = errors[ticker]
+                # Callers report which ticker failed (TickerNotFound already carries it)
+                if getattr(error, "ticker", None) is None:
+                    error.ticker = ticker
+                raise error
+
+    def _fetch_concurrently(self, tickers: List[str]) -> Tuple[Dict[str, float], Dict[str, Exception]]:
+        """
+        Fetches live prices in parallel threads (coalesced per ticker).
+        Returns (prices, errors) keyed by ticker.
+        """
+        fetched: Dict[str, float] = {}
+        errors: Dict[str, Exception] = {}
+        workers = min(len(tickers), self.MAX_FETCH_WORKERS)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                ticker: pool.submit(self._flight.do, ticker, lambda t=ticker: self._client.get_price(t))
+                for ticker in tickers
+            }
+            for ticker, future in futures.items():
+                try:
+                    fetched[ticker] = future.result()
+                except Exception as e:
+                    errors[ticker] = e
+        return fetched, errors
+    
+    # --- ASYNC API (used by the FastAPI routes) ---
+
+    async def get_price_async(self, ticker: str) -> float:
+        """Non-blocking get_price. Falls back to a worker thread without an async client."""
+        local = self._local.get(ticker)
+        if local is not None:
+            return local
+
+        if self._async_client is None:
+            return await asyncio.to_thread(self.get_price, ticker)
+
+        if self._aredis is not None:
+            try:
+                cached = await self._aredis.get(self._price_key(ticker))
+                if cached:
+                    price = float(cached)
+                    self._local.set(ticker, price)
+                    return price
+            except Exception: pass
+
+        stale = self._serve_stale(ticker)
+        if stale is not None:
+            return stale
+
+        return await self._async_flight.do(ticker, lambda: self._fetch_and_store_async(ticker))
+
+    async def get_prices_async(self, tickers: List[str]) -> Dict[str, float]:
+        """Non-blocking get_prices: one MGET, concurrent fetches, one pipelined write-back."""
+        if self._async_client is None:
+            return await asyncio.to_thread(self.get_prices, tickers)
+
+        symbols = list(dict.fromkeys(tickers))
+        prices = self._from_local(symbols)
+
+        remote = [t for t in symbols if t not in prices]
+        if self._aredis is not None and remote:
+            try:
+                self._merge_remote(remote, await self._aredis.mget([self._price_key(t) for t in remote]), prices)
+            except Exception: pass
+
+        self._merge_stale(symbols, prices)
+        misses = [t for t in symbols if t not in prices]
+        if not misses:
+            return prices
+
+        results = await asyncio.gather(
+            *(self._async_flight.do(t, lambda t=t: self._async_client.get_price(t)) for t in misses),
+            return_exceptions=True
+        )
+        fetched = {t: r for t, r in zip(misses, results) if not isinstance(r, BaseException)}
+        errors = {t: r for t, r in zip(misses, results) if isinstance(r, BaseException)}
+
+        prices.update(fetched)
+        for ticker, price in fetched.items():
+            self._local.set(ticker, price)
+
+        if self._aredis is not None and fetched:
+            try:
+                async with self._aredis.pipeline(transaction=False) as pipe:
+                    for ticker, price in fetched.items():
+                        pipe.setex(self._price_key(ticker), self.PRICE_TTL_SECONDS, str(price))
+                    await pipe.execute()
+            except Exception: pass
+
+        self._raise_first_error(misses, errors)
+        return prices
+
+    async def _fetch_and_store_async(self, ticker: str) -> float:
+        price = await self._async_client.get_price(ticker)
+        self._local.set(ticker, price)
+        if self._aredis is not None:
+            try: await self._aredis.setex(self._price_key(ticker), self.PRICE_TTL_SECONDS, str(price))
             except Exception: pass
         return price
     
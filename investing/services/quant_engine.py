@@ -1,12 +1,97 @@
+import math
+import warnings
+from collections import deque
 import numpy as np
 import pandas as pd
-from typing import Tuple
+from typing import Tuple, Union, Iterable, Optional
+
+class RollingMetrics:
+    """
+    O(1)-per-bar version of QuantEngine.calculate_metrics for one ticker.
+
+    Keeps the last `window` prices and a sliding-window Welford mean/variance of
+    their daily returns, so appending a bar does not rescan the window. After each
+    update, metrics() equals calculate_metrics() over the last `window` prices.
+    """
+
+    def __init__(self, window: int = 100, momentum_window: int = 90, trading_days: int = 252):
+        if window < momentum_window:
+            raise ValueError("window must cover the momentum window")
+        self.window = window
+        self.momentum_window = momentum_window
+        self.trading_days = trading_days
+        self._prices: deque = deque(maxlen=window)
+        self._returns: deque = deque(maxlen=window - 1)
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def update(self, price: float) -> Tuple[float, float, float]:
+        """Appends one daily close (Oldest -> Newest) and returns the new metrics."""
+        self._push_price(price)
+        return self.metrics()
+
+    def extend(self, prices: Iterable[float]) -> Tuple[float, float, float]:
+        """Feeds a backfill of closes; returns the metrics after the last one."""
+        for price in prices:
+            self._push_price(price)
+        return self.metrics()
+
+    def _push_price(self, price: float):
+        price = float(price)
+        if self._prices:
+            prev = self._prices[-1]
+            # A 0.0 close (bad provider bar) has no defined return; count it as flat
+            # rather than letting inf poison the Welford state for a whole window
+            self._push_return(0.0 if prev == 0 else (price - prev) / prev)
+        self._prices.append(price)
+
+    def _push_return(self, value: float):
+        n = len(self._returns)
+        if n == self._returns.maxlen:
+            # Slide: replace the oldest return in one step, keeping n fixed
+            old = self._returns[0]
+            self._returns.append(value)
+            new_mean = self._mean + (value - old) / n
+            self._m2 += (value - old) * (value - new_mean + old - self._mean)
+            self._mean = new_mean
+        else:
+            self._returns.append(value)
+            delta = value - self._mean
+            self._mean += delta / (n + 1)
+            self._m2 += delta * (value - self._mean)
+
+        # Guard against tiny negative drift from float cancellation
+        if self._m2 < 0:
+            self._m2 = 0.0
+
+    def metrics(self) -> Tuple[float, float, float]:
+        """(momentum_score, volatility_score, final_score) for the current window."""
+        if len(self._prices) < self.momentum_window:
+            return 0.0, 0.0, 0.0
+
+        price_today = self._prices[-1]
+        price_90_ago = self._prices[-self.momentum_window]
+        momentum = 0.0 if price_90_ago == 0 else (price_today - price_90_ago) / price_90_ago
+
+        n = len(self._returns)
+        daily_std = math.sqrt(self._m2 / n) if n else 0.0
+        volatility = daily_std * math.sqrt(self.trading_days)
+
+        score = 0.0 if volatility == 0 else momentum / volatility
+        return float(momentum), float(volatility), float(score)
+
 
 class QuantEngine:
     """
     Performs quantitative analysis on historical price data.
     """
 
+    MOMENTUM_WINDOW = 90
+    TRADING_DAYS = 252
+
     def calculate_metrics(self, history: pd.DataFrame) -> Tuple[float, float, float]:
         """
         Calculates Momentum, Volatility, and Risk-Adjusted Score.
@@ -51,3 +136,67 @@ class QuantEngine:
             score = momentum / volatility
 
         return float(momentum), float(volatility), float(score)
+
+    def rolling(self, history: Optional[pd.DataFrame] = None, window: int = 100) -> RollingMetrics:
+        """
+        Starts an incremental tracker for one ticker, seeded from `history`
+        ('price' column, Oldest -> Newest). Call .update(price) for each new bar.
+        """
+        state = RollingMetrics(window=window, momentum_window=self.MOMENTUM_WINDOW, trading_days=self.TRADING_DAYS)
+        if history is not None and not history.empty:
+            state.extend(history['price'].values)
+        return state
+
+    def calculate_metrics_batch(
+        self, prices: Union[np.ndarray, pd.DataFrame]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized calculate_metrics for a whole universe in one pass.
+
+        Args:
+            prices: 2-D array (dates x tickers) or wide DataFrame (one column per ticker),
+                    rows sorted Oldest -> Newest. NaN marks a missing bar (e.g. a ticker
+                    with a shorter history); each column is scored on its non-NaN values.
+
+        Returns:
+            (momentum, volatility, score) arrays, one entry per column. Columns with
+            fewer than 90 valid prices score 0.0, same as calculate_metrics.
+        """
+        matrix = np.asarray(prices, dtype=float)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(-1, 1)
+
+        n_tickers = matrix.shape[1]
+        momentum = np.zeros(n_tickers)
+        volatility = np.zeros(n_tickers)
+        score = np.zeros(n_tickers)
+
+        valid_counts = (~np.isnan(matrix)).sum(axis=0)
+        eligible = valid_counts >= self.MOMENTUM_WINDOW
+        if not eligible.any():
+            return momentum, volatility, score
+
+        # Stable-sort NaNs to the top of each column so valid prices sit contiguously at
+        # the bottom in their original order (equivalent to a per-column dropna()).
+        order = np.argsort(~np.isnan(matrix[:, eligible]), axis=0, kind="stable")
+        packed = np.take_along_axis(matrix[:, eligible], order, axis=0)
+
+        with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+
+            # 1. Momentum (90-day Rate of Change)
+            price_today = packed[-1]
+            price_90_ago = packed[-self.MOMENTUM_WINDOW]
+            mom = np.where(price_90_ago == 0, 0.0, (price_today - price_90_ago) / price_90_ago)
+
+            # 2. Volatility: pairs touching a NaN yield NaN and are ignored by nanstd
+            daily_returns = np.diff(packed, axis=0) / packed[:-1]
+            vol = np.nanstd(daily_returns, axis=0) * np.sqrt(self.TRADING_DAYS)
+
+            # 3. Risk-Adjusted Score
+            sc = np.where(vol == 0, 0.0, mom / vol)
+
+        momentum[eligible] = mom
+        volatility[eligible] = vol
+        score[eligible] = sc
+        return momentum, volatility, score
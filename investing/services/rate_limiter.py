@@ -0,0 +1,207 @@
+"""Provider-wide token bucket shared by every Alpha Vantage caller.
+
+The bucket lives in Redis so uvicorn workers and the harvester draw from the
+same quota. If Redis is unreachable we fall back to an in-process bucket.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional, Tuple
+import redis
+import redis.asyncio
+
+from investing.config import RATE_LIMIT_PER_MINUTE, REDIS_URL
+from investing.exceptions import APIKeyExhausted
+
+logger = logging.getLogger(__name__)
+
+# Refill + take in one atomic step. Uses the Redis clock so all processes agree.
+# ARGV: capacity, refill rate (tokens/sec), tokens requested (0 = peek)
+# Returns: {wait_seconds, tokens_left} as strings (Lua numbers are truncated to ints)
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if requested > 0 then
+    if tokens >= requested then
+        tokens = tokens - requested
+    else
+        wait = (requested - tokens) / rate
+    end
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) * 2)
+return {tostring(wait), tostring(tokens)}
+"""
+
+
+class InMemoryTokenBucket:
+    """Thread-safe token bucket for a single process."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+        self._last_refill = now
+
+    def take(self, requested: float = 1) -> Tuple[float, float]:
+        """Takes tokens if available. Returns (seconds to wait, tokens left)."""
+        with self._lock:
+            self._refill()
+            if requested <= 0:
+                return 0.0, self._tokens
+            if self._tokens >= requested:
+                self._tokens -= requested
+                return 0.0, self._tokens
+            return (requested - self._tokens) / self.refill_per_second, self._tokens
+
+
+class RateLimiter:
+    """
+    Token bucket for an upstream provider (default: Alpha Vantage).
+
+    acquire() blocks only as long as needed for the next token, instead of a
+    fixed sleep. remaining_tokens() exposes the current budget as a metric.
+    The *_async variants talk to Redis through redis.asyncio, so waiting on
+    the bucket never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: int = RATE_LIMIT_PER_MINUTE,
+        redis_url: Optional[str] = REDIS_URL,
+        key: str = "ratelimit:alpha_vantage",
+        capacity: Optional[float] = None
+    ):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = float(capacity or rate_per_minute)
+        self.refill_per_second = rate_per_minute / 60.0
+        self.key = key
+        self._local = InMemoryTokenBucket(self.capacity, self.refill_per_second)
+        self._redis_url = redis_url
+        self._redis = None
+        self._script = None
+        # redis.asyncio connections belong to the loop that opened them: (loop, script)
+        self._async_script: Optional[Tuple[asyncio.AbstractEventLoop, object]] = None
+
+        if redis_url:
+            try:
+                client = redis.from_url(redis_url, socket_connect_timeout=1)
+                client.ping()
+                self._script = client.register_script(_TOKEN_BUCKET_LUA)
+                self._redis = client
+            except Exception:
+                logger.info("Redis unavailable, using in-process rate limiter.")
+
+    @property
+    def distributed(self) -> bool:
+        return self._redis is not None
+
+    def _take(self, requested: float = 1) -> Tuple[float, float]:
+        if self._redis is not None:
+            try:
+                wait, tokens = self._script(
+                    keys=[self.key],
+                    args=[self.capacity, self.refill_per_second, requested]
+                )
+                return float(wait), float(tokens)
+            except Exception as e:
+                logger.warning(f"Redis rate limiter failed ({e}), falling back to in-process bucket.")
+                self._redis = None
+        return self._local.take(requested)
+
+    def _get_async_script(self):
+        loop = asyncio.get_running_loop()
+        if self._async_script is None or self._async_script[0] is not loop:
+            client = redis.asyncio.from_url(self._redis_url, socket_connect_timeout=1)
+            self._async_script = (loop, client.register_script(_TOKEN_BUCKET_LUA))
+        return self._async_script[1]
+
+    async def _take_async(self, requested: float = 1) -> Tuple[float, float]:
+        # Redis is only used when the sync client connected at startup (same fallback rules as _take)
+        if self._redis is not None:
+            try:
+                wait, tokens = await self._get_async_script()(
+                    keys=[self.key],
+                    args=[self.capacity, self.refill_per_second, requested]
+                )
+                return float(wait), float(tokens)
+            except Exception as e:
+                logger.warning(f"Redis rate limiter failed ({e}), falling back to in-process bucket.")
+                self._redis = None
+        return self._local.take(requested)
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Blocks until a token is available. Returns the seconds spent waiting.
+
+        Raises:
+            APIKeyExhausted: If no token becomes available within `timeout` seconds.
+        """
+        waited = 0.0
+        while True:
+            wait, _ = self._take()
+            if wait <= 0:
+                return waited
+            if timeout is not None and waited + wait > timeout:
+                raise APIKeyExhausted(f"Rate budget exhausted: next token in {wait:.1f}s")
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> float:
+        """asyncio version of acquire(); yields to the event loop while waiting."""
+        waited = 0.0
+        while True:
+            wait, _ = await self._take_async()
+            if wait <= 0:
+                return waited
+            if timeout is not None and waited + wait > timeout:
+                raise APIKeyExhausted(f"Rate budget exhausted: next token in {wait:.1f}s")
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def remaining_tokens(self) -> float:
+        """Tokens currently available in the shared bucket (metric)."""
+        _, tokens = self._take(0)
+        return tokens
+
+    async def remaining_tokens_async(self) -> float:
+        _, tokens = await self._take_async(0)
+        return tokens
+
+
+# Process-wide limiter shared by all AlphaVantageClient instances
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_lock:
+            if _shared_limiter is None:
+                _shared_limiter = RateLimiter()
+    return _shared_limiter
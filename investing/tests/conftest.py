@@ -1,7 +1,12 @@
 """Pytest configuration and fixtures for WealthWise investing service."""
 import pytest
 import os
-from investing.models.base import _engine, _session_factory
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from investing.models.base import Base, _engine, _session_factory
 
 @pytest.fixture(autouse=True)
 def setup_test_env(monkeypatch):
@@ -22,3 +27,41 @@ def setup_test_env(monkeypatch):
     import investing.models.base
     investing.models.base._engine = None
     investing.models.base._session_factory = None
+    investing.models.base._async_engine = None
+    investing.models.base._async_session_factory = None
+
+
+@pytest.fixture(autouse=True)
+def unthrottled_rate_limiter(monkeypatch):
+    """Give every test its own generous in-process bucket (no Redis, no waiting)."""
+    from investing.services import rate_limiter
+    monkeypatch.setattr(
+        rate_limiter, "_shared_limiter",
+        rate_limiter.RateLimiter(rate_per_minute=60_000, redis_url=None)
+    )
+
+
+@pytest.fixture
+def api_db(tmp_path):
+    """
+    File-backed SQLite for API tests. `session` is a sync Session for seeding and
+    assertions; `get_db` is a dependency override yielding AsyncSessions on the same file.
+    """
+    path = tmp_path / "api.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    # NullPool: TestClient may run requests on a different event loop per client
+    async_factory = async_sessionmaker(
+        create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool),
+        expire_on_commit=False
+    )
+
+    async def get_db():
+        async with async_factory() as async_session:
+            yield async_session
+
+    yield SimpleNamespace(session=session, get_db=get_db)
+    session.close()
+    engine.dispose()
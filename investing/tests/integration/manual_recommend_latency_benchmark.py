@@ -0,0 +1,133 @@
+"""
+Latency benchmark for POST /portfolio/recommend (not collected by pytest).
+
+Drives the app in-process through httpx's ASGI transport with N concurrent
+clients. The DB is a seeded temp SQLite file and the market service is a stub
+with a fixed upstream delay, so the numbers measure the server's concurrency
+model (event loop vs. Starlette's threadpool), not Alpha Vantage.
+
+Works against both the sync-route and async-route versions of the app, so
+before/after numbers come from running it on each checkout:
+
+    python -m investing.tests.integration.manual_recommend_latency_benchmark --clients 500
+"""
+import argparse
+import asyncio
+import inspect
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from investing.api import main
+from investing.api.dependencies import get_db, get_market_service, get_allocation_engine
+from investing.models.base import Base
+from investing.models.etf_universe import EtfUniverse
+from investing.services.allocation_engine import AllocationEngine
+
+
+class StubMarket:
+    """Prices every ticker at $100 after a fixed delay (a cache miss / Redis round trip)."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def get_prices(self, tickers: List[str]) -> Dict[str, float]:
+        time.sleep(self.delay)
+        return {t: 100.0 for t in tickers}
+
+    async def get_prices_async(self, tickers: List[str]) -> Dict[str, float]:
+        await asyncio.sleep(self.delay)
+        return {t: 100.0 for t in tickers}
+
+
+def seed_db(path: Path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add(EtfUniverse(ticker="XLK", sector="Technology", momentum_score=0.25, volatility=0.1, last_price=150.0))
+        session.commit()
+    engine.dispose()
+
+
+def db_override(path: Path):
+    """get_db override matching the app's flavour (AsyncSession for async routes)."""
+    if inspect.iscoroutinefunction(main.recommend_portfolio):
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        factory = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{path}"), expire_on_commit=False)
+
+        async def override():
+            async with factory() as session:
+                yield session
+        return override
+
+    factory = sessionmaker(bind=create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}, poolclass=NullPool
+    ))
+
+    def override():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+    return override
+
+
+async def run_client(client: httpx.AsyncClient, requests: int, latencies: List[float]):
+    for i in range(requests):
+        payload = {"balance": 500.0 + i, "risk_profile": "balanced"}
+        started = time.perf_counter()
+        response = await client.post("/portfolio/recommend", json=payload)
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+
+
+async def run_benchmark(clients: int, requests_per_client: int, upstream_delay: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        seed_db(path)
+
+        engine = AllocationEngine()
+        market = StubMarket(upstream_delay)
+        main.app.dependency_overrides[get_db] = db_override(path)
+        main.app.dependency_overrides[get_market_service] = lambda: market
+        main.app.dependency_overrides[get_allocation_engine] = lambda: engine
+
+        latencies: List[float] = []
+        transport = httpx.ASGITransport(app=main.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                # Warm up the snapshot and connection setup
+                await run_client(client, 1, [])
+                started = time.perf_counter()
+                await asyncio.gather(*(
+                    run_client(client, requests_per_client, latencies) for _ in range(clients)
+                ))
+                elapsed = time.perf_counter() - started
+        finally:
+            main.app.dependency_overrides.clear()
+
+    ordered = sorted(latencies)
+    p = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    mode = "async" if inspect.iscoroutinefunction(main.recommend_portfolio) else "sync"
+    print(f"📊 /portfolio/recommend ({mode} routes), {clients} clients x {requests_per_client} requests, "
+          f"upstream delay {upstream_delay * 1000:.0f}ms")
+    print(f"   Throughput: {len(ordered) / elapsed:.0f} req/s")
+    print(f"   p50: {p(0.50):.1f}ms  p95: {p(0.95):.1f}ms  p99: {p(0.99):.1f}ms  "
+          f"mean: {statistics.mean(ordered) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=4, help="requests per client")
+    parser.add_argument("--upstream-delay", type=float, default=0.02, help="seconds")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.clients, args.requests, args.upstream_delay))
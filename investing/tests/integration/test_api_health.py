@@ -1,31 +1,17 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import MagicMock
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool  # CRITICAL IMPORT
+from unittest.mock import MagicMock, AsyncMock
 
 from investing.api.main import app
 from investing.api.dependencies import get_db, get_market_service
-from investing.models.base import Base
 from investing.services.market_data import CachedMarketDataService, TickerNotFound, APIError
 
 class TestApiHealth:
     
     @pytest.fixture
-    def test_db(self):
-        """In-memory DB for testing /health endpoint."""
-        # CRITICAL FIX: Disable thread checking for SQLite in tests
-        engine = create_engine(
-            "sqlite:///:memory:",
-            connect_args={"check_same_thread": False},
-            poolclass=StaticPool
-        )
-        Base.metadata.create_all(engine)
-        SessionLocal = sessionmaker(bind=engine)
-        session = SessionLocal()
-        yield session
-        session.close()
+    def test_db(self, api_db):
+        """Seedable DB; the app gets AsyncSessions on the same file."""
+        return api_db.session
 
     @pytest.fixture
     def mock_market_service(self):
@@ -34,17 +20,14 @@ class TestApiHealth:
         return mock
 
     @pytest.fixture
-    def client(self, test_db, mock_market_service):
+    def client(self, api_db, mock_market_service):
         """
         Standard FastAPI TestClient.
         """
-        def override_get_db():
-            yield test_db
-
         def override_get_service():
             return mock_market_service
 
-        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_db] = api_db.get_db
         app.dependency_overrides[get_market_service] = override_get_service
         
         with TestClient(app) as c:
@@ -69,7 +52,7 @@ class TestApiHealth:
         Expectation: Status 200 (API is up) but body says 'degraded'.
         """
         # Mock a broken DB session
-        mock_broken_db = MagicMock()
+        mock_broken_db = AsyncMock()
         mock_broken_db.execute.side_effect = Exception("Connection Refused")
         
         # Override dependency just for this test
@@ -86,7 +69,7 @@ class TestApiHealth:
 
     def test_get_price_valid_ticker(self, client, mock_market_service):
         """Scenario: Service returns valid float."""
-        mock_market_service.get_price.return_value = 150.25
+        mock_market_service.get_price_async.return_value = 150.25
         
         response = client.get("/market/price/VOO")
         
@@ -98,7 +81,7 @@ class TestApiHealth:
 
     def test_get_price_ticker_not_found(self, client, mock_market_service):
         """Scenario: Service cannot find ticker."""
-        mock_market_service.get_price.side_effect = TickerNotFound("Bad Ticker")
+        mock_market_service.get_price_async.side_effect = TickerNotFound("Bad Ticker")
         
         response = client.get("/market/price/INVALID")
         
@@ -108,7 +91,7 @@ class TestApiHealth:
 
     def test_get_price_upstream_failure(self, client, mock_market_service):
         """Scenario: Alpha Vantage is down -> HTTP 503."""
-        mock_market_service.get_price.side_effect = APIError("Rate limit exceeded")
+        mock_market_service.get_price_async.side_effect = APIError("Rate limit exceeded")
         
         response = client.get("/market/price/VOO")
         
@@ -118,7 +101,7 @@ class TestApiHealth:
 
     def test_ticker_case_insensitivity(self, client, mock_market_service):
         """Scenario: User sends 'voo', API returns 'VOO'."""
-        mock_market_service.get_price.return_value = 400.00
+        mock_market_service.get_price_async.return_value = 400.00
         
         response = client.get("/market/price/voo")
         
@@ -1,31 +1,17 @@
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 
 from investing.api.main import app
 from investing.api.dependencies import get_db, get_market_service, get_allocation_engine
-from investing.models.base import Base
 from investing.services.market_data import CachedMarketDataService, APIError
 from investing.services.allocation_engine import AllocationEngine, ETFAllocation
 
 class TestApiRecommend:
     
     @pytest.fixture
-    def test_db(self):
-        # Thread-safe SQLite setup
-        engine = create_engine(
-            "sqlite:///:memory:", 
-            connect_args={"check_same_thread": False}, 
-            poolclass=StaticPool
-        )
-        Base.metadata.create_all(engine)
-        SessionLocal = sessionmaker(bind=engine)
-        session = SessionLocal()
-        yield session
-        session.close()
+    def test_db(self, api_db):
+        return api_db.session
 
     @pytest.fixture
     def mock_market(self):
@@ -36,8 +22,8 @@ class TestApiRecommend:
         return MagicMock(spec=AllocationEngine)
 
     @pytest.fixture
-    def client(self, test_db, mock_market, mock_engine):
-        app.dependency_overrides[get_db] = lambda: test_db
+    def client(self, api_db, mock_market, mock_engine):
+        app.dependency_overrides[get_db] = api_db.get_db
         app.dependency_overrides[get_market_service] = lambda: mock_market
         app.dependency_overrides[get_allocation_engine] = lambda: mock_engine
         
@@ -53,13 +39,15 @@ class TestApiRecommend:
         Scenario: User asks for $1000 Growth.
         """
         # 1. Setup Engine Mock: 80% VOO, 20% BND
-        mock_engine.recommend_portfolio.return_value = [
+        mock_engine.recommend_portfolio_async.return_value = [
             ETFAllocation(ticker="VOO", weight=0.8),
             ETFAllocation(ticker="BND", weight=0.2)
         ]
         
         # 2. Setup Market Mock: VOO=$400, BND=$100
-        mock_market.get_price.side_effect = lambda ticker: 400.0 if ticker == "VOO" else 100.0
+        mock_market.get_prices_async.side_effect = lambda tickers: {
+            t: 400.0 if t == "VOO" else 100.0 for t in tickers
+        }
         
         # 3. Call API
         payload = {"balance": 1000, "risk_profile": "growth"}
@@ -83,10 +71,10 @@ class TestApiRecommend:
         Scenario: Balance $50 (Tier 1).
         Verifies: Logic respects Engine's override (100% VOO).
         """
-        mock_engine.recommend_portfolio.return_value = [
+        mock_engine.recommend_portfolio_async.return_value = [
             ETFAllocation(ticker="VOO", weight=1.0)
         ]
-        mock_market.get_price.return_value = 400.0
+        mock_market.get_prices_async.return_value = {"VOO": 400.0}
         
         payload = {"balance": 50, "risk_profile": "growth"}
         response = client.post("/portfolio/recommend", json=payload)
@@ -100,10 +88,10 @@ class TestApiRecommend:
 
     def test_recommend_fails_if_market_down(self, client, mock_engine, mock_market):
         """Scenario: Market data service fails."""
-        mock_engine.recommend_portfolio.return_value = [
+        mock_engine.recommend_portfolio_async.return_value = [
             ETFAllocation(ticker="VOO", weight=1.0)
         ]
-        mock_market.get_price.side_effect = APIError("AlphaVantage Down")
+        mock_market.get_prices_async.side_effect = APIError("AlphaVantage Down")
         
         payload = {"balance": 1000}
         response = client.post("/portfolio/recommend", json=payload)
@@ -113,7 +101,7 @@ class TestApiRecommend:
 
     def test_engine_logic_error_handling(self, client, mock_engine):
         """Scenario: Engine raises logic error."""
-        mock_engine.recommend_portfolio.side_effect = ValueError("Logic Error")
+        mock_engine.recommend_portfolio_async.side_effect = ValueError("Logic Error")
         
         payload = {"balance": 1000}
         response = client.post("/portfolio/recommend", json=payload)
@@ -0,0 +1,124 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+
+from investing.api import main
+from investing.api.main import app
+from investing.api.dependencies import get_db, get_market_service, get_allocation_engine
+from investing.models.etf_universe import EtfUniverse
+from investing.config import RECOMMEND_BATCH_MAX_ITEMS
+from investing.services.market_data import CachedMarketDataService, APIError, TickerNotFound
+from investing.services.allocation_engine import AllocationEngine
+
+class TestApiRecommendBatch:
+
+    @pytest.fixture
+    def test_db(self, api_db):
+        session = api_db.session
+        session.add(EtfUniverse(ticker="XLK", sector="Technology", momentum_score=0.25, volatility=0.1, last_price=150.0))
+        session.commit()
+        return session
+
+    @pytest.fixture
+    def mock_market(self):
+        market = MagicMock(spec=CachedMarketDataService)
+        market.get_prices_async.side_effect = lambda tickers: {t: 100.0 for t in tickers}
+        return market
+
+    @pytest.fixture
+    def engine(self):
+        return AllocationEngine()
+
+    @pytest.fixture
+    def client(self, api_db, test_db, mock_market, engine):
+        app.dependency_overrides[get_db] = api_db.get_db
+        app.dependency_overrides[get_market_service] = lambda: mock_market
+        app.dependency_overrides[get_allocation_engine] = lambda: engine
+
+        with TestClient(app) as c:
+            yield c
+
+        app.dependency_overrides.clear()
+
+    PAYLOAD = {"requests": [
+        {"balance": 50, "risk_profile": "growth"},
+        {"balance": 1000, "risk_profile": "conservative"},
+        {"balance": 5000},
+    ]}
+
+    def test_batch_matches_single_calls(self, client):
+        response = client.post("/portfolio/recommend/batch", json=self.PAYLOAD)
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert len(results) == 3
+
+        for item, result in zip(self.PAYLOAD["requests"], results):
+            single = client.post("/portfolio/recommend", json=item).json()
+            assert result["allocations"] == single["allocations"]
+            assert result["total_balance"] == item["balance"]
+
+    def test_universe_and_prices_resolved_once(self, client, engine, mock_market):
+        with patch.object(engine, "_read_watermark", wraps=engine._read_watermark) as watermark:
+            response = client.post("/portfolio/recommend/batch", json=self.PAYLOAD)
+
+        assert response.status_code == 200
+        assert watermark.call_count <= 1
+        mock_market.get_prices_async.assert_called_once()
+        tickers = mock_market.get_prices_async.call_args.args[0]
+        assert len(tickers) == len(set(tickers))
+        assert "XLK" in tickers
+
+    def test_ndjson_when_requested(self, client):
+        response = client.post(
+            "/portfolio/recommend/batch",
+            json=self.PAYLOAD,
+            headers={"Accept": "application/x-ndjson"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["total_balance"] for line in lines] == [50, 1000, 5000]
+
+    def test_large_batch_streams(self, client, monkeypatch):
+        monkeypatch.setattr(main, "RECOMMEND_BATCH_STREAM_THRESHOLD", 2)
+
+        response = client.post("/portfolio/recommend/batch", json=self.PAYLOAD)
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert len(response.text.splitlines()) == 3
+
+    def test_batch_over_limit_rejected(self, client, mock_market):
+        payload = {"requests": [{"balance": 1000}] * (RECOMMEND_BATCH_MAX_ITEMS + 1)}
+
+        response = client.post("/portfolio/recommend/batch", json=payload)
+
+        assert response.status_code == 422
+        errors = response.json()["detail"]
+        assert [e["type"] for e in errors] == ["too_long"]  # rejected as a whole, items never validated
+        mock_market.get_prices_async.assert_not_called()
+
+    def test_batch_fails_if_market_down(self, client, mock_market):
+        mock_market.get_prices_async.side_effect = APIError("AlphaVantage Down")
+
+        response = client.post("/portfolio/recommend/batch", json=self.PAYLOAD)
+
+        assert response.status_code == 503
+        assert "Unable to price asset" in response.json()["detail"]
+
+    def test_batch_503_names_only_the_failed_ticker(self, client, mock_market):
+        mock_market.get_prices_async.side_effect = TickerNotFound("BND")
+
+        response = client.post("/portfolio/recommend/batch", json=self.PAYLOAD)
+
+        assert response.status_code == 503
+        detail = response.json()["detail"]
+        assert detail.startswith("Unable to price asset BND:")
+        assert "VOO" not in detail
+
+    def test_empty_batch_rejected(self, client):
+        response = client.post("/portfolio/recommend/batch", json={"requests": []})
+
+        assert response.status_code == 422
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from investing.models.base import Base
+from investing.models.etf_universe import EtfUniverse
+from investing.repositories.etf_universe_repository import EtfUniverseRepository
+
+def _row(ticker: str, momentum: float, sector: str = "Technology") -> dict:
+    return {
+        "ticker": ticker,
+        "sector": sector,
+        "momentum_score": momentum,
+        "volatility": 0.2,
+        "last_price": 100.0,
+    }
+
+class TestEtfUniverseBulkUpsert:
+
+    @pytest.fixture
+    def engine(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        return engine
+
+    @pytest.fixture
+    def session(self, engine):
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+
+    @pytest.fixture
+    def repo(self, session):
+        return EtfUniverseRepository(session)
+
+    def test_inserts_new_rows(self, repo, session):
+        assert repo.bulk_upsert([_row("XLK", 0.1), _row("XLF", 0.2, "Financials")]) == 2
+        assert session.query(EtfUniverse).count() == 2
+
+    def test_updates_existing_rows_and_keeps_sector(self, repo, session):
+        session.add(EtfUniverse(ticker="XLK", sector="Tech (legacy)", momentum_score=0.1, volatility=0.1, last_price=50.0))
+        session.flush()
+
+        repo.bulk_upsert([_row("XLK", 0.35)])
+
+        xlk = session.get(EtfUniverse, "XLK")
+        assert xlk.momentum_score == 0.35
+        assert xlk.last_price == 100.0
+        assert xlk.sector == "Tech (legacy)"
+
+    def test_whole_universe_in_one_statement(self, repo, engine):
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        repo.bulk_upsert([_row(f"T{i}", i / 100) for i in range(50)])
+
+        upserts = [s for s in statements if s.startswith("INSERT INTO etf_universe")]
+        assert len(upserts) == 1
+        assert "ON CONFLICT" in upserts[0]
+
+    def test_large_batches_are_chunked(self, repo, session):
+        repo.UPSERT_CHUNK_SIZE = 10
+        repo.bulk_upsert([_row(f"T{i}", 0.0) for i in range(25)])
+        assert session.query(EtfUniverse).count() == 25
+
+    def test_empty_batch_is_noop(self, repo):
+        assert repo.bulk_upsert([]) == 0
@@ -1,13 +1,9 @@
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 
 from investing.api.main import app
 from investing.api.dependencies import get_db, get_market_service, get_allocation_engine
-from investing.models.base import Base
 from investing.models.etf_universe import EtfUniverse
 from investing.services.market_data import CachedMarketDataService
 from investing.services.allocation_engine import AllocationEngine
@@ -15,18 +11,8 @@ from investing.services.allocation_engine import AllocationEngine
 class TestFullDynamicFlow:
     
     @pytest.fixture
-    def test_db(self):
-        # In-memory SQLite for full isolation
-        engine = create_engine(
-            "sqlite:///:memory:", 
-            connect_args={"check_same_thread": False}, 
-            poolclass=StaticPool
-        )
-        Base.metadata.create_all(engine)
-        SessionLocal = sessionmaker(bind=engine)
-        session = SessionLocal()
-        yield session
-        session.close()
+    def test_db(self, api_db):
+        return api_db.session
 
     @pytest.fixture
     def mock_market(self):
@@ -34,12 +20,13 @@ class TestFullDynamicFlow:
         m = MagicMock(spec=CachedMarketDataService)
         # Return generic prices for any ticker
         m.get_price.side_effect = lambda t: 100.00
+        m.get_prices_async.side_effect = lambda tickers: {t: 100.00 for t in tickers}
         return m
 
     @pytest.fixture
-    def client(self, test_db, mock_market):
+    def client(self, api_db, mock_market):
         # Override dependencies to use our test DB and mock market
-        app.dependency_overrides[get_db] = lambda: test_db
+        app.dependency_overrides[get_db] = api_db.get_db
         app.dependency_overrides[get_market_service] = lambda: mock_market
         # Use real allocation engine logic
         app.dependency_overrides[get_allocation_engine] = lambda: AllocationEngine()
@@ -0,0 +1,167 @@
+import threading
+import time
+import pytest
+import pandas as pd
+import requests
+from unittest.mock import Mock, patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from investing.models.base import Base
+from investing.models.etf_universe import EtfUniverse
+from investing.services.harvester import Harvester
+from investing.services.market_data import AlphaVantageClient
+from investing.services.rate_limiter import RateLimiter
+from investing.exceptions import APIError, APIKeyExhausted, TickerNotFound
+
+def _history(periods: int = 100) -> pd.DataFrame:
+    return pd.DataFrame({
+        'date': pd.bdate_range(start="2024-01-01", periods=periods),
+        'price': [100.0 + i for i in range(periods)],
+    })
+
+class TestHarvesterConcurrency:
+
+    WATCHLIST = {"XLK": "Technology", "XLF": "Financials", "XLV": "Healthcare", "XLE": "Energy"}
+
+    @pytest.fixture
+    def session(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        with patch("investing.services.harvester.get_session_context") as ctx:
+            ctx.return_value.__enter__.return_value = session
+            yield session
+        session.close()
+
+    @pytest.fixture
+    def harvester(self, monkeypatch):
+        monkeypatch.setattr(Harvester, "SECTOR_WATCHLIST", dict(self.WATCHLIST))
+        with patch("investing.services.harvester.AlphaVantageClient"):
+            h = Harvester(max_workers=4, ticker_timeout=60, max_attempts=3)
+        return h
+
+    def test_downloads_overlap(self, harvester, session):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def fetch(ticker, deadline=None):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return _history()
+        harvester.client.fetch_daily_history.side_effect = fetch
+
+        report = harvester.run()
+
+        assert peak[0] > 1
+        assert len(report.updated) == 4
+        assert session.query(EtfUniverse).count() == 4
+
+    def test_transient_errors_are_retried(self, harvester, session):
+        calls = {}
+
+        def flaky(ticker, deadline=None):
+            calls[ticker] = calls.get(ticker, 0) + 1
+            if ticker == "XLF" and calls[ticker] < 3:
+                raise APIError("503 from upstream")
+            return _history()
+        harvester.client.fetch_daily_history.side_effect = flaky
+
+        with patch("investing.services.harvester.time.sleep"):
+            report = harvester.run()
+
+        xlf = next(r for r in report.results if r.ticker == "XLF")
+        assert xlf.status == "updated"
+        assert xlf.attempts == 3
+        assert report.failed == []
+
+    def test_failures_are_reported_not_raised(self, harvester, session):
+        def fetch(ticker, deadline=None):
+            if ticker == "XLE":
+                raise TickerNotFound(ticker)
+            if ticker == "XLV":
+                raise APIError("still down")
+            return _history()
+        harvester.client.fetch_daily_history.side_effect = fetch
+
+        with patch("investing.services.harvester.time.sleep"):
+            report = harvester.run()
+
+        failed = {r.ticker: r for r in report.failed}
+        assert set(failed) == {"XLE", "XLV"}
+        assert failed["XLE"].attempts == 1  # unknown tickers are not retried
+        assert failed["XLV"].attempts == 3
+        assert len(report.updated) == 2
+        assert "2 failed" in report.summary()
+
+    def test_retry_budget_respects_ticker_timeout(self, harvester, session):
+        harvester.ticker_timeout = 1.0
+        harvester.client.fetch_daily_history.side_effect = APIError("down")
+
+        with patch("investing.services.harvester.time.sleep") as sleep:
+            report = harvester.run()
+
+        assert all(r.attempts == 1 for r in report.failed)
+        assert "timed out" in report.failed[0].error
+        sleep.assert_not_called()
+
+    def test_exhausted_quota_is_not_retried(self, harvester, session):
+        harvester.client.fetch_daily_history.side_effect = APIKeyExhausted("Rate budget exhausted")
+
+        with patch("investing.services.harvester.time.sleep") as sleep:
+            report = harvester.run()
+
+        assert len(report.failed) == 4
+        assert all(r.attempts == 1 for r in report.failed)
+        sleep.assert_not_called()
+
+    def test_client_makes_one_request_per_attempt(self):
+        with patch("investing.services.harvester.AlphaVantageClient") as client:
+            Harvester()
+        assert client.call_args.kwargs["max_retries"] == 1
+
+
+class TestHarvesterDeadline:
+    """A real client whose upstream hangs: the ticker budget must bound the whole fetch."""
+
+    @pytest.fixture
+    def harvester(self, monkeypatch):
+        monkeypatch.setattr(Harvester, "SECTOR_WATCHLIST", {"XLK": "Technology"})
+        h = Harvester(max_workers=1, ticker_timeout=0.3, max_attempts=3)
+        h.client = AlphaVantageClient(
+            api_key="test", max_retries=1, session=Mock(spec=requests.Session),
+            rate_limiter=RateLimiter(rate_per_minute=60_000, redis_url=None)
+        )
+        return h
+
+    def test_hanging_request_is_cut_at_the_deadline(self, harvester):
+        timeouts = []
+
+        def hang(url, params=None, timeout=None):
+            timeouts.append(timeout)
+            time.sleep(timeout)  # the socket gives up when the timeout passed to it expires
+            raise requests.Timeout()
+        harvester.client._session.get.side_effect = hang
+
+        started = time.monotonic()
+        outcome = harvester._fetch_history("XLK")
+
+        assert time.monotonic() - started < 1.0
+        assert outcome.history is None
+        assert "timed out" in outcome.error
+        assert timeouts and all(t <= 0.3 for t in timeouts)
+
+    def test_rate_limiter_wait_is_bounded_by_the_deadline(self, harvester):
+        harvester.client._limiter = RateLimiter(rate_per_minute=1, redis_url=None)
+        harvester.client._limiter.acquire()  # next token is a minute away
+
+        started = time.monotonic()
+        outcome = harvester._fetch_history("XLK")
+
+        assert time.monotonic() - started < 1.0
+        assert outcome.attempts == 1
+        assert "exhausted" in outcome.error
+        harvester.client._session.get.assert_not_called()
@@ -0,0 +1,242 @@
+import pytest
+import pandas as pd
+from uuid import uuid4
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from investing.api.main import app
+from investing.api.dependencies import get_db
+from investing.models.base import Base
+from investing.models.user import User
+from investing.models.etf_universe import EtfUniverse
+from investing.models.portfolio_valuation import PortfolioValuation
+from investing.models.transaction import TransactionType
+from investing.repositories.portfolio_repository import PortfolioRepository, BulkOrder
+from investing.repositories.valuation_repository import PortfolioValuationRepository
+from investing.repositories.etf_universe_repository import EtfUniverseRepository
+from investing.repositories.price_history_repository import PriceHistoryRepository
+from investing.services.harvester import Harvester
+
+class TestPortfolioValuations:
+
+    @pytest.fixture
+    def session(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: session.statements.append(args[2]))
+        session.add(EtfUniverse(ticker="VOO", sector="Broad", momentum_score=0.0, volatility=0.1, last_price=120.0))
+        session.commit()
+        yield session
+        session.close()
+
+    @pytest.fixture
+    def repo(self, session):
+        return PortfolioRepository(session)
+
+    @pytest.fixture
+    def valuations(self, session):
+        return PortfolioValuationRepository(session)
+
+    def _portfolio(self, repo, session, cash=10_000.00, risk_profile="balanced"):
+        user = User(email=f"val_{uuid4()}@example.com")
+        session.add(user)
+        session.commit()
+        portfolio = repo.create_portfolio(user.id, risk_profile)
+        repo.update_balance(portfolio.id, cash)
+        return portfolio
+
+    def test_trade_refreshes_snapshot(self, repo, valuations, session):
+        portfolio = self._portfolio(repo, session)
+
+        repo.execute_trade(portfolio.id, "VOO", TransactionType.BUY, 10, 100.00)
+        session.commit()
+
+        v = valuations.get(portfolio.id)
+        assert float(v.cash_balance) == 9000.00
+        assert float(v.cost_basis) == 1000.00
+        assert float(v.market_value) == 1200.00  # priced at etf_universe.last_price
+        assert float(v.total_value) == 10_200.00
+        assert float(v.unrealized_pnl) == 200.00
+        assert v.unpriced_positions == 0
+
+    def test_unpriced_holding_valued_at_cost(self, repo, valuations, session):
+        portfolio = self._portfolio(repo, session)
+
+        repo.execute_trade(portfolio.id, "VTI", TransactionType.BUY, 5, 200.00)
+
+        v = valuations.get(portfolio.id)
+        assert float(v.market_value) == 1000.00
+        assert float(v.unrealized_pnl) == 0.00
+        assert v.unpriced_positions == 1
+
+    def test_drift_against_target_weights(self, repo, valuations, session):
+        portfolio = self._portfolio(repo, session, cash=50.00)
+        assert valuations.get(portfolio.id).drift == 1.0  # all cash, target is 100% VOO
+
+        repo.execute_trade(portfolio.id, "VOO", TransactionType.BUY, 0.5, 100.00)
+        # 60 VOO + 0 cash: exactly the one-ETF tier
+        assert valuations.get(portfolio.id).drift == 0.0
+
+    def test_unknown_risk_profile_does_not_block_trading(self, repo, valuations, session):
+        portfolio = self._portfolio(repo, session, risk_profile="aggressive_plus")
+
+        repo.execute_trade(portfolio.id, "VOO", TransactionType.BUY, 10, 100.00)
+
+        v = valuations.get(portfolio.id)
+        assert float(v.total_value) == 10_200.00
+        assert v.drift is None  # no target weights to drift from
+
+    def test_price_update_refreshes_holders_only(self, repo, valuations, session):
+        holder = self._portfolio(repo, session)
+        other = self._portfolio(repo, session)
+        repo.execute_trade(holder.id, "VOO", TransactionType.BUY, 10, 100.00)
+        repo.execute_trade(other.id, "VTI", TransactionType.BUY, 10, 100.00)
+        session.commit()
+        other_valued_at = valuations.get(other.id).valued_at
+
+        EtfUniverseRepository(session).bulk_upsert([
+            {"ticker": "VOO", "sector": "Broad", "momentum_score": 0.0, "volatility": 0.1, "last_price": 150.0}
+        ])
+        assert valuations.refresh_for_tickers(["VOO"]) == 1
+
+        assert float(valuations.get(holder.id).market_value) == 1500.00
+        assert float(valuations.get(holder.id).unrealized_pnl) == 500.00
+        assert valuations.get(other.id).valued_at == other_valued_at
+
+    def test_harvest_revalues_holders(self, repo, valuations, session, monkeypatch):
+        portfolio = self._portfolio(repo, session)
+        repo.execute_trade(portfolio.id, "XLK", TransactionType.BUY, 10, 100.00)
+        session.commit()
+        assert valuations.get(portfolio.id).unpriced_positions == 1
+
+        monkeypatch.setattr(Harvester, "SECTOR_WATCHLIST", {"XLK": "Technology"})
+        history = pd.DataFrame({"price": [100.0] * 99 + [180.0], "date": pd.date_range("2023-01-01", periods=100)})
+        with patch("investing.services.harvester.AlphaVantageClient") as client, \
+             patch("investing.services.harvester.get_session_context") as ctx:
+            client.return_value.fetch_daily_history.return_value = history
+            ctx.return_value.__enter__.return_value = session
+            Harvester().run()
+
+        v = valuations.get(portfolio.id)
+        assert v.unpriced_positions == 0
+        assert float(v.market_value) == 1800.00
+
+    def test_core_holding_priced_from_history(self, repo, valuations, session):
+        portfolio = self._portfolio(repo, session)
+        repo.execute_trade(portfolio.id, "BND", TransactionType.BUY, 10, 80.00)
+        assert valuations.get(portfolio.id).unpriced_positions == 1
+
+        bars = pd.DataFrame({"date": pd.bdate_range("2024-01-01", periods=3), "price": [85.0, 88.0, 90.0]})
+        PriceHistoryRepository(session).add_bars("BND", bars)
+        valuations.refresh_for_tickers(["BND"])
+
+        v = valuations.get(portfolio.id)
+        assert v.unpriced_positions == 0
+        assert float(v.market_value) == 900.00  # newest close, not the first bar
+        assert float(v.unrealized_pnl) == 100.00
+
+    def test_harvest_reprices_core_holdings(self, repo, valuations, session, monkeypatch):
+        portfolio = self._portfolio(repo, session)
+        repo.execute_trade(portfolio.id, "BND", TransactionType.BUY, 10, 80.00)
+        session.commit()
+
+        monkeypatch.setattr(Harvester, "SECTOR_WATCHLIST", {"XLK": "Technology"})
+        history = pd.DataFrame({"price": [80.0] * 99 + [95.0], "date": pd.date_range("2023-01-01", periods=100)})
+        with patch("investing.services.harvester.AlphaVantageClient") as client, \
+             patch("investing.services.harvester.get_session_context") as ctx:
+            client.return_value.fetch_daily_history.return_value = history
+            ctx.return_value.__enter__.return_value = session
+            report = Harvester().run()
+
+        assert {r.ticker for r in report.prices} == {"VOO", "VTI", "VXUS", "BND", "AGG"}
+        assert "BND" not in {r.ticker for r in report.results}  # priced, never scored
+        v = valuations.get(portfolio.id)
+        assert float(v.market_value) == 950.00
+        assert float(v.unrealized_pnl) == 150.00
+
+    def test_bulk_orders_refresh_every_traded_portfolio(self, repo, valuations, session):
+        portfolios = [self._portfolio(repo, session, cash=1000.00) for _ in range(3)]
+
+        repo.execute_bulk_orders([BulkOrder(p.id, "VOO", TransactionType.BUY, 2, 100.00) for p in portfolios])
+
+        for p in portfolios:
+            assert float(valuations.get(p.id).market_value) == 240.00
+            assert float(valuations.get(p.id).cash_balance) == 800.00
+
+    def test_read_is_one_primary_key_lookup(self, repo, valuations, session):
+        portfolio = self._portfolio(repo, session)
+        session.statements.clear()
+
+        valuations.get(portfolio.id)
+
+        assert len(session.statements) == 1
+        assert "FROM portfolio_valuations" in session.statements[0]
+        assert "WHERE portfolio_valuations.portfolio_id = ?" in session.statements[0]
+
+    def test_new_portfolio_has_a_snapshot(self, repo, valuations, session):
+        user = User(email=f"val_{uuid4()}@example.com")
+        session.add(user)
+        session.commit()
+
+        portfolio = repo.create_portfolio(user.id, "balanced")
+
+        assert float(valuations.get(portfolio.id).total_value) == 0.00
+
+    def test_refresh_all_backfills(self, repo, valuations, session):
+        portfolio = self._portfolio(repo, session)
+        session.query(PortfolioValuation).delete()
+
+        assert valuations.refresh_all() == 1
+        assert float(valuations.get(portfolio.id).total_value) == 10_000.00
+
+
+class TestValuationApi:
+
+    @pytest.fixture
+    def portfolio(self, api_db):
+        session = api_db.session
+        user = User(email=f"val_api_{uuid4()}@example.com")
+        session.add(user)
+        session.commit()
+        repo = PortfolioRepository(session)
+        portfolio = repo.create_portfolio(user.id, "growth")
+        repo.update_balance(portfolio.id, 500.00)
+        session.commit()
+        return portfolio
+
+    @pytest.fixture
+    def client(self, api_db):
+        app.dependency_overrides[get_db] = api_db.get_db
+        with TestClient(app) as c:
+            yield c
+        app.dependency_overrides.clear()
+
+    def test_valuation_endpoint_reads_snapshot(self, client, portfolio):
+        with patch.object(PortfolioValuationRepository, "compute") as compute:
+            response = client.get(f"/portfolio/{portfolio.id}/valuation")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total_value"] == 500.00
+        assert body["unrealized_pnl"] == 0.00
+        assert body["drift"] == 1.0
+        compute.assert_not_called()
+
+    def test_valuation_endpoint_computes_missing_snapshot_without_storing(self, client, portfolio, api_db):
+        session = api_db.session
+        session.query(PortfolioValuation).filter_by(portfolio_id=portfolio.id).delete()
+        session.commit()
+
+        response = client.get(f"/portfolio/{portfolio.id}/valuation")
+
+        assert response.status_code == 200
+        assert response.json()["total_value"] == 500.00
+        session.expire_all()
+        assert session.query(PortfolioValuation).filter_by(portfolio_id=portfolio.id).count() == 0
+
+    def test_valuation_endpoint_unknown_portfolio(self, client):
+        assert client.get(f"/portfolio/{uuid4()}/valuation").status_code == 404
@@ -0,0 +1,112 @@
+import pytest
+import pandas as pd
+from datetime import date, datetime, timezone
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from investing.models.base import Base
+from investing.models.price_history import PriceBar
+from investing.repositories.price_history_repository import PriceHistoryRepository
+from investing.services.harvester import Harvester, latest_session_date
+
+def _bars(start: str, periods: int, first_price: float = 100.0) -> pd.DataFrame:
+    dates = pd.bdate_range(start=start, periods=periods)
+    return pd.DataFrame({'date': dates, 'price': [first_price + i for i in range(periods)]})
+
+class TestPriceHistoryRepository:
+
+    @pytest.fixture
+    def session(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+
+    @pytest.fixture
+    def repo(self, session):
+        return PriceHistoryRepository(session)
+
+    def test_empty_store(self, repo):
+        assert repo.get_last_date("XLK") is None
+        assert repo.get_history("XLK").empty
+
+    def test_add_and_read_back_sorted(self, repo):
+        repo.add_bars("XLK", _bars("2024-01-01", 5).iloc[::-1])
+
+        history = repo.get_history("XLK")
+        assert list(history.columns) == ['date', 'price']
+        assert history.iloc[0]['price'] == 100.0
+        assert history.iloc[-1]['price'] == 104.0
+        assert repo.get_last_date("XLK") == date(2024, 1, 5)
+
+    def test_only_newer_bars_are_written(self, repo, session):
+        repo.add_bars("XLK", _bars("2024-01-01", 5))
+        added = repo.add_bars("XLK", _bars("2024-01-01", 7), after=repo.get_last_date("XLK"))
+
+        assert added == 2
+        assert session.query(PriceBar).filter_by(ticker="XLK").count() == 7
+
+    def test_history_limited_to_latest_bars(self, repo):
+        repo.add_bars("XLK", _bars("2024-01-01", 150))
+
+        history = repo.get_history("XLK", limit=100)
+        assert len(history) == 100
+        assert history.iloc[-1]['price'] == 249.0
+
+
+class TestIncrementalHarvest:
+
+    def test_latest_session_date_skips_weekend_and_open_session(self):
+        # Saturday -> Friday
+        assert latest_session_date(datetime(2024, 1, 6, 23, tzinfo=timezone.utc)) == date(2024, 1, 5)
+        # Monday before close -> previous Friday
+        assert latest_session_date(datetime(2024, 1, 8, 15, tzinfo=timezone.utc)) == date(2024, 1, 5)
+        # Monday after close -> Monday
+        assert latest_session_date(datetime(2024, 1, 8, 22, tzinfo=timezone.utc)) == date(2024, 1, 8)
+
+    @pytest.fixture
+    def session(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+
+    @pytest.fixture
+    def harvester(self, monkeypatch):
+        monkeypatch.setattr(Harvester, "SECTOR_WATCHLIST", {"XLK": "Technology", "XLF": "Financials"})
+        with patch("investing.services.harvester.AlphaVantageClient"):
+            yield Harvester()
+
+    def test_first_harvest_seeds_store(self, harvester, session):
+        assert harvester._tickers_to_fetch(session) == list(Harvester.SECTOR_WATCHLIST)
+
+        result = harvester._process_ticker(session, "XLK", "Technology", _bars("2024-01-01", 100))
+
+        assert result.status == "updated"
+        assert session.query(PriceBar).count() == 100
+
+    def test_current_store_makes_no_api_call(self, harvester, session):
+        PriceHistoryRepository(session).add_bars("XLK", _bars("2024-01-01", 100))
+
+        with patch("investing.services.harvester.latest_session_date", return_value=date(2024, 5, 17)):
+            to_fetch = harvester._tickers_to_fetch(session)
+
+        assert "XLK" not in to_fetch
+        result = harvester._process_ticker(session, "XLK", "Technology")
+        assert result.status == "updated"
+        harvester.client.fetch_daily_history.assert_not_called()
+
+    def test_stale_store_appends_only_missing_bars(self, harvester, session):
+        repo = PriceHistoryRepository(session)
+        repo.add_bars("XLK", _bars("2024-01-01", 100))
+
+        with patch("investing.services.harvester.latest_session_date", return_value=date(2024, 5, 20)):
+            assert "XLK" in harvester._tickers_to_fetch(session)
+
+        harvester._process_ticker(session, "XLK", "Technology", _bars("2024-01-01", 101))
+
+        assert session.query(PriceBar).count() == 101
+        history = repo.get_history("XLK", limit=harvester.HISTORY_WINDOW)
+        assert history.iloc[-1]['price'] == 200.0
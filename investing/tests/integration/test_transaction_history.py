@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
+from fastapi.testclient import TestClient
+
+from investing.api.main import app
+from investing.api.dependencies import get_db
+from investing.models.user import User
+from investing.models.transaction import Transaction, TransactionType
+from investing.repositories.portfolio_repository import PortfolioRepository
+
+class TestTransactionHistory:
+
+    @pytest.fixture
+    def session(self, api_db):
+        return api_db.session
+
+    @pytest.fixture
+    def repo(self, session):
+        return PortfolioRepository(session)
+
+    @pytest.fixture
+    def portfolio(self, repo, session):
+        user = User(email=f"history_{uuid4()}@example.com")
+        session.add(user)
+        session.commit()
+        portfolio = repo.create_portfolio(user.id, "growth")
+
+        # 25 transactions over 10 distinct dates, so many rows share a timestamp
+        start = datetime(2024, 1, 1)
+        session.add_all([
+            Transaction(
+                portfolio_id=portfolio.id,
+                ticker="VOO",
+                transaction_type=TransactionType.BUY,
+                shares=1,
+                price_per_share=100 + i,
+                total_amount=100 + i,
+                transaction_date=start + timedelta(days=i % 10)
+            )
+            for i in range(25)
+        ])
+        session.commit()
+        return portfolio
+
+    @pytest.fixture
+    def client(self, api_db):
+        app.dependency_overrides[get_db] = api_db.get_db
+        with TestClient(app) as c:
+            yield c
+        app.dependency_overrides.clear()
+
+    def _expected_order(self, session, portfolio):
+        rows = session.query(Transaction).filter_by(portfolio_id=portfolio.id).all()
+        rows.sort(key=lambda t: (t.transaction_date, t.id), reverse=True)
+        return [t.id for t in rows]
+
+    # --- REPOSITORY ---
+
+    def test_pages_cover_history_without_gaps_or_overlap(self, repo, session, portfolio):
+        seen, after = [], None
+        while True:
+            rows, after = repo.get_transactions_page(portfolio.id, limit=7, after=after)
+            seen.extend(t.id for t in rows)
+            if after is None:
+                break
+
+        assert seen == self._expected_order(session, portfolio)
+
+    def test_last_full_page_has_no_next_key(self, repo, portfolio):
+        rows, after = repo.get_transactions_page(portfolio.id, limit=25)
+        assert len(rows) == 25
+        assert after is None
+
+    # --- API ---
+
+    def test_api_cursor_walks_all_pages(self, client, session, portfolio):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+            response = client.get(f"/portfolio/{portfolio.id}/transactions", params=params)
+            assert response.status_code == 200
+            page = response.json()
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == [str(i) for i in self._expected_order(session, portfolio)]
+        assert page["items"][0]["transaction_type"] == "BUY"
+
+    def test_api_limit_is_capped(self, client, portfolio):
+        response = client.get(f"/portfolio/{portfolio.id}/transactions", params={"limit": 100000})
+        assert response.status_code == 422
+
+    def test_api_bad_cursor(self, client, portfolio):
+        response = client.get(f"/portfolio/{portfolio.id}/transactions", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    def test_api_unknown_portfolio(self, client):
+        assert client.get(f"/portfolio/{uuid4()}/transactions").status_code == 404
+        assert client.get(f"/portfolio/{uuid4()}/transactions/export").status_code == 404
+
+    def test_export_ndjson(self, client, session, portfolio):
+        response = client.get(f"/portfolio/{portfolio.id}/transactions/export")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["id"] for line in lines] == [str(i) for i in self._expected_order(session, portfolio)]
+
+    def test_export_csv(self, client, portfolio):
+        response = client.get(f"/portfolio/{portfolio.id}/transactions/export", params={"format": "csv"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attachment" in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 25
+        assert rows[0]["ticker"] == "VOO"
+        assert float(rows[0]["total_amount"]) >= 100
@@ -1,13 +1,14 @@
 import pytest
 import math
+import time
 from uuid import uuid4
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import IntegrityError
 from investing.models.base import Base, GUID
 from investing.models.user import User
 from investing.models.transaction import TransactionType, Transaction
-from investing.repositories.portfolio_repository import PortfolioRepository
+from investing.repositories.portfolio_repository import PortfolioRepository, TradeLeg, BulkOrder
 
 class TestTransactions:
     
@@ -18,6 +19,8 @@ class TestTransactions:
         Base.metadata.create_all(engine)
         Session = sessionmaker(bind=engine)
         session = Session()
+        session.statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: session.statements.append(args[2]))
         yield session
         session.close()
 
@@ -201,4 +204,168 @@ class TestTransactions:
         txs = session.query(Transaction).filter_by(portfolio_id=portfolio.id).all()
         assert len(txs) == 2
         assert txs[0].transaction_type == TransactionType.BUY
-        assert txs[1].transaction_type == TransactionType.SELL
\ No newline at end of file
+        assert txs[1].transaction_type == TransactionType.SELL
+
+    # --- 6. MULTI-LEG EXECUTION ---
+
+    def test_rebalance_applies_all_legs(self, repo, portfolio):
+        """Sells fund later buys; each ticker ends with the right shares and avg cost."""
+        repo.update_balance(portfolio.id, 100.00)
+        repo.add_or_update_holding(portfolio.id, "VOO", 10, 100.00)
+        repo.add_or_update_holding(portfolio.id, "BND", 4, 50.00)
+
+        txs = repo.execute_trades(portfolio.id, [
+            TradeLeg("VOO", TransactionType.SELL, 5, 120.00),   # +600
+            TradeLeg("BND", TransactionType.SELL, 4, 55.00),    # +220, position closed
+            TradeLeg("VTI", TransactionType.BUY, 3, 200.00),    # -600
+            TradeLeg("VOO", TransactionType.BUY, 1, 130.00),    # -130
+        ])
+
+        assert [t.ticker for t in txs] == ["VOO", "BND", "VTI", "VOO"]
+        holdings = {h.ticker: h for h in repo.get_holdings(portfolio.id)}
+        assert set(holdings) == {"VOO", "VTI"}
+        assert holdings["VOO"].shares == 6.0
+        # (5 * 100 + 1 * 130) / 6 = 105
+        assert holdings["VOO"].avg_cost_per_share == 105.00
+        assert holdings["VTI"].avg_cost_per_share == 200.00
+        assert repo.get_by_id(portfolio.id).cash_balance == 190.00
+
+    def test_failed_leg_changes_nothing(self, repo, portfolio, session):
+        """Validation spans all legs: a bad last leg leaves cash, holdings and log untouched."""
+        repo.update_balance(portfolio.id, 1000.00)
+        repo.add_or_update_holding(portfolio.id, "VOO", 2, 100.00)
+
+        with pytest.raises(ValueError, match="Insufficient funds"):
+            repo.execute_trades(portfolio.id, [
+                TradeLeg("VOO", TransactionType.BUY, 5, 100.00),
+                TradeLeg("VTI", TransactionType.BUY, 10, 100.00),
+            ])
+
+        assert repo.get_by_id(portfolio.id).cash_balance == 1000.00
+        assert [(h.ticker, h.shares) for h in repo.get_holdings(portfolio.id)] == [("VOO", 2.0)]
+        assert session.query(Transaction).count() == 0
+
+    def test_one_lock_one_holdings_select_one_insert(self, repo, portfolio, session):
+        repo.update_balance(portfolio.id, 10_000.00)
+        repo.add_or_update_holding(portfolio.id, "VOO", 10, 100.00)
+        session.statements.clear()
+
+        repo.execute_trades(portfolio.id, [
+            TradeLeg(t, TransactionType.BUY, 1, 100.00) for t in ("VOO", "VTI", "BND", "VXUS")
+        ])
+
+        statements = [s.split()[0] for s in session.statements]
+        assert statements.count("SELECT") == 3  # lock, holdings, valuation refresh
+        assert statements.count("INSERT") == 3  # new holdings (one executemany) + transactions + valuation upsert
+        txs_inserts = [s for s in session.statements if s.startswith("INSERT INTO transactions")]
+        assert len(txs_inserts) == 1
+        assert session.statements[-1].startswith("INSERT INTO portfolio_valuations")
+
+    def test_empty_legs_is_noop(self, repo, portfolio):
+        assert repo.execute_trades(portfolio.id, []) == []
+
+    def test_non_trade_side_rejected(self, repo, portfolio):
+        with pytest.raises(ValueError, match="Unsupported trade side"):
+            repo.execute_trades(portfolio.id, [TradeLeg("VOO", TransactionType.DEPOSIT, 1, 1.00)])
+
+
+    # --- 7. CROSS-PORTFOLIO BULK ORDERS ---
+
+    def _make_portfolios(self, repo, session, n, cash):
+        users = [User(email=f"sweep_{uuid4()}@example.com") for _ in range(n)]
+        session.add_all(users)
+        session.commit()
+        portfolios = [repo.create_portfolio(u.id, "balanced") for u in users]
+        for p in portfolios:
+            p.cash_balance = cash
+        session.commit()
+        return portfolios
+
+    def test_bulk_orders_report_per_order_results(self, repo, session):
+        a, b = self._make_portfolios(repo, session, 2, 100.00)
+        repo.add_or_update_holding(b.id, "BND", 2, 50.00)
+        session.commit()
+
+        results = repo.execute_bulk_orders([
+            BulkOrder(a.id, "VOO", TransactionType.BUY, 0.5, 100.00),   # filled: a=50
+            BulkOrder(a.id, "VTI", TransactionType.BUY, 1, 80.00),      # rejected: only $50 left
+            BulkOrder(b.id, "BND", TransactionType.SELL, 2, 60.00),     # filled: b=220, BND closed
+            BulkOrder(b.id, "VOO", TransactionType.BUY, 2, 100.00),     # filled (funded by the sell): b=20
+            BulkOrder(uuid4(), "VOO", TransactionType.BUY, 1, 1.00),    # rejected: unknown portfolio
+            BulkOrder(a.id, "VOO", TransactionType.BUY, 0, 1.00),       # rejected: validation
+        ])
+
+        assert [r.status for r in results] == ["filled", "rejected", "filled", "filled", "rejected", "rejected"]
+        assert "Insufficient funds" in results[1].error
+        assert "not found" in results[4].error
+        assert "Shares must be positive" in results[5].error
+
+        assert repo.get_by_id(a.id).cash_balance == 50.00
+        assert repo.get_by_id(b.id).cash_balance == 20.00
+        assert [(h.ticker, h.shares) for h in repo.get_holdings(a.id)] == [("VOO", 0.5)]
+        assert [(h.ticker, h.shares, h.avg_cost_per_share) for h in repo.get_holdings(b.id)] == [("VOO", 2.0, 100.00)]
+        assert session.query(Transaction).count() == 3
+
+    def test_bulk_buy_updates_existing_holding_avg_cost(self, repo, session):
+        (p,) = self._make_portfolios(repo, session, 1, 5000.00)
+        repo.add_or_update_holding(p.id, "VOO", 10, 100.00)
+        session.commit()
+
+        (result,) = repo.execute_bulk_orders([BulkOrder(p.id, "VOO", TransactionType.BUY, 10, 200.00)])
+
+        assert result.filled
+
+        (h,) = repo.get_holdings(p.id)
+        assert h.shares == 20.0
+        assert h.avg_cost_per_share == 150.00
+
+    def test_bulk_orders_match_sequential_execution(self, repo, session):
+        """Same final state as calling execute_trade per order."""
+        bulk = self._make_portfolios(repo, session, 3, 500.00)
+        seq = self._make_portfolios(repo, session, 3, 500.00)
+        plan = [
+            (0, "VOO", TransactionType.BUY, 2, 100.00), (1, "VOO", TransactionType.BUY, 6, 100.00),
+            (0, "VOO", TransactionType.SELL, 1, 150.00), (2, "BND", TransactionType.BUY, 3, 33.33),
+            (0, "VOO", TransactionType.BUY, 3, 120.00), (2, "BND", TransactionType.SELL, 3, 40.00),
+        ]
+
+        repo.execute_bulk_orders([BulkOrder(bulk[i].id, t, side, n, px) for i, t, side, n, px in plan])
+        for i, t, side, n, px in plan:
+            try:
+                with session.begin_nested():
+                    repo.execute_trade(seq[i].id, t, side, n, px)
+            except ValueError:
+                pass
+
+        session.commit()
+        session.expire_all()
+        for b, s_ in zip(bulk, seq):
+            assert repo.get_by_id(b.id).cash_balance == repo.get_by_id(s_.id).cash_balance
+            assert [(h.ticker, h.shares, h.avg_cost_per_share) for h in repo.get_holdings(b.id)] == \
+                   [(h.ticker, h.shares, h.avg_cost_per_share) for h in repo.get_holdings(s_.id)]
+
+    def test_bulk_orders_lock_in_ascending_id_order(self, repo, session):
+        portfolios = self._make_portfolios(repo, session, 3, 100.00)
+        ids = sorted((p.id for p in portfolios), key=str)
+        session.statements.clear()
+
+        repo.execute_bulk_orders([BulkOrder(pid, "VOO", TransactionType.BUY, 1, 1.00) for pid in reversed(ids)])
+
+        lock = next(s for s in session.statements if s.startswith("SELECT portfolios.id"))
+        assert "ORDER BY portfolios.id" in lock
+
+    @pytest.mark.slow
+    def test_bulk_orders_scale(self, repo, session):
+        portfolios = self._make_portfolios(repo, session, 2_000, 1000.00)
+        orders = [
+            BulkOrder(p.id, ticker, TransactionType.BUY, 1, 10.00)
+            for p in portfolios for ticker in ("VOO", "VTI", "BND", "VXUS", "AGG")
+        ]
+
+        started = time.perf_counter()
+        results = repo.execute_bulk_orders(orders)
+        elapsed = time.perf_counter() - started
+
+        assert all(r.filled for r in results)
+        assert session.query(Transaction).count() == 10_000
+        assert elapsed < 10
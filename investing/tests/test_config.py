@@ -32,3 +32,23 @@ class TestConfig:
         """Verify ENVIRONMENT configuration exists (dev/prod)."""
         assert hasattr(config, "ENVIRONMENT")
         assert config.ENVIRONMENT in ("development", "production", "test")
+
+
+class TestAsyncDatabaseUrl:
+    """The API's async engine uses the async driver for the configured backend."""
+
+    @pytest.mark.parametrize("url, expected", [
+        ("postgresql://user:pw@db/wealthwise", "postgresql+asyncpg://user:pw@db/wealthwise"),
+        ("postgresql+psycopg2://user:pw@db/wealthwise", "postgresql+asyncpg://user:pw@db/wealthwise"),
+        ("sqlite:///wealthwise.db", "sqlite+aiosqlite:///wealthwise.db"),
+    ])
+    def test_driver_is_swapped(self, monkeypatch, url, expected):
+        from investing.models.base import get_async_database_url
+        monkeypatch.setenv("DATABASE_URL", url)
+        assert get_async_database_url() == expected
+
+    def test_unsupported_backend_raises(self, monkeypatch):
+        from investing.models.base import get_async_database_url
+        monkeypatch.setenv("DATABASE_URL", "mysql://user:pw@db/wealthwise")
+        with pytest.raises(ValueError, match="No async driver"):
+            get_async_database_url()
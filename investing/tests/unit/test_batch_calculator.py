@@ -1,5 +1,6 @@
 import pytest
 import math
+import numpy as np
 from investing.services.batch_calculator import BatchCalculator
 
 class TestBatchCalculator:
@@ -153,3 +154,55 @@ class TestBatchCalculator:
         )
         # sqrt(4 / 0.0005) = sqrt(8000) = ~89.4427
         assert math.isclose(rec.batch_size_dollars, 89.44, rel_tol=1e-2)
+
+
+class TestBatchCalculatorVectorized:
+
+    @pytest.fixture
+    def calculator(self):
+        return BatchCalculator()
+
+    def test_matches_scalar_version(self, calculator):
+        rng = np.random.default_rng(7)
+        n = 2_000
+        accumulation = rng.uniform(0.5, 500.0, n)
+        cost = rng.choice([0.0, 0.5, 1.0, 5.0, 70_000.0], n)
+        daily_return = rng.uniform(1e-9, 1e-3, n)
+
+        batch, days = calculator.calculate_optimal_batch_vectorized(accumulation, cost, daily_return)
+
+        for i in range(n):
+            rec = calculator.calculate_optimal_batch(accumulation[i], cost[i], daily_return[i])
+            assert days[i] == rec.days_to_wait
+            assert math.isclose(batch[i], rec.batch_size_dollars, abs_tol=0.01)
+
+    def test_zero_cost_and_cap_masks(self, calculator):
+        batch, days = calculator.calculate_optimal_batch_vectorized(
+            daily_accumulation=[10.0, 1.0, 1.0, 10.0],
+            fixed_cost_per_trade=[0.0, 66612.5, 70000.0, 5.0],
+            expected_daily_return=[0.0003, 1.0, 1.0, 1e-9]
+        )
+        assert days.tolist() == [0, 365, 365, 365]
+        assert batch[0] == 0.0
+        assert batch[2] == 365.0
+        assert batch[3] == 3650.0
+        assert days.dtype == np.int64
+
+    def test_scalars_broadcast(self, calculator):
+        batch, days = calculator.calculate_optimal_batch_vectorized(np.full(3, 10.0), 5.0)
+        assert batch.shape == days.shape == (3,)
+        assert days.tolist() == [5, 5, 5]
+
+    def test_underflowing_denominator_hits_cap(self, calculator):
+        batch, days = calculator.calculate_optimal_batch_vectorized([1e-200], [5.0], [1e-200])
+        assert days.tolist() == [365]
+
+    @pytest.mark.parametrize("kwargs, match", [
+        ({"daily_accumulation": [10.0, 0.0], "fixed_cost_per_trade": 5.0}, "accumulation must be positive"),
+        ({"daily_accumulation": 10.0, "fixed_cost_per_trade": 5.0, "expected_daily_return": [0.001, 0.0]}, "return must be positive"),
+        ({"daily_accumulation": 10.0, "fixed_cost_per_trade": [5.0, -1.0]}, "cost cannot be negative"),
+        ({"daily_accumulation": [10.0, np.nan], "fixed_cost_per_trade": 5.0}, "accumulation must be positive"),
+    ])
+    def test_invalid_element_rejects_batch(self, calculator, kwargs, match):
+        with pytest.raises(ValueError, match=match):
+            calculator.calculate_optimal_batch_vectorized(**kwargs)
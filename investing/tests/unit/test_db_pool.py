@@ -0,0 +1,97 @@
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from investing.models import base
+from investing.models.pooling import (
+    TimedQueuePool,
+    TimedAsyncQueuePool,
+    engine_options,
+    instrument_engine,
+)
+
+class TestEngineOptions:
+
+    def test_postgres_pool_settings_and_statement_timeout(self):
+        options = engine_options("postgresql://user:pw@db/wealthwise")
+
+        assert options["poolclass"] is TimedQueuePool
+        assert options["pool_pre_ping"] is True
+        assert options["pool_size"] == 10
+        assert options["max_overflow"] == 20
+        assert options["pool_recycle"] == 1800
+        assert options["connect_args"] == {"options": "-c statement_timeout=30000"}
+
+    def test_asyncpg_statement_timeout_uses_server_settings(self):
+        options = engine_options("postgresql+asyncpg://user:pw@db/wealthwise", is_async=True)
+
+        assert options["poolclass"] is TimedAsyncQueuePool
+        assert options["connect_args"] == {"server_settings": {"statement_timeout": "30000"}}
+
+    def test_memory_sqlite_uses_static_pool(self):
+        options = engine_options("sqlite:///:memory:")
+        assert options["poolclass"] is StaticPool
+        assert "pool_size" not in options
+
+    def test_file_sqlite_has_no_statement_timeout(self):
+        assert "connect_args" not in engine_options("sqlite:///wealthwise.db")
+
+
+class TestPoolMetrics:
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=5
+        )
+        yield engine
+        engine.dispose()
+
+    def test_in_use_counts(self, engine):
+        metrics = instrument_engine(engine)
+
+        with engine.connect():
+            assert metrics.snapshot()["in_use"] == 1
+        snap = metrics.snapshot()
+        assert snap["in_use"] == 0
+        assert snap["peak_in_use"] == 1
+        assert snap["checkouts"] == 1
+
+    def test_records_checkout_wait_when_pool_exhausted(self, engine):
+        metrics = instrument_engine(engine)
+        held = engine.connect()
+
+        def release():
+            time.sleep(0.1)
+            held.close()
+
+        threading.Thread(target=release).start()
+        with engine.connect():
+            pass
+
+        assert metrics.snapshot()["max_wait_ms"] >= 50
+
+    def test_metrics_survive_dispose(self, engine):
+        metrics = instrument_engine(engine)
+        engine.dispose()
+        with engine.connect():
+            pass
+        assert engine.pool.metrics is metrics
+        assert metrics.snapshot()["checkouts"] == 1
+
+    def test_file_sqlite_runs_in_wal_mode(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+        instrument_engine(engine)
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        engine.dispose()
+
+    def test_get_engine_registers_metrics(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'app.db'}")
+        monkeypatch.setattr(base, "_pool_metrics", {})
+
+        with base.get_engine().connect():
+            assert base.get_pool_metrics()["sync"]["in_use"] == 1
+        base.get_engine().dispose()
@@ -17,15 +17,15 @@ class TestDynamicAllocation:
         # Scenario: Tech (XLK) is winning with 15% momentum
         winner = EtfUniverse(ticker="XLK", momentum_score=0.15)
         
-        # Setup the query chain: session.execute(stmt).scalars().first()
-        session.execute.return_value.scalars.return_value.first.return_value = winner
+        # Setup the query chain: session.execute(stmt).scalars().all()
+        session.execute.return_value.scalars.return_value.all.return_value = [winner]
         return session
 
     @pytest.fixture
     def empty_db(self):
         """Mocks a database with NO data."""
         session = MagicMock()
-        session.execute.return_value.scalars.return_value.first.return_value = None
+        session.execute.return_value.scalars.return_value.all.return_value = []
         return session
 
     def test_dynamic_tilt_applied(self, engine, mock_db):
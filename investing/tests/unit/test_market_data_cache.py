@@ -1,9 +1,13 @@
+import asyncio
 import pytest
 import time
-from unittest.mock import Mock
+import threading
+from unittest.mock import Mock, AsyncMock
 import redis
-from investing.services.market_data import CachedMarketDataService, AlphaVantageClient
-from investing.exceptions import ConfigurationError
+from investing.services.market_data import (
+    CachedMarketDataService, AlphaVantageClient, AsyncAlphaVantageClient, LocalPriceCache
+)
+from investing.exceptions import APIError, ConfigurationError, TickerNotFound
 
 class TestCachedMarketDataService:
     
@@ -44,3 +48,266 @@ class TestCachedMarketDataService:
         mock_client.get_price.return_value = 100.0
         # Should still work via API
         assert service.get_price("VOO") == 100.0
+
+
+class TestBatchPrices:
+
+    @pytest.fixture
+    def mock_client(self):
+        return Mock(spec=AlphaVantageClient)
+
+    @pytest.fixture
+    def service(self, mock_client):
+        """Service wired to a mocked Redis so pipelining can be asserted offline."""
+        service = CachedMarketDataService(client=mock_client, redis_url="redis://invalid:9999")
+        service._redis = Mock()
+        service._redis_available = True
+        return service
+
+    def test_hits_resolved_with_single_mget(self, service, mock_client):
+        service._redis.mget.return_value = [b"400.0", b"75.5"]
+
+        prices = service.get_prices(["VOO", "BND"])
+
+        assert prices == {"VOO": 400.0, "BND": 75.5}
+        service._redis.mget.assert_called_once_with(["price:VOO", "price:BND"])
+        mock_client.get_price.assert_not_called()
+
+    def test_misses_fetched_and_written_back_in_one_pipeline(self, service, mock_client):
+        service._redis.mget.return_value = [b"400.0", None, None]
+        pipe = service._redis.pipeline.return_value
+        mock_client.get_price.side_effect = lambda t: {"BND": 75.5, "XLK": 210.0}[t]
+
+        prices = service.get_prices(["VOO", "BND", "XLK"])
+
+        assert prices == {"VOO": 400.0, "BND": 75.5, "XLK": 210.0}
+        assert mock_client.get_price.call_count == 2
+        assert pipe.setex.call_count == 2
+        pipe.setex.assert_any_call("price:XLK", 300, "210.0")
+        pipe.execute.assert_called_once()
+
+    def test_duplicate_tickers_fetched_once(self, service, mock_client):
+        service._redis.mget.return_value = [None]
+        mock_client.get_price.return_value = 400.0
+
+        assert service.get_prices(["VOO", "VOO"]) == {"VOO": 400.0}
+        assert mock_client.get_price.call_count == 1
+
+    def test_failed_ticker_raises_but_successes_are_cached(self, service, mock_client):
+        service._redis.mget.return_value = [None, None]
+        pipe = service._redis.pipeline.return_value
+
+        def fetch(ticker):
+            if ticker == "BAD":
+                raise TickerNotFound(ticker)
+            return 400.0
+        mock_client.get_price.side_effect = fetch
+
+        with pytest.raises(TickerNotFound):
+            service.get_prices(["VOO", "BAD"])
+        pipe.setex.assert_called_once_with("price:VOO", 300, "400.0")
+
+    def test_failed_ticker_is_named_on_the_error(self, service, mock_client):
+        service._redis.mget.return_value = [None, None]
+
+        def fetch(ticker):
+            if ticker == "BND":
+                raise APIError("upstream 500")
+            return 400.0
+        mock_client.get_price.side_effect = fetch
+
+        with pytest.raises(APIError) as exc_info:
+            service.get_prices(["VOO", "BND"])
+        assert exc_info.value.ticker == "BND"
+
+    def test_works_without_redis(self, mock_client):
+        service = CachedMarketDataService(client=mock_client, redis_url="redis://invalid:9999")
+        mock_client.get_price.side_effect = lambda t: {"VOO": 400.0, "BND": 75.5}[t]
+
+        assert service.get_prices(["VOO", "BND"]) == {"VOO": 400.0, "BND": 75.5}
+
+
+class TestLocalPriceCache:
+
+    def test_hit_and_miss_counters(self):
+        cache = LocalPriceCache(max_entries=10, ttl_seconds=60)
+        assert cache.get("VOO") is None
+        cache.set("VOO", 400.0)
+        assert cache.get("VOO") == 400.0
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+
+    def test_entries_expire_after_ttl(self, mocker):
+        clock = mocker.patch("investing.services.market_data.time.monotonic", return_value=1000.0)
+        cache = LocalPriceCache(max_entries=10, ttl_seconds=60)
+        cache.set("VOO", 400.0)
+
+        clock.return_value = 1059.0
+        assert cache.get("VOO") == 400.0
+
+        clock.return_value = 1060.0
+        assert cache.get("VOO") is None
+        assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_is_evicted(self):
+        cache = LocalPriceCache(max_entries=2, ttl_seconds=60)
+        cache.set("VOO", 400.0)
+        cache.set("BND", 75.0)
+        cache.get("VOO")  # VOO is now most recently used
+        cache.set("AGG", 98.0)
+
+        assert cache.get("BND") is None
+        assert cache.get("VOO") == 400.0
+        assert cache.get("AGG") == 98.0
+        assert cache.stats()["evictions"] == 1
+
+    def test_service_serves_hot_ticker_without_redis_round_trip(self):
+        client = Mock(spec=AlphaVantageClient)
+        client.get_price.return_value = 400.0
+        service = CachedMarketDataService(client=client, redis_url="redis://invalid:9999")
+        service._redis = Mock()
+        service._redis_available = True
+        service._redis.get.return_value = None
+
+        assert service.get_price("VOO") == 400.0
+        assert service.get_price("VOO") == 400.0
+        assert service.get_prices(["VOO"]) == {"VOO": 400.0}
+
+        assert client.get_price.call_count == 1
+        assert service._redis.get.call_count == 1
+        service._redis.mget.assert_not_called()
+        assert service.cache_stats()["hits"] == 2
+
+
+class TestRequestCoalescing:
+
+    @pytest.fixture
+    def slow_client(self):
+        """Client whose fetch blocks until released, so callers pile up behind it."""
+        client = Mock(spec=AlphaVantageClient)
+        release = threading.Event()
+
+        def fetch(ticker):
+            release.wait(timeout=5)
+            return 400.0
+        client.get_price.side_effect = fetch
+        client.release = release
+        return client
+
+    def test_concurrent_misses_trigger_one_upstream_fetch(self, slow_client):
+        service = CachedMarketDataService(client=slow_client, redis_url="redis://invalid:9999")
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(service.get_price("VOO")))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        slow_client.release.set()
+        for t in threads:
+            t.join(timeout=5)
+
+        assert results == [400.0] * 5
+        assert slow_client.get_price.call_count == 1
+
+    def test_followers_receive_leader_error(self):
+        client = Mock(spec=AlphaVantageClient)
+        client.get_price.side_effect = TickerNotFound("NOPE")
+        service = CachedMarketDataService(client=client, redis_url="redis://invalid:9999")
+
+        with pytest.raises(TickerNotFound):
+            service.get_price("NOPE")
+
+    def test_stale_value_served_while_single_refresh_runs(self, slow_client, mocker):
+        clock = mocker.patch("investing.services.market_data.time.monotonic", return_value=1000.0)
+        service = CachedMarketDataService(
+            client=slow_client, redis_url="redis://invalid:9999", stale_while_revalidate=True
+        )
+        service._local.set("VOO", 390.0)
+        clock.return_value = 2000.0  # L1 entry expired, Redis unavailable
+
+        assert service.get_price("VOO") == 390.0
+        assert service.get_prices(["VOO"]) == {"VOO": 390.0}
+
+        slow_client.release.set()
+        service._refresher.shutdown(wait=True)
+
+        assert slow_client.get_price.call_count == 1
+        assert service.cache_stats()["stale_hits"] == 2
+        assert service._local.get_stale("VOO") == 400.0
+
+    def test_stale_mode_disabled_by_default(self, mocker):
+        clock = mocker.patch("investing.services.market_data.time.monotonic", return_value=1000.0)
+        client = Mock(spec=AlphaVantageClient)
+        client.get_price.return_value = 400.0
+        service = CachedMarketDataService(client=client, redis_url="redis://invalid:9999")
+        service._local.set("VOO", 390.0)
+        clock.return_value = 2000.0
+
+        assert service.get_price("VOO") == 400.0
+
+
+class TestAsyncPrices:
+
+    @pytest.fixture
+    def async_client(self):
+        return Mock(spec=AsyncAlphaVantageClient, get_price=AsyncMock())
+
+    @pytest.fixture
+    def service(self, async_client):
+        return CachedMarketDataService(
+            client=Mock(spec=AlphaVantageClient),
+            redis_url="redis://invalid:9999",
+            async_client=async_client
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_price_async_uses_async_client_and_l1(self, service, async_client):
+        async_client.get_price.return_value = 400.0
+
+        assert await service.get_price_async("VOO") == 400.0
+        assert await service.get_price_async("VOO") == 400.0
+        assert async_client.get_price.await_count == 1
+        service._client.get_price.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_awaiters_share_one_fetch(self, service, async_client):
+        async def slow(ticker):
+            await asyncio.sleep(0.05)
+            return 400.0
+        async_client.get_price.side_effect = slow
+
+        results = await asyncio.gather(*(service.get_price_async("VOO") for _ in range(5)))
+
+        assert results == [400.0] * 5
+        assert async_client.get_price.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_get_prices_async_fetches_misses_concurrently(self, service, async_client):
+        async_client.get_price.side_effect = lambda t: {"VOO": 400.0, "BND": 75.5}[t]
+
+        prices = await service.get_prices_async(["VOO", "BND", "VOO"])
+
+        assert prices == {"VOO": 400.0, "BND": 75.5}
+        assert async_client.get_price.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_prices_async_raises_upstream_error(self, service, async_client):
+        async_client.get_price.side_effect = TickerNotFound("NOPE")
+
+        with pytest.raises(TickerNotFound):
+            await service.get_prices_async(["NOPE"])
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_thread_without_async_client(self):
+        client = Mock(spec=AlphaVantageClient)
+        client.get_price.return_value = 400.0
+        service = CachedMarketDataService(client=client, redis_url="redis://invalid:9999")
+
+        assert await service.get_price_async("VOO") == 400.0
+        assert await service.get_prices_async(["VOO"]) == {"VOO": 400.0}
+        assert client.get_price.call_count == 1
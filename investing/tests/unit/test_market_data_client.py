@@ -1,7 +1,8 @@
 import pytest
+import httpx
 from unittest.mock import Mock, patch
-from investing.services.market_data import AlphaVantageClient
-from investing.exceptions import APIError, ConfigurationError
+from investing.services.market_data import AlphaVantageClient, AsyncAlphaVantageClient
+from investing.exceptions import APIError, APIKeyExhausted, APITimeout, ConfigurationError, TickerNotFound
 from investing.tests.fixtures.alpha_vantage_responses import mock_valid_response_voo
 
 class TestAlphaVantageClient:
@@ -9,7 +10,7 @@ class TestAlphaVantageClient:
         mock_response = Mock()
         mock_response.json.return_value = mock_valid_response_voo()
         mock_response.raise_for_status.return_value = None
-        mocker.patch('requests.get', return_value=mock_response)
+        mocker.patch('requests.Session.get', return_value=mock_response)
         
         client = AlphaVantageClient(api_key="test_key")
         price = client.get_price("VOO")
@@ -30,7 +31,7 @@ class TestAlphaVantageClient:
         # Return empty dict (simulating bad response)
         mock_response.json.return_value = {} 
         mock_response.raise_for_status.return_value = None
-        mocker.patch('requests.get', return_value=mock_response)
+        mocker.patch('requests.Session.get', return_value=mock_response)
         
         client = AlphaVantageClient(api_key="test_key")
         
@@ -48,8 +49,80 @@ class TestAlphaVantageClient:
                 mock.json.return_value = {"Global Quote": {"05. price": "76.89"}}
             return mock
 
-        mocker.patch('requests.get', side_effect=side_effect)
+        mocker.patch('requests.Session.get', side_effect=side_effect)
         client = AlphaVantageClient(api_key="test")
         
         assert client.get_price("VOO") == 423.45
         assert client.get_price("BND") == 76.89
+
+    def test_requests_reuse_one_pooled_session(self, mocker):
+        mock_response = Mock()
+        mock_response.json.return_value = mock_valid_response_voo()
+        mock_response.raise_for_status.return_value = None
+        session_get = mocker.patch('requests.Session.get', return_value=mock_response)
+        plain_get = mocker.patch('requests.get')
+
+        client = AlphaVantageClient(api_key="test")
+        client.get_price("VOO")
+        client.get_price("VOO")
+
+        assert session_get.call_count == 2
+        plain_get.assert_not_called()
+
+
+def _async_client(handler) -> AsyncAlphaVantageClient:
+    """Async client whose HTTP layer is served by an in-memory transport."""
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = AsyncAlphaVantageClient(api_key="test", http_client=http)
+    return client
+
+
+class TestAsyncAlphaVantageClient:
+
+    @pytest.mark.asyncio
+    async def test_valid_ticker_returns_float(self):
+        client = _async_client(lambda request: httpx.Response(200, json=mock_valid_response_voo()))
+
+        price = await client.get_price("voo")
+
+        assert isinstance(price, float)
+        assert price == 423.45
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_note_raises_key_exhausted(self):
+        note = {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}
+        client = _async_client(lambda request: httpx.Response(200, json=note))
+
+        with pytest.raises(APIKeyExhausted):
+            await client.get_price("VOO")
+
+    @pytest.mark.asyncio
+    async def test_error_message_raises_ticker_not_found(self):
+        client = _async_client(lambda request: httpx.Response(200, json={"Error Message": "Invalid API call."}))
+
+        with pytest.raises(TickerNotFound):
+            await client.get_price("NOPE")
+
+    @pytest.mark.asyncio
+    async def test_timeouts_are_retried_then_raise(self, mocker):
+        mocker.patch("investing.services.market_data.asyncio.sleep", return_value=None)
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ReadTimeout("slow", request=request)
+
+        client = _async_client(handler)
+
+        with pytest.raises(APITimeout):
+            await client.get_price("VOO")
+        assert len(calls) == client.max_retries
+
+    @pytest.mark.asyncio
+    async def test_missing_root_key_raises_api_error(self, mocker):
+        mocker.patch("investing.services.market_data.asyncio.sleep", return_value=None)
+        client = _async_client(lambda request: httpx.Response(200, json={}))
+
+        with pytest.raises(APIError):
+            await client.get_price("VOO")
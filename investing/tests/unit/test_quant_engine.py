@@ -1,7 +1,8 @@
+import math
 import pytest
 import pandas as pd
 import numpy as np
-from investing.services.quant_engine import QuantEngine
+from investing.services.quant_engine import QuantEngine, RollingMetrics
 
 class TestQuantEngine:
     
@@ -63,3 +64,123 @@ class TestQuantEngine:
         assert mom > 0
         assert vol > 0
         assert score == mom / vol
+
+
+class TestQuantEngineBatch:
+
+    @pytest.fixture
+    def engine(self):
+        return QuantEngine()
+
+    @pytest.fixture
+    def universe(self):
+        """Random walks of different lengths, NaN-padded at the top (newer listings)."""
+        rng = np.random.default_rng(42)
+        lengths = [100, 95, 90, 89, 50, 100]
+        matrix = np.full((100, len(lengths)), np.nan)
+        for col, n in enumerate(lengths):
+            walk = 100 * np.cumprod(1 + rng.normal(0.001, 0.01, n))
+            matrix[-n:, col] = walk
+        return matrix
+
+    def test_matches_scalar_path(self, engine, universe):
+        mom, vol, score = engine.calculate_metrics_batch(universe)
+
+        for col in range(universe.shape[1]):
+            series = universe[:, col]
+            df = pd.DataFrame({'price': series[~np.isnan(series)]})
+            expected = engine.calculate_metrics(df)
+            assert mom[col] == pytest.approx(expected[0], rel=1e-12, abs=1e-12)
+            assert vol[col] == pytest.approx(expected[1], rel=1e-12, abs=1e-12)
+            assert score[col] == pytest.approx(expected[2], rel=1e-12, abs=1e-12)
+
+    def test_short_histories_score_zero(self, engine, universe):
+        mom, vol, score = engine.calculate_metrics_batch(universe)
+        # Columns 3 (89 bars) and 4 (50 bars) are below the 90-day window
+        assert (mom[[3, 4]] == 0).all()
+        assert (vol[[3, 4]] == 0).all()
+        assert (score[[3, 4]] == 0).all()
+
+    def test_interior_gaps_are_skipped(self, engine):
+        prices = np.array([100.0 + i for i in range(100)])
+        gapped = prices.copy()
+        gapped[40] = np.nan
+        matrix = np.column_stack([gapped, np.append(np.delete(prices, 40), np.nan)])
+
+        mom, vol, score = engine.calculate_metrics_batch(matrix)
+        expected = engine.calculate_metrics(pd.DataFrame({'price': np.delete(prices, 40)}))
+
+        assert mom[0] == pytest.approx(expected[0])
+        assert vol[0] == pytest.approx(expected[1])
+
+    def test_accepts_wide_dataframe(self, engine):
+        wide = pd.DataFrame({
+            "FLAT": [100.0] * 100,
+            "UP": [100.0 + i for i in range(100)],
+        })
+        mom, vol, score = engine.calculate_metrics_batch(wide)
+
+        assert mom[0] == 0.0 and vol[0] == 0.0 and score[0] == 0.0
+        assert mom[1] > 0 and vol[1] > 0
+        assert score[1] == pytest.approx(mom[1] / vol[1])
+
+    def test_all_short_universe(self, engine):
+        mom, vol, score = engine.calculate_metrics_batch(np.ones((10, 3)))
+        assert mom.tolist() == [0.0, 0.0, 0.0]
+
+
+class TestRollingMetrics:
+
+    @pytest.fixture
+    def engine(self):
+        return QuantEngine()
+
+    @pytest.fixture
+    def prices(self):
+        rng = np.random.default_rng(7)
+        return 100 * np.cumprod(1 + rng.normal(0.0005, 0.012, 400))
+
+    def test_each_update_matches_full_recompute(self, engine, prices):
+        state = engine.rolling(window=100)
+        for i, price in enumerate(prices):
+            mom, vol, score = state.update(price)
+            window = prices[max(0, i - 99):i + 1]
+            expected = engine.calculate_metrics(pd.DataFrame({'price': window}))
+            assert mom == pytest.approx(expected[0], rel=1e-9, abs=1e-12)
+            assert vol == pytest.approx(expected[1], rel=1e-9, abs=1e-12)
+            assert score == pytest.approx(expected[2], rel=1e-9, abs=1e-12)
+
+    def test_seeded_from_history(self, engine, prices):
+        state = engine.rolling(pd.DataFrame({'price': prices[:300]}))
+        assert len(state) == 100
+
+        result = state.update(prices[300])
+        expected = engine.calculate_metrics(pd.DataFrame({'price': prices[201:301]}))
+        assert result == pytest.approx(expected)
+
+    def test_warmup_returns_zeros(self, engine):
+        state = engine.rolling()
+        assert state.extend([100.0 + i for i in range(89)]) == (0.0, 0.0, 0.0)
+        assert state.update(189.0)[0] > 0
+
+    def test_flat_series_has_zero_volatility(self, engine):
+        state = engine.rolling()
+        assert state.extend([100.0] * 250) == (0.0, 0.0, 0.0)
+
+    def test_zero_close_does_not_poison_the_window(self, engine, prices):
+        state = engine.rolling(window=100)
+        state.extend(prices[:150])
+
+        mom, vol, score = state.update(0.0)
+        assert all(math.isfinite(v) for v in (mom, vol, score))
+        mom, vol, score = state.update(prices[150])  # return off a 0.0 close
+        assert all(math.isfinite(v) for v in (mom, vol, score))
+
+        # Once the bad bar leaves the window, metrics match a clean recompute again
+        state.extend(prices[151:260])
+        expected = engine.calculate_metrics(pd.DataFrame({'price': prices[160:260]}))
+        assert state.metrics() == pytest.approx(expected, rel=1e-6)
+
+    def test_window_must_cover_momentum(self):
+        with pytest.raises(ValueError):
+            RollingMetrics(window=50)
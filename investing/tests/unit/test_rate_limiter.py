@@ -0,0 +1,139 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from investing.services.rate_limiter import RateLimiter, InMemoryTokenBucket
+from investing.services.market_data import AlphaVantageClient
+from investing.exceptions import APIKeyExhausted
+from investing.tests.fixtures.alpha_vantage_responses import mock_valid_response_voo
+
+
+class TestInMemoryTokenBucket:
+
+    def test_full_bucket_grants_capacity_tokens(self):
+        bucket = InMemoryTokenBucket(capacity=5, refill_per_second=5 / 60)
+        for _ in range(5):
+            wait, _ = bucket.take()
+            assert wait == 0.0
+
+        wait, tokens = bucket.take()
+        assert tokens < 1
+        # 5 calls/min -> one token every 12s
+        assert 0 < wait <= 12.0
+
+    def test_tokens_refill_over_time(self, mocker):
+        clock = mocker.patch("investing.services.rate_limiter.time.monotonic", return_value=100.0)
+        bucket = InMemoryTokenBucket(capacity=1, refill_per_second=0.5)
+        assert bucket.take()[0] == 0.0
+        assert bucket.take()[0] == pytest.approx(2.0)
+
+        clock.return_value = 102.0
+        assert bucket.take()[0] == 0.0
+
+
+class TestRateLimiter:
+
+    def test_acquire_waits_only_as_long_as_needed(self, mocker):
+        sleep = mocker.patch("investing.services.rate_limiter.time.sleep")
+        limiter = RateLimiter(rate_per_minute=5, redis_url=None)
+        limiter._take = Mock(side_effect=[(3.5, 0.7), (0.0, 0.0)])
+
+        waited = limiter.acquire()
+
+        sleep.assert_called_once_with(3.5)
+        assert waited == 3.5
+
+    def test_acquire_timeout_raises_key_exhausted(self):
+        limiter = RateLimiter(rate_per_minute=5, redis_url=None)
+        limiter._take = Mock(return_value=(10.0, 0.0))
+
+        with pytest.raises(APIKeyExhausted):
+            limiter.acquire(timeout=1.0)
+
+    def test_remaining_tokens_metric(self):
+        limiter = RateLimiter(rate_per_minute=5, redis_url=None)
+        assert limiter.remaining_tokens() == pytest.approx(5.0)
+        limiter.acquire()
+        assert limiter.remaining_tokens() == pytest.approx(4.0, abs=0.01)
+
+    def test_uses_redis_script_when_available(self):
+        limiter = RateLimiter(rate_per_minute=5, redis_url=None)
+        limiter._redis = Mock()
+        limiter._script = Mock(return_value=[b"0", b"4"])
+
+        assert limiter.acquire() == 0.0
+        limiter._script.assert_called_once_with(
+            keys=["ratelimit:alpha_vantage"], args=[5.0, 5 / 60, 1]
+        )
+
+    def test_falls_back_to_memory_when_redis_fails(self):
+        limiter = RateLimiter(rate_per_minute=5, redis_url=None)
+        limiter._redis = Mock()
+        limiter._script = Mock(side_effect=ConnectionError("redis down"))
+
+        assert limiter.acquire() == 0.0
+        assert limiter.distributed is False
+
+    def test_unreachable_redis_uses_memory_bucket(self):
+        limiter = RateLimiter(rate_per_minute=5, redis_url="redis://invalid:9999")
+        assert limiter.distributed is False
+
+    @pytest.mark.asyncio
+    async def test_acquire_async(self, mocker):
+        sleep = mocker.patch("investing.services.rate_limiter.asyncio.sleep")
+        limiter = RateLimiter(rate_per_minute=5, redis_url=None)
+        limiter._take_async = AsyncMock(side_effect=[(1.5, 0.0), (0.0, 0.0)])
+
+        assert await limiter.acquire_async() == 1.5
+        sleep.assert_awaited_once_with(1.5)
+
+    @pytest.mark.asyncio
+    async def test_acquire_async_does_not_block_the_loop(self):
+        limiter = RateLimiter(rate_per_minute=5, redis_url=None)
+        # Pretend Redis connected; the sync script must never run on the loop
+        limiter._redis = Mock()
+        limiter._script = Mock(side_effect=AssertionError("sync Redis call on the event loop"))
+        ticks = []
+        ticks_during_call = []
+
+        async def slow_script(keys, args):
+            await asyncio.sleep(0.05)  # a Redis round trip
+            ticks_during_call.append(len(ticks))
+            return [b"0", b"4"]
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(1)
+                await asyncio.sleep(0.005)
+
+        limiter._async_script = (asyncio.get_running_loop(), slow_script)
+        waited, _ = await asyncio.gather(limiter.acquire_async(), ticker())
+
+        assert waited == 0.0
+        assert ticks_during_call == [5]  # other tasks ran while Redis answered
+        assert limiter.distributed
+
+
+class TestClientConsultsLimiter:
+
+    def test_every_request_acquires_a_token(self, mocker):
+        response = Mock()
+        response.json.return_value = mock_valid_response_voo()
+        response.raise_for_status.return_value = None
+        mocker.patch("requests.Session.get", return_value=response)
+        limiter = Mock(spec=RateLimiter)
+
+        client = AlphaVantageClient(api_key="test", rate_limiter=limiter)
+        client.get_price("VOO")
+        client.get_price("VOO")
+
+        assert limiter.acquire.call_count == 2
+
+    def test_exhausted_budget_propagates(self, mocker):
+        get = mocker.patch("requests.Session.get")
+        limiter = Mock(spec=RateLimiter)
+        limiter.acquire.side_effect = APIKeyExhausted()
+
+        client = AlphaVantageClient(api_key="test", rate_limiter=limiter)
+        with pytest.raises(APIKeyExhausted):
+            client.get_price("VOO")
+        get.assert_not_called()
@@ -0,0 +1,116 @@
+import pytest
+from types import MappingProxyType
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from investing.models.base import Base
+from investing.models.etf_universe import EtfUniverse
+from investing.services.allocation_engine import AllocationEngine
+
+
+def legacy_recommend(engine, balance, risk_profile, momentum_ticker):
+    """The procedural algorithm as it was before the table (reference for parity)."""
+    count = engine.get_etf_count(balance)
+    if count == 1:
+        return [("VOO", 1.0)]
+
+    weights = engine._get_base_allocations(count)
+
+    if momentum_ticker:
+        target_tilt = 0.30
+        needed = target_tilt
+        if "VOO" in weights:
+            available = weights["VOO"]
+            take = min(available, needed)
+            weights["VOO"] = round(available - take, 2)
+            needed -= take
+        if needed > 0 and "VTI" in weights:
+            available = weights["VTI"]
+            take = min(available, needed)
+            weights["VTI"] = round(available - take, 2)
+            needed -= take
+        if needed < 0.01:
+            weights[momentum_ticker] = weights.get(momentum_ticker, 0) + target_tilt
+
+    bond_ticker = "AGG" if "AGG" in weights else "BND"
+    adjustment = 0.0
+    if risk_profile == "conservative":
+        adjustment = 0.20
+    elif risk_profile == "growth":
+        adjustment = -0.15
+
+    if adjustment != 0.0:
+        stock_ticker = "VOO" if weights.get("VOO", 0) > 0.1 else "VTI"
+        if stock_ticker in weights and bond_ticker in weights:
+            new_bond = round(weights[bond_ticker] + adjustment, 2)
+            new_stock = round(weights[stock_ticker] - adjustment, 2)
+            if 0.05 <= new_bond <= 0.95 and 0.05 <= new_stock <= 0.95:
+                weights[bond_ticker] = new_bond
+                weights[stock_ticker] = new_stock
+
+    return [(k, v) for k, v in weights.items() if v > 0.01]
+
+
+# One balance per tier, plus the tier boundaries
+BALANCES = [0, 50, 99.99, 100, 250, 499.99, 500, 1000, 1999.99, 2000, 10000]
+
+
+class TestRecommendationTable:
+
+    @pytest.fixture
+    def engine(self):
+        return AllocationEngine()
+
+    @pytest.fixture
+    def db(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+
+    def _set_universe(self, db, scores):
+        db.query(EtfUniverse).delete()
+        db.add_all([
+            EtfUniverse(ticker=t, sector="Sector", momentum_score=s, volatility=0.1, last_price=100.0)
+            for t, s in scores.items()
+        ])
+        db.commit()
+
+    @pytest.mark.parametrize("winner", ["XLK", "XLE", "VTI", "BND", "AGG", None])
+    def test_matches_procedural_path(self, engine, db, winner):
+        """Every (balance, risk, winner) combination is identical to the old algorithm."""
+        scores = {"XLK": -0.01, "XLE": -0.2}
+        if winner is not None:
+            scores[winner] = 0.5
+        self._set_universe(db, scores)
+        engine.invalidate_snapshot()
+
+        for balance in BALANCES:
+            for risk in AllocationEngine.RISK_PROFILES:
+                got = [(a.ticker, a.weight) for a in engine.recommend_portfolio(balance, risk, db)]
+                assert got == legacy_recommend(engine, balance, risk, winner), (balance, risk, winner)
+
+    def test_matches_procedural_path_without_db(self, engine):
+        for balance in BALANCES:
+            for risk in AllocationEngine.RISK_PROFILES:
+                got = [(a.ticker, a.weight) for a in engine.recommend_portfolio(balance, risk)]
+                assert got == legacy_recommend(engine, balance, risk, None)
+
+    def test_table_covers_every_candidate_winner(self, engine, db):
+        self._set_universe(db, {"XLK": 0.3, "XLV": 0.1, "XLE": -0.1})
+        table = engine.get_universe_snapshot(db).table
+
+        assert isinstance(table, MappingProxyType)
+        winners = {key[2] for key in table}
+        assert winners == {None, "XLK", "XLV"}
+        assert len(table) == 4 * len(AllocationEngine.RISK_PROFILES) * len(winners)
+
+    def test_results_are_fresh_objects(self, engine):
+        """Callers may mutate what they get back without corrupting the shared table."""
+        first = engine.recommend_portfolio(5000)
+        first[0].weight = 0.0
+        assert engine.recommend_portfolio(5000)[0].weight > 0.0
+
+    def test_invalid_risk_profile(self, engine):
+        with pytest.raises(ValueError, match="Invalid risk profile"):
+            engine.recommend_portfolio(1000, "yolo")
@@ -0,0 +1,113 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from investing.models.base import Base
+from investing.models.etf_universe import EtfUniverse
+from investing.services.allocation_engine import AllocationEngine, notify_universe_changed
+
+class TestUniverseSnapshot:
+
+    @pytest.fixture
+    def engine_db(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        return engine
+
+    @pytest.fixture
+    def db(self, engine_db):
+        session = sessionmaker(bind=engine_db)()
+        session.add_all([
+            EtfUniverse(ticker="XLK", sector="Technology", momentum_score=0.25, volatility=0.1, last_price=150.0),
+            EtfUniverse(ticker="XLE", sector="Energy", momentum_score=-0.05, volatility=0.1, last_price=80.0),
+        ])
+        session.commit()
+        yield session
+        session.close()
+
+    @pytest.fixture
+    def queries(self, engine_db):
+        seen = []
+        event.listen(engine_db, "before_cursor_execute", lambda *args: seen.append(args[2]))
+        return seen
+
+    def _set_winner(self, db, ticker, score):
+        row = db.get(EtfUniverse, ticker)
+        row.momentum_score = score
+        row.last_analyzed = datetime.utcnow() + timedelta(minutes=1)
+        db.commit()
+
+    def test_hot_path_does_no_db_io(self, db, queries):
+        engine = AllocationEngine(snapshot_ttl=60)
+        engine.recommend_portfolio(1000.0, "balanced", db=db)
+        loaded = len(queries)
+
+        for _ in range(10):
+            allocs = engine.recommend_portfolio(1000.0, "balanced", db=db)
+
+        assert len(queries) == loaded
+        assert "XLK" in {a.ticker for a in allocs}
+
+    def test_snapshot_ranks_universe(self, db):
+        snapshot = AllocationEngine().get_universe_snapshot(db)
+        assert [t for t, _ in snapshot.ranked] == ["XLK", "XLE"]
+        assert snapshot.winner == "XLK"
+
+    def test_no_winner_when_all_scores_negative(self, db):
+        self._set_winner(db, "XLK", -0.01)
+        assert AllocationEngine().get_universe_snapshot(db).winner is None
+
+    def test_unchanged_watermark_keeps_snapshot(self, db):
+        engine = AllocationEngine(snapshot_ttl=60)
+        with patch("investing.services.allocation_engine.time.monotonic", return_value=1000.0):
+            first = engine.get_universe_snapshot(db)
+        with patch("investing.services.allocation_engine.time.monotonic", return_value=2000.0):
+            second = engine.get_universe_snapshot(db)
+
+        assert second.ranked is first.ranked
+        assert second.checked_at == 2000.0
+
+    def test_new_watermark_reloads_after_ttl(self, db):
+        engine = AllocationEngine(snapshot_ttl=60)
+        with patch("investing.services.allocation_engine.time.monotonic", return_value=1000.0):
+            assert engine.get_universe_snapshot(db).winner == "XLK"
+
+            self._set_winner(db, "XLE", 0.50)
+            # Still inside the TTL: served from memory
+            assert engine.get_universe_snapshot(db).winner == "XLK"
+
+        with patch("investing.services.allocation_engine.time.monotonic", return_value=1061.0):
+            assert engine.get_universe_snapshot(db).winner == "XLE"
+
+    def test_harvester_notification_forces_reload(self, db):
+        engine = AllocationEngine(snapshot_ttl=3600)
+        assert engine.get_universe_snapshot(db).winner == "XLK"
+
+        self._set_winner(db, "XLE", 0.50)
+        notify_universe_changed()
+
+        assert engine.get_universe_snapshot(db).winner == "XLE"
+
+    def test_invalidate_snapshot(self, db):
+        engine = AllocationEngine(snapshot_ttl=3600)
+        engine.get_universe_snapshot(db)
+        self._set_winner(db, "XLE", 0.50)
+
+        engine.invalidate_snapshot()
+        assert engine.get_universe_snapshot(db).winner == "XLE"
+
+    @pytest.mark.asyncio
+    async def test_async_snapshot_shares_cache_with_sync_path(self, api_db):
+        api_db.session.add(EtfUniverse(ticker="XLV", sector="Healthcare", momentum_score=0.4, volatility=0.1, last_price=90.0))
+        api_db.session.commit()
+        engine = AllocationEngine(snapshot_ttl=60)
+
+        async for async_db in api_db.get_db():
+            snapshot = await engine.get_universe_snapshot_async(async_db)
+            allocs = await engine.recommend_portfolio_async(1000.0, "balanced", db=async_db)
+
+        assert snapshot.winner == "XLV"
+        assert "XLV" in {a.ticker for a in allocs}
+        # Within the TTL the sync path reuses the same snapshot without touching the DB
+        assert engine.get_universe_snapshot(None) is snapshot
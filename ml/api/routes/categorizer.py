@@ -1,10 +1,18 @@
-from fastapi import APIRouter, HTTPException
+import json
+from typing import List
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 from ml.core.models import CategorizeRequest, CategorizeResponse
 from ml.services.categorizer.service import CategorizerService
+from ml.config.settings import get_settings
 
 router = APIRouter()
 service = CategorizerService()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+_batch_adapter = TypeAdapter(List[CategorizeRequest])
+
 @router.post("/categorize", response_model=CategorizeResponse)
 async def categorize_transaction(request: CategorizeRequest):
     try:
@@ -12,3 +20,39 @@ async def categorize_transaction(request: CategorizeRequest):
     except Exception as e:
         print(f"❌ Categorizer API Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+def _parse_batch(body: bytes, content_type: str) -> List[CategorizeRequest]:
+    """A JSON array, or one JSON object per line for NDJSON bodies."""
+    try:
+        if NDJSON_MEDIA_TYPE in content_type:
+            return [
+                CategorizeRequest.model_validate_json(line)
+                for line in body.splitlines() if line.strip()
+            ]
+        return _batch_adapter.validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+@router.post("/categorize/batch")
+async def categorize_batch(http_request: Request):
+    """
+    Categorizes many transactions in one call.
+    Body: JSON array or NDJSON. Response: NDJSON, one {"index", ...result} line
+    per transaction in completion order (keyword hits first, then LLM results).
+    """
+    requests = _parse_batch(await http_request.body(), http_request.headers.get("content-type", ""))
+
+    max_items = get_settings().CATEGORIZE_BATCH_MAX_ITEMS
+    if len(requests) > max_items:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {len(requests)} items (max {max_items})")
+
+    async def stream():
+        try:
+            async for index, result in service.categorize_batch(requests):
+                yield json.dumps({"index": index, **result.model_dump(mode="json")}) + "\n"
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            print(f"❌ Categorizer API Error: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(stream(), media_type=NDJSON_MEDIA_TYPE)
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 from functools import lru_cache
@@ -20,9 +21,18 @@ class Settings(BaseSettings):
     GEMINI_MODEL: str = "gemini-1.5-flash" # Default fallback
 
     GEMINI_RPM_LIMIT: int = 15
+    # Transactions packed into one prompt by LLMCategorizer.categorize_many
+    GEMINI_BATCH_SIZE: int = 25
     SIMILARITY_TOP_K: int = 5
     ANOMALY_STD_THRESHOLD: float = 2.0
 
+    # /categorize/batch: transactions per request
+    CATEGORIZE_BATCH_MAX_ITEMS: int = 10000
+
+    # Merchant -> category cache (in-process LRU + Redis)
+    MERCHANT_CACHE_MAX_ENTRIES: int = 10000
+    MERCHANT_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+
     model_config = SettingsConfigDict(env_file=ENV_PATH, extra="ignore")
 
     def get_taxonomy(self) -> Dict[str, Any]:
@@ -35,6 +45,13 @@ class Settings(BaseSettings):
     def CATEGORIES(self) -> List[str]:
         return self.get_taxonomy()["categories"]
 
+    @property
+    def TAXONOMY_VERSION(self) -> str:
+        """Content hash of taxonomy.json; cached categorizations are keyed by it."""
+        if not TAXONOMY_PATH.exists():
+            raise FileNotFoundError(f"Taxonomy file not found at {TAXONOMY_PATH}")
+        return hashlib.sha256(TAXONOMY_PATH.read_bytes()).hexdigest()[:12]
+
 @lru_cache()
 def get_settings() -> Settings:
     return Settings()
@@ -22,6 +22,8 @@ class CategorizeResponse(BaseModel):
     processing_time_ms: int
     reasoning: Optional[str] = None
     suggested_subcategory: Optional[str] = None
+    # Canonical merchant the result is keyed by ("STARBUCKS #1234 SEATTLE WA" -> "starbucks")
+    merchant_key: Optional[str] = None
 
 class TransactionContext(BaseModel):
     merchant: str
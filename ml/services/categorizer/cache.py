@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import redis.asyncio
+from ml.core.models import CategorizeResponse
+from ml.config.settings import get_settings
+from ml.services.categorizer.normalizer import canonical_merchant
+
+# Fields worth remembering; is_cached / processing_time_ms describe one lookup, not the answer
+_CACHED_FIELDS = ("category", "confidence", "reasoning", "suggested_subcategory")
+
+class MerchantCache:
+    """
+    Normalized merchant -> categorization.
+
+    L1 is an in-process LRU with TTL; L2 is Redis, shared by every worker.
+    Keys carry the taxonomy version, so editing taxonomy.json retires every
+    cached answer at once. Redis problems never fail a categorization: the
+    cache switches L2 off for a cooldown and keeps serving from L1.
+    """
+
+    KEY_PREFIX = "categorizer"
+    REDIS_COOLDOWN_SECONDS = 60
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        taxonomy_version: Optional[str] = None,
+        redis_client=None
+    ):
+        settings = get_settings()
+        self.max_entries = max_entries or settings.MERCHANT_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or settings.MERCHANT_CACHE_TTL_SECONDS
+        self.version = taxonomy_version or settings.TAXONOMY_VERSION
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = redis_client
+        if self._redis is None and redis_url:
+            self._redis = redis.asyncio.from_url(redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        self._redis_down_until = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(merchant: str) -> str:
+        # Variants of one merchant ("STARBUCKS #1234 SEATTLE WA", "Starbucks") share an entry
+        return canonical_merchant(merchant)
+
+    def _key(self, merchant_key: str) -> str:
+        return f"{self.KEY_PREFIX}:{self.version}:{merchant_key}"
+
+    @staticmethod
+    def _dump(response: CategorizeResponse) -> str:
+        return json.dumps(response.model_dump(include=set(_CACHED_FIELDS)))
+
+    @staticmethod
+    def _load(payload) -> CategorizeResponse:
+        return CategorizeResponse(**json.loads(payload), is_cached=True, processing_time_ms=0)
+
+    # --- L1 ---
+
+    def _get_local(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return payload
+
+    def _set_local(self, key: str, payload: str):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.ttl_seconds, payload)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    # --- L2 ---
+
+    def _redis_usable(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, e: Exception):
+        print(f"⚠️ Merchant cache: Redis unavailable ({e}); using in-process cache only")
+        self._redis_down_until = time.monotonic() + self.REDIS_COOLDOWN_SECONDS
+
+    # --- Public API ---
+
+    async def get(self, merchant: str) -> Optional[CategorizeResponse]:
+        return (await self.get_many([merchant])).get(self.normalize(merchant))
+
+    async def get_many(self, merchants: Iterable[str]) -> Dict[str, CategorizeResponse]:
+        """Cached answers by normalized merchant: L1 first, then one MGET for the rest."""
+        keys = list(dict.fromkeys(self.normalize(m) for m in merchants))
+        found: Dict[str, str] = {}
+        missing: List[str] = []
+        for merchant_key in keys:
+            payload = self._get_local(self._key(merchant_key))
+            if payload is not None:
+                found[merchant_key] = payload
+            else:
+                missing.append(merchant_key)
+
+        if missing and self._redis_usable():
+            try:
+                payloads = await self._redis.mget([self._key(k) for k in missing])
+            except Exception as e:
+                self._redis_failed(e)
+                payloads = []
+            for merchant_key, payload in zip(missing, payloads):
+                if payload is not None:
+                    found[merchant_key] = payload
+                    self._set_local(self._key(merchant_key), payload)
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return {k: self._load(p) for k, p in found.items()}
+
+    async def set(self, merchant: str, response: CategorizeResponse, shared: bool = True):
+        await self.set_many({merchant: response}, shared=shared)
+
+    async def set_many(self, responses: Dict[str, CategorizeResponse], shared: bool = True):
+        """Stores answers in L1 and, when shared, in Redis (one pipeline)."""
+        payloads = {self._key(self.normalize(m)): self._dump(r) for m, r in responses.items()}
+        for key, payload in payloads.items():
+            self._set_local(key, payload)
+
+        if shared and payloads and self._redis_usable():
+            try:
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for key, payload in payloads.items():
+                        pipe.set(key, payload, ex=self.ttl_seconds)
+                    await pipe.execute()
+            except Exception as e:
+                self._redis_failed(e)
@@ -1,26 +1,37 @@
 import time
-from typing import Dict
+from typing import Dict, Optional
 from ml.services.categorizer.base import BaseCategorizer
+from ml.services.categorizer.matcher import KeywordAutomaton
+from ml.services.categorizer.normalizer import canonical_merchant
 from ml.core.models import CategorizeRequest, CategorizeResponse
 from ml.config.settings import get_settings
 
 class KeywordCategorizer(BaseCategorizer):
-    def __init__(self):
+    def __init__(self, keyword_map: Optional[Dict[str, str]] = None):
         self.settings = get_settings()
-        self.keyword_map = self._build_keyword_map()
+        # Category precedence for tie-breaks = order of the taxonomy file
+        self.precedence = self.settings.CATEGORIES
+        self.keyword_map = keyword_map if keyword_map is not None else self._build_keyword_map()
+        # Compiled once: matching cost no longer grows with the number of keywords
+        self.automaton = KeywordAutomaton(
+            {k.lower(): c for k, c in self.keyword_map.items()}, self.precedence
+        )
 
     def _build_keyword_map(self) -> Dict[str, str]:
         """
         Inverted index: "uber" -> "Transportation", "mcdonalds" -> "Food"
         """
         mapping = {}
+        rank = {category: i for i, category in enumerate(self.precedence)}
         # In a real app, this list would be much larger.
         # For MVP, we match the synthetic data patterns we generated.
         
-        # Helper to add keywords
+        # Helper to add keywords (a keyword listed twice keeps the higher-precedence category)
         def add(category: str, keywords: list):
             for k in keywords:
-                mapping[k.lower()] = category
+                current = mapping.get(k.lower())
+                if current is None or rank.get(category, len(rank)) < rank.get(current, len(rank)):
+                    mapping[k.lower()] = category
 
         add("Food", ["starbucks", "chipotle", "mcdonalds", "subway", "trader joe's", "whole foods", "doordash", "coffee", "burger", "pizza"])
         add("Transportation", ["uber", "lyft", "shell", "chevron", "mta", "lime", "scooter", "gas", "taxi", "parking"])
@@ -35,21 +46,28 @@ class KeywordCategorizer(BaseCategorizer):
         return mapping
 
     async def categorize(self, request: CategorizeRequest) -> CategorizeResponse:
+        return self.categorize_merchant(request.merchant)
+
+    def categorize_merchant(self, merchant: str) -> CategorizeResponse:
+        """Synchronous core of categorize(); batch callers loop over this directly."""
         start_time = time.time()
-        merchant_lower = request.merchant.lower()
+        # Canonical form: processor prefixes, store numbers and locations removed
+        merchant_lower = canonical_merchant(merchant)
         
         # Default State
         detected_category = "Uncategorized"
         confidence = 0.0
         reason = "No keyword match found"
 
-        # Linear Search (Fast enough for <1000 keywords)
-        for keyword, category in self.keyword_map.items():
-            if keyword in merchant_lower:
-                detected_category = category
-                confidence = 0.95  # High confidence for exact keyword match
-                reason = f"Matched keyword: '{keyword}'"
-                break
+        # One pass over the merchant string (longest keyword wins, then category precedence).
+        # The raw string is the fallback, so normalization can only add hits, never lose one.
+        match = self.automaton.find_best(merchant_lower)
+        if match is None:
+            match = self.automaton.find_best(merchant.lower())
+        if match is not None:
+            detected_category = match.category
+            confidence = 0.95  # High confidence for exact keyword match
+            reason = f"Matched keyword: '{match.keyword}'"
         
         processing_time = int((time.time() - start_time) * 1000)
 
@@ -1,16 +1,22 @@
 import json
+import time
+from typing import Dict, List, Optional
 import google.generativeai as genai
 from ml.services.categorizer.base import BaseCategorizer
 from ml.core.models import CategorizeRequest, CategorizeResponse
 from ml.config.settings import get_settings
 
 class LLMCategorizer(BaseCategorizer):
+    # A batch answer that is not a JSON array is asked for once more, never item by item
+    BATCH_ATTEMPTS = 2
+
     def __init__(self):
         self.settings = get_settings()
         genai.configure(api_key=self.settings.GEMINI_API_KEY)
         # USE SETTING
         self.model = genai.GenerativeModel(self.settings.GEMINI_MODEL)
         self.taxonomy = self.settings.CATEGORIES
+        self.batch_size = self.settings.GEMINI_BATCH_SIZE
 
     def _build_prompt(self, request: CategorizeRequest) -> str:
         return f"""
@@ -22,12 +28,29 @@ class LLMCategorizer(BaseCategorizer):
         Return ONLY valid JSON format: {{ "category": "CategoryName", "confidence": 0.9, "reasoning": "brief explanation" }}
         """
 
+    def _build_batch_prompt(self, requests: List[CategorizeRequest]) -> str:
+        lines = "\n".join(
+            f"{i}. {json.dumps(r.merchant)} | {r.amount} {r.iso_currency_code} | {r.date}"
+            for i, r in enumerate(requests)
+        )
+        return f"""
+        Act as a financial transaction classifier.
+        Map EACH of the following transactions to EXACTLY ONE of these categories: {self.taxonomy}.
+        Transactions (index. merchant | amount | date):
+        {lines}
+        Return ONLY a valid JSON array with one object per transaction, keyed by its index:
+        [{{ "index": 0, "category": "CategoryName", "confidence": 0.9, "reasoning": "brief explanation" }}]
+        """
+
+    @staticmethod
+    def _parse_json(text: str):
+        return json.loads(text.replace('```json', '').replace('```', '').strip())
+
     async def categorize(self, request: CategorizeRequest) -> CategorizeResponse:
         try:
             prompt = self._build_prompt(request)
-            response = self.model.generate_content(prompt)
-            clean_text = response.text.replace('```json', '').replace('```', '').strip()
-            data = json.loads(clean_text)
+            response = await self.model.generate_content_async(prompt)
+            data = self._parse_json(response.text)
             return CategorizeResponse(
                 category=data.get("category", "Uncategorized"),
                 confidence=float(data.get("confidence", 0.5)),
@@ -36,3 +59,80 @@ class LLMCategorizer(BaseCategorizer):
         except Exception as e:
             print(f"⚠️ LLM Error: {e}")
             return CategorizeResponse(category="Uncategorized", confidence=0.0, is_cached=False, processing_time_ms=0, reasoning=f"LLM Failed: {str(e)}")
+
+    def _parse_batch_item(self, item) -> Optional[CategorizeResponse]:
+        """One element of the batch answer, or None if it is malformed."""
+        try:
+            category = item["category"]
+            confidence = float(item.get("confidence", 0.5))
+            if category not in self.taxonomy or not 0.0 <= confidence <= 1.0:
+                return None
+            return CategorizeResponse(
+                category=category, confidence=confidence,
+                is_cached=False, processing_time_ms=0, reasoning=item.get("reasoning", "LLM inference")
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _failed(reason: str) -> CategorizeResponse:
+        return CategorizeResponse(category="Uncategorized", confidence=0.0, is_cached=False, processing_time_ms=0, reasoning=reason)
+
+    async def _ask_batch(self, chunk: List[CategorizeRequest]) -> Optional[list]:
+        """The decoded batch answer, or None if no attempt returned a JSON array. API errors propagate."""
+        prompt = self._build_batch_prompt(chunk)
+        for attempt in range(1, self.BATCH_ATTEMPTS + 1):
+            response = await self.model.generate_content_async(prompt)
+            try:
+                data = self._parse_json(response.text)
+            except ValueError as e:
+                print(f"⚠️ LLM batch answer is not JSON (attempt {attempt}): {e}")
+                continue
+            if isinstance(data, list):
+                return data
+            print(f"⚠️ LLM batch answer is not a JSON array (attempt {attempt})")
+        return None
+
+    async def categorize_many(self, requests: List[CategorizeRequest]) -> List[CategorizeResponse]:
+        """
+        Categorizes up to batch_size transactions per generate_content_async call.
+        Each answer element is validated against the taxonomy; only missing or
+        malformed elements are retried one by one with categorize(). An answer
+        that is not a JSON array is retried as a batch, then the chunk is left
+        Uncategorized.
+        """
+        results: List[Optional[CategorizeResponse]] = [None] * len(requests)
+
+        for start in range(0, len(requests), self.batch_size):
+            chunk = requests[start:start + self.batch_size]
+            start_time = time.time()
+            try:
+                data = await self._ask_batch(chunk)
+            except Exception as e:
+                # The call itself failed (quota, outage): retrying per item would only burn more requests
+                print(f"⚠️ LLM Error: {e}")
+                for i in range(len(chunk)):
+                    results[start + i] = self._failed(f"LLM Failed: {str(e)}")
+                continue
+            if data is None:
+                for i in range(len(chunk)):
+                    results[start + i] = self._failed("LLM Failed: no usable batch answer")
+                continue
+
+            answers: Dict[int, CategorizeResponse] = {}
+            for item in data:
+                index = item.get("index") if isinstance(item, dict) else None
+                if isinstance(index, int) and 0 <= index < len(chunk) and index not in answers:
+                    parsed = self._parse_batch_item(item)
+                    if parsed is not None:
+                        answers[index] = parsed
+
+            elapsed = int((time.time() - start_time) * 1000)
+            for i, request in enumerate(chunk):
+                result = answers.get(i)
+                if result is None:
+                    result = await self.categorize(request)
+                result.processing_time_ms = elapsed
+                results[start + i] = result
+
+        return results
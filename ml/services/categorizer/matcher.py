@@ -0,0 +1,82 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    keyword: str
+    category: str
+    start: int
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over the keyword map, compiled once.
+
+    find_best() walks the text a single time, whatever the number of keywords.
+    Priority when several keywords occur: longest keyword, then the category
+    listed first in `precedence`, then the leftmost occurrence.
+    """
+
+    def __init__(self, keyword_map: Dict[str, str], precedence: Sequence[str] = ()):
+        rank = {category: i for i, category in enumerate(precedence)}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Best keyword ending at each state, fail chain included: (length, category rank, keyword, category)
+        self._best: List[Optional[Tuple[int, int, str, str]]] = [None]
+
+        for keyword, category in keyword_map.items():
+            if keyword:
+                self._insert(keyword, (len(keyword), rank.get(category, len(rank)), keyword, category))
+        self._link()
+
+    def _insert(self, keyword: str, output: Tuple[int, int, str, str]):
+        state = 0
+        for char in keyword:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+            state = nxt
+        self._best[state] = output
+
+    def _link(self):
+        """BFS: failure links, then fold each state's fail-chain outputs into _best."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._best[nxt] = self._better(self._best[nxt], self._best[self._fail[nxt]])
+                queue.append(nxt)
+
+    @staticmethod
+    def _better(a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        # Longer first, then lower category rank
+        return a if (-a[0], a[1]) <= (-b[0], b[1]) else b
+
+    def find_best(self, text: str) -> Optional[KeywordMatch]:
+        goto, fail, best_at = self._goto, self._fail, self._best
+        state = 0
+        best, best_end = None, 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            candidate = best_at[state]
+            # Strictly better only: ties keep the earlier (leftmost) match
+            if candidate is not None and (best is None or (-candidate[0], candidate[1]) < (-best[0], best[1])):
+                best, best_end = candidate, i
+        if best is None:
+            return None
+        length, _, keyword, category = best
+        return KeywordMatch(keyword=keyword, category=category, start=best_end - length + 1)
@@ -0,0 +1,77 @@
+import re
+from functools import lru_cache
+
+# Raw bank descriptors seen per process; each is normalized once
+MEMO_SIZE = 65536
+
+# Payment processor / terminal prefixes: "SQ *BLUE BOTTLE", "TST* JOES", "PAYPAL *NETFLIX", "POS DEBIT ..."
+_PROCESSOR_STAR = re.compile(r"^(?:sq|tst|sp|pp|ppl|paypal|ic|zel)\s*\*\s*")
+_PROCESSOR_WORDS = re.compile(
+    r"^(?:pos(?: debit| purchase)?|debit(?: card)?(?: purchase)?|checkcard(?: \d{4})?|"
+    r"purchase authorized on \d{1,2}/\d{1,2}|recurring(?: payment)?|ach(?: debit| credit)?)\s+"
+)
+
+# Masked card numbers: "XXXX1234", "****1234", "CARD 1234", "CARD ENDING IN 1234"
+_CARD_SUFFIX = re.compile(r"(?:x{2,}|\*{2,})\d{2,4}\b|\bcard\s*(?:ending\s*(?:in\s*)?)?\d{4}\b")
+
+# US state codes. "co" is left out: "ACME PAINT CO" is far more common than a trailing "DENVER CO".
+_STATES = (
+    "al|ak|az|ar|ca|ct|de|fl|ga|hi|id|il|in|ia|ks|ky|la|me|md|ma|mi|mn|ms|mo|mt|ne|nv|nh|nj|nm|ny|"
+    "nc|nd|oh|ok|or|pa|ri|sc|sd|tn|tx|ut|vt|va|wa|wv|wi|wy|dc"
+)
+_ZIP = r"\d{5}(?:-\d{4})?"
+
+# "#1234" / "STORE 0123" store and check numbers. What follows is dropped only when it reads as
+# "<city> <ST>[ <zip>]"; anything else ("VENMO PAYMENT #123 NETFLIX") is kept.
+_STORE_NUMBER = re.compile(
+    rf"\s*(?:#|\b(?:store|str|no\.?)\s*#?)\s*\d+\b(?:(?:\s+[a-z.'-]+){{1,3}}\s+(?:{_STATES})(?:\s+{_ZIP})?$)?"
+)
+
+# "NETFLIX.COM" and "NETFLIX" are the same merchant
+_DOMAIN_SUFFIX = re.compile(r"\.(?:com|net|org)\b")
+
+# Standalone reference numbers of 3+ digits (keeps "7-eleven", "24 hour fitness")
+_LONG_NUMBER = re.compile(r"(?<![\w-])\d{3,}(?![\w-])")
+
+_SEPARATORS = re.compile(r"[*_]+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Without a store number, a trailing two-letter token is only a state when a known city precedes it
+# or a zip follows it: "HOME DEPOT IN" and "APPLE STORE PA" are merchant names, not locations.
+_CITIES = (
+    "new york|brooklyn|los angeles|san francisco|san diego|san jose|san antonio|seattle|portland|chicago|"
+    "houston|dallas|austin|fort worth|phoenix|philadelphia|boston|miami|orlando|tampa|atlanta|charlotte|"
+    "nashville|denver|las vegas|salt lake city|minneapolis|detroit|columbus|cleveland|pittsburgh|"
+    "baltimore|washington|richmond|raleigh|st louis|kansas city|oklahoma city|new orleans|sacramento|"
+    "oakland|palo alto|mountain view|santa monica|honolulu|anchorage|indianapolis|milwaukee|jersey city"
+)
+_TRAILING_LOCATION = re.compile(
+    rf"(?<=\S)\s+(?:(?:{_CITIES})\s+(?:{_STATES})(?:\s+{_ZIP})?|(?:{_STATES})\s+{_ZIP})$"
+)
+
+_EDGE_PUNCTUATION = " -.,/:;"
+
+@lru_cache(maxsize=MEMO_SIZE)
+def canonical_merchant(raw: str) -> str:
+    """
+    Canonical merchant key: "STARBUCKS #1234 SEATTLE WA" -> "starbucks",
+    "SQ *BLUE BOTTLE COFFEE" -> "blue bottle coffee", "Check #1234" -> "check".
+    Memoized per raw string.
+    """
+    text = _WHITESPACE.sub(" ", raw.lower()).strip()
+    basic = text
+
+    text = _PROCESSOR_WORDS.sub("", text, count=1)
+    text = _PROCESSOR_STAR.sub("", text, count=1)
+    text = _CARD_SUFFIX.sub(" ", text)
+    text = _STORE_NUMBER.sub(" ", text)
+    text = _DOMAIN_SUFFIX.sub("", text)
+    text = _SEPARATORS.sub(" ", text)
+    text = _WHITESPACE.sub(" ", text).strip(_EDGE_PUNCTUATION)
+    # Before long numbers go, so a trailing zip still marks the location
+    text = _TRAILING_LOCATION.sub("", text)
+    text = _LONG_NUMBER.sub(" ", text)
+    text = _WHITESPACE.sub(" ", text).strip(_EDGE_PUNCTUATION)
+
+    # Never normalize a descriptor away entirely
+    return text or basic
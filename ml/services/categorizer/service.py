@@ -1,29 +1,102 @@
 import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from ml.core.models import CategorizeRequest, CategorizeResponse
 from ml.services.categorizer.keyword import KeywordCategorizer
 from ml.services.categorizer.llm import LLMCategorizer
+from ml.services.categorizer.cache import MerchantCache
+from ml.config.settings import get_settings
 
 class CategorizerService:
-    def __init__(self):
+    def __init__(self, cache: Optional[MerchantCache] = None):
         self.keyword_model = KeywordCategorizer()
         self.llm_model = LLMCategorizer()
+        self.cache = cache or MerchantCache(redis_url=get_settings().REDIS_URL)
+
+    async def _remember(self, responses: Dict[str, CategorizeResponse], from_llm: bool):
+        # Failed LLM calls (confidence 0) are not answers; let the next request retry.
+        # Keyword hits are cheap to recompute, so they stay in this process (L1 only).
+        answers = {m: r for m, r in responses.items() if r.confidence > 0}
+        if answers:
+            await self.cache.set_many(answers, shared=from_llm)
 
     async def categorize(self, request: CategorizeRequest) -> CategorizeResponse:
         start_time = time.time()
+        merchant_key = self.cache.normalize(request.merchant)
+
+        # Step 0: Cache (canonical merchant, current taxonomy version)
+        cached = await self.cache.get(request.merchant)
+        if cached is not None:
+            cached.processing_time_ms = int((time.time() - start_time) * 1000)
+            cached.merchant_key = merchant_key
+            return cached
         
         # Step 1: Try Keyword (Fast, Cheap)
         keyword_res = await self.keyword_model.categorize(request)
+        keyword_res.merchant_key = merchant_key
         
         # If we are confident (>80%), return immediately
         if keyword_res.confidence > 0.8:
+            await self._remember({request.merchant: keyword_res}, from_llm=False)
             return keyword_res
 
         # Step 2: Try LLM (Slower, Smarter) - Only for "Misses"
         print(f"�� Invoking Gemini for: {request.merchant}")
         llm_res = await self.llm_model.categorize(request)
+        llm_res.merchant_key = merchant_key
+        await self._remember({request.merchant: llm_res}, from_llm=True)
         
         # Update total timing
         total_time = int((time.time() - start_time) * 1000)
         llm_res.processing_time_ms = total_time
         
         return llm_res
+
+    async def categorize_batch(
+        self, requests: List[CategorizeRequest]
+    ) -> AsyncIterator[Tuple[int, CategorizeResponse]]:
+        """
+        Categorizes a batch, yielding (index, result) as each result is ready.
+
+        1. Cache lookup for every distinct merchant (L1, then one Redis MGET).
+        2. Keyword pass over the rest; hits are yielded immediately.
+        3. Misses are grouped by merchant, so each distinct unknown merchant is
+           asked about once no matter how often it repeats in the batch, and the
+           distinct merchants go to the LLM batch_size per prompt.
+        """
+        cached = await self.cache.get_many(r.merchant for r in requests)
+
+        # Keyed by canonical merchant, so "STARBUCKS #1234 SEATTLE WA" and "Starbucks" are one group
+        misses: Dict[str, List[int]] = {}
+        keyword_hits: Dict[str, CategorizeResponse] = {}
+        for index, request in enumerate(requests):
+            merchant_key = self.cache.normalize(request.merchant)
+            cached_res = cached.get(merchant_key)
+            if cached_res is not None:
+                cached_res.merchant_key = merchant_key
+                yield index, cached_res
+                continue
+            keyword_res = self.keyword_model.categorize_merchant(request.merchant)
+            keyword_res.merchant_key = merchant_key
+            if keyword_res.confidence > 0.8:
+                keyword_hits[request.merchant] = keyword_res
+                yield index, keyword_res
+            else:
+                misses.setdefault(merchant_key, []).append(index)
+        await self._remember(keyword_hits, from_llm=False)
+
+        if misses:
+            print(f"🧠 Invoking Gemini for {len(misses)} distinct merchant(s)")
+        groups = list(misses.items())
+        batch_size = self.llm_model.batch_size
+        for start in range(0, len(groups), batch_size):
+            chunk = groups[start:start + batch_size]
+            llm_results = await self.llm_model.categorize_many([requests[indices[0]] for _, indices in chunk])
+            for (merchant_key, _), llm_res in zip(chunk, llm_results):
+                llm_res.merchant_key = merchant_key
+            await self._remember(
+                {requests[indices[0]].merchant: llm_res for (_, indices), llm_res in zip(chunk, llm_results)},
+                from_llm=True
+            )
+            for (_, indices), llm_res in zip(chunk, llm_results):
+                for index in indices:
+                    yield index, llm_res
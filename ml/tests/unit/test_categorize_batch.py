@@ -0,0 +1,89 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from ml.api.main import app
+from ml.api.routes import categorizer as categorizer_routes
+from ml.core.models import CategorizeResponse
+from ml.services.categorizer.cache import MerchantCache
+
+client = TestClient(app)
+
+def _tx(merchant: str) -> dict:
+    return {"merchant": merchant, "amount": 10.0, "date": "2024-01-01T10:00:00", "user_id": "test_user"}
+
+def _llm_response() -> CategorizeResponse:
+    return CategorizeResponse(
+        category="Healthcare", confidence=0.9, is_cached=False, processing_time_ms=1, reasoning="Mocked AI"
+    )
+
+def _lines(res) -> list:
+    return [json.loads(line) for line in res.text.splitlines()]
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    """Every test starts cold (and never touches a real Redis)."""
+    monkeypatch.setattr(categorizer_routes.service, "cache", MerchantCache())
+
+@pytest.fixture
+def mock_llm():
+    with patch("ml.services.categorizer.llm.LLMCategorizer.categorize_many", new_callable=AsyncMock) as mock:
+        mock.side_effect = lambda requests: [_llm_response() for _ in requests]
+        yield mock
+
+def test_batch_json_array(mock_llm):
+    payload = [_tx("Uber Trip"), _tx("Dr. Strange"), _tx("Starbucks")]
+    res = client.post("/api/v1/categorize/batch", json=payload)
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    by_index = {line["index"]: line for line in _lines(res)}
+    assert by_index[0]["category"] == "Transportation"
+    assert by_index[1]["category"] == "Healthcare"
+    assert by_index[2]["category"] == "Food"
+
+def test_keyword_hits_stream_before_llm_results(mock_llm):
+    payload = [_tx("Dr. Strange"), _tx("Uber Trip"), _tx("Starbucks")]
+    res = client.post("/api/v1/categorize/batch", json=payload)
+
+    assert [line["index"] for line in _lines(res)] == [1, 2, 0]
+
+def test_batch_ndjson_body(mock_llm):
+    body = "\n".join(json.dumps(_tx(m)) for m in ["Uber Trip", "Netflix"]) + "\n"
+    res = client.post(
+        "/api/v1/categorize/batch",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert res.status_code == 200
+    assert {line["category"] for line in _lines(res)} == {"Transportation", "Entertainment"}
+    mock_llm.assert_not_called()
+
+def test_misses_deduplicated_and_sent_in_one_prompt(mock_llm):
+    payload = [_tx("Unknown Store"), _tx("unknown store "), _tx("Dr. Strange"), _tx("Unknown Store")]
+    res = client.post("/api/v1/categorize/batch", json=payload)
+
+    assert len(_lines(res)) == 4
+    mock_llm.assert_called_once()
+    assert [r.merchant for r in mock_llm.call_args.args[0]] == ["Unknown Store", "Dr. Strange"]
+
+def test_batch_validation_error():
+    res = client.post("/api/v1/categorize/batch", json=[{"merchant": "Uber"}])
+    assert res.status_code == 422
+
+def test_batch_too_large(monkeypatch):
+    from ml.config.settings import get_settings
+    monkeypatch.setattr(get_settings(), "CATEGORIZE_BATCH_MAX_ITEMS", 1)
+
+    res = client.post("/api/v1/categorize/batch", json=[_tx("Uber"), _tx("Lyft")])
+    assert res.status_code == 413
+
+def test_second_batch_served_from_cache(mock_llm):
+    payload = [_tx("Unknown Store"), _tx("Uber Trip")]
+    client.post("/api/v1/categorize/batch", json=payload)
+
+    res = client.post("/api/v1/categorize/batch", json=payload)
+
+    assert all(line["is_cached"] for line in _lines(res))
+    mock_llm.assert_called_once()
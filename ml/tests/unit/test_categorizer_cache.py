@@ -0,0 +1,134 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+from ml.core.models import CategorizeRequest, CategorizeResponse
+from ml.services.categorizer.cache import MerchantCache
+from ml.services.categorizer.service import CategorizerService
+
+class FakeRedis:
+    """Just enough of redis.asyncio for MerchantCache (mget + pipelined set)."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.mget_calls = 0
+
+    async def mget(self, keys):
+        self.mget_calls += 1
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.ops.append((key, value, ex))
+
+    async def execute(self):
+        for key, value, ex in self.ops:
+            self.redis.data[key] = value
+            self.redis.ttls[key] = ex
+
+class BrokenRedis:
+    async def mget(self, keys):
+        raise ConnectionError("connection refused")
+
+    def pipeline(self, transaction=True):
+        raise ConnectionError("connection refused")
+
+def _request(merchant: str) -> CategorizeRequest:
+    return CategorizeRequest(merchant=merchant, amount=Decimal("10"), date=datetime.now(), user_id="u1")
+
+def _answer(category="Healthcare", confidence=0.9) -> CategorizeResponse:
+    return CategorizeResponse(category=category, confidence=confidence, is_cached=False, processing_time_ms=5, reasoning="Mocked AI")
+
+@pytest.mark.asyncio
+async def test_llm_answer_cached_and_flagged():
+    service = CategorizerService(cache=MerchantCache())
+
+    with patch("ml.services.categorizer.llm.LLMCategorizer.categorize", new_callable=AsyncMock) as mock_llm:
+        mock_llm.return_value = _answer()
+        first = await service.categorize(_request("Venmo Payment"))
+        second = await service.categorize(_request("  VENMO   payment "))
+
+    assert first.is_cached is False
+    assert second.is_cached is True
+    assert second.category == "Healthcare"
+    assert mock_llm.call_count == 1
+
+@pytest.mark.asyncio
+async def test_failed_llm_call_not_cached():
+    service = CategorizerService(cache=MerchantCache())
+
+    with patch("ml.services.categorizer.llm.LLMCategorizer.categorize", new_callable=AsyncMock) as mock_llm:
+        mock_llm.return_value = _answer("Uncategorized", 0.0)
+        await service.categorize(_request("Unknown Store"))
+        await service.categorize(_request("Unknown Store"))
+
+    assert mock_llm.call_count == 2
+
+@pytest.mark.asyncio
+async def test_redis_shares_llm_answers_between_workers():
+    redis = FakeRedis()
+    worker_a = MerchantCache(redis_client=redis, taxonomy_version="v1", ttl_seconds=60)
+    worker_b = MerchantCache(redis_client=redis, taxonomy_version="v1", ttl_seconds=60)
+
+    await worker_a.set("Venmo Payment", _answer("Savings"))
+
+    hit = await worker_b.get("venmo payment")
+    assert hit.category == "Savings" and hit.is_cached
+    assert list(redis.ttls.values()) == [60]
+
+    # Promoted into worker B's L1: no second round trip
+    await worker_b.get("venmo payment")
+    assert redis.mget_calls == 1
+
+@pytest.mark.asyncio
+async def test_keyword_hits_stay_in_process():
+    redis = FakeRedis()
+    service = CategorizerService(cache=MerchantCache(redis_client=redis))
+
+    await service.categorize(_request("Uber Trip"))
+
+    assert redis.data == {}
+    assert (await service.categorize(_request("Uber Trip"))).is_cached is True
+
+@pytest.mark.asyncio
+async def test_taxonomy_version_change_misses():
+    redis = FakeRedis()
+    await MerchantCache(redis_client=redis, taxonomy_version="v1").set("Venmo Payment", _answer())
+
+    assert await MerchantCache(redis_client=redis, taxonomy_version="v2").get("Venmo Payment") is None
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl(monkeypatch):
+    cache = MerchantCache(max_entries=2, ttl_seconds=10)
+    for merchant in ("a", "b", "c"):
+        await cache.set(merchant, _answer())
+
+    assert await cache.get("a") is None
+    assert await cache.get("c") is not None
+
+    import ml.services.categorizer.cache as cache_module
+    now = cache_module.time.monotonic()
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now + 11)
+    assert await cache.get("c") is None
+
+@pytest.mark.asyncio
+async def test_redis_outage_falls_back_to_local():
+    cache = MerchantCache(redis_client=BrokenRedis())
+
+    await cache.set("Venmo Payment", _answer())
+    assert (await cache.get("Venmo Payment")).category == "Healthcare"
+    assert await cache.get("Somewhere Else") is None
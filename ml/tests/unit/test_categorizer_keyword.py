@@ -29,3 +29,58 @@ async def test_keyword_matches():
     res = await categorizer.categorize(req)
     assert res.category == "Uncategorized"
     assert res.confidence == 0.0
+
+def _request(merchant: str) -> CategorizeRequest:
+    return CategorizeRequest(merchant=merchant, amount=Decimal("10"), date=datetime.now(), user_id="test_user")
+
+@pytest.mark.asyncio
+async def test_longest_keyword_wins():
+    categorizer = KeywordCategorizer()
+
+    # Several keywords match; the longest one decides, not insertion order
+    res = await categorizer.categorize(_request("Whole Foods Market Bar"))
+    assert res.category == "Food"
+    assert "whole foods" in res.reasoning
+
+    res = await categorizer.categorize(_request("APPLE STORE #R102 PARKING"))
+    assert res.category == "Shopping"
+
+@pytest.mark.asyncio
+async def test_category_precedence_breaks_ties():
+    categorizer = KeywordCategorizer({"pay": "Savings", "net": "Food"})
+    # Same length: Food is listed before Savings in the taxonomy
+    res = await categorizer.categorize(_request("PAYNET"))
+    assert res.category == "Food"
+
+    # "deposit" is both Savings and Income: the taxonomy order keeps Income
+    assert KeywordCategorizer().keyword_map["deposit"] == "Income"
+
+def test_matches_brute_force_reference():
+    """Same winner as checking every keyword with `in` and applying the priority rules."""
+    import random
+    categorizer = KeywordCategorizer()
+    rank = {c: i for i, c in enumerate(categorizer.precedence)}
+    keywords = list(categorizer.keyword_map)
+    rng = random.Random(7)
+
+    for _ in range(500):
+        text = " ".join(rng.choice(keywords + ["x", "inc", "#123"]) for _ in range(rng.randint(1, 4)))
+        text = text[rng.randint(0, 3):]
+        hits = [k for k in keywords if k in text]
+        expected = min(hits, key=lambda k: (-len(k), rank[categorizer.keyword_map[k]], text.index(k)), default=None)
+
+        match = categorizer.automaton.find_best(text)
+        assert (match.keyword if match else None) == expected, text
+
+@pytest.mark.asyncio
+async def test_large_dictionary():
+    aliases = {f"merchant{i:05d}": "Shopping" for i in range(50_000)}
+    aliases["uber"] = "Transportation"
+    categorizer = KeywordCategorizer(aliases)
+
+    res = await categorizer.categorize(_request("POS MERCHANT04217 NYC"))
+    assert res.category == "Shopping"
+    assert "merchant04217" in res.reasoning
+
+    res = await categorizer.categorize(_request("UBER *TRIP"))
+    assert res.category == "Transportation"
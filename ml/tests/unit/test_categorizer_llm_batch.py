@@ -0,0 +1,99 @@
+import json
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+from ml.core.models import CategorizeRequest, CategorizeResponse
+from ml.services.categorizer.llm import LLMCategorizer
+
+def _request(merchant: str) -> CategorizeRequest:
+    return CategorizeRequest(merchant=merchant, amount=Decimal("10"), date=datetime.now(), user_id="u1")
+
+def _answer(items) -> MagicMock:
+    return MagicMock(text="```json\n" + json.dumps(items) + "\n```")
+
+@pytest.fixture
+def categorizer():
+    cat = LLMCategorizer()
+    cat.model = MagicMock()
+    cat.model.generate_content_async = AsyncMock()
+    return cat
+
+@pytest.mark.asyncio
+async def test_one_prompt_per_batch(categorizer):
+    categorizer.batch_size = 3
+    requests = [_request(f"Store {i}") for i in range(5)]
+    categorizer.model.generate_content_async.side_effect = [
+        _answer([{"index": i, "category": "Shopping", "confidence": 0.8} for i in range(3)]),
+        _answer([{"index": i, "category": "Food", "confidence": 0.7} for i in range(2)]),
+    ]
+
+    results = await categorizer.categorize_many(requests)
+
+    assert categorizer.model.generate_content_async.call_count == 2
+    assert [r.category for r in results] == ["Shopping"] * 3 + ["Food"] * 2
+    categorizer.model.generate_content.assert_not_called()  # the blocking client would stall the event loop
+    assert '"Store 4"' in categorizer.model.generate_content_async.call_args.args[0]
+
+@pytest.mark.asyncio
+async def test_answers_matched_by_index_not_position(categorizer):
+    categorizer.model.generate_content_async.return_value = _answer([
+        {"index": 1, "category": "Food", "confidence": 0.9},
+        {"index": 0, "category": "Income", "confidence": 0.9},
+    ])
+
+    results = await categorizer.categorize_many([_request("Payroll Co"), _request("Cafe")])
+
+    assert [r.category for r in results] == ["Income", "Food"]
+
+@pytest.mark.asyncio
+async def test_malformed_entries_fall_back_per_item(categorizer):
+    categorizer.model.generate_content_async.return_value = _answer([
+        {"index": 0, "category": "Food", "confidence": 0.9},
+        {"index": 1, "category": "Crypto", "confidence": 0.9},   # not in the taxonomy
+        {"index": 2, "category": "Food", "confidence": 7},       # out of range
+        # index 3 missing
+    ])
+    fallback = CategorizeResponse(category="Savings", confidence=0.6, is_cached=False, processing_time_ms=0)
+
+    with patch.object(LLMCategorizer, "categorize", new_callable=AsyncMock, return_value=fallback) as single:
+        results = await categorizer.categorize_many([_request(m) for m in ["A", "B", "C", "D"]])
+
+    assert [r.category for r in results] == ["Food", "Savings", "Savings", "Savings"]
+    assert [c.args[0].merchant for c in single.call_args_list] == ["B", "C", "D"]
+
+@pytest.mark.asyncio
+async def test_non_json_answer_retries_batch_once(categorizer):
+    categorizer.model.generate_content_async.side_effect = [
+        MagicMock(text="Sorry, I can't help with that."),
+        _answer([{"index": 0, "category": "Food", "confidence": 0.9}, {"index": 1, "category": "Food", "confidence": 0.9}]),
+    ]
+
+    with patch.object(LLMCategorizer, "categorize", new_callable=AsyncMock) as single:
+        results = await categorizer.categorize_many([_request("A"), _request("B")])
+
+    assert [r.category for r in results] == ["Food", "Food"]
+    assert categorizer.model.generate_content_async.call_count == 2
+    single.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_repeated_non_json_answer_leaves_chunk_uncategorized(categorizer):
+    categorizer.model.generate_content_async.return_value = MagicMock(text="Sorry, I can't help with that.")
+
+    with patch.object(LLMCategorizer, "categorize", new_callable=AsyncMock) as single:
+        results = await categorizer.categorize_many([_request(m) for m in ["A", "B", "C"]])
+
+    assert [r.category for r in results] == ["Uncategorized"] * 3
+    assert categorizer.model.generate_content_async.call_count == LLMCategorizer.BATCH_ATTEMPTS
+    single.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_api_failure_does_not_retry_per_item(categorizer):
+    categorizer.model.generate_content_async.side_effect = RuntimeError("429 quota exceeded")
+
+    with patch.object(LLMCategorizer, "categorize", new_callable=AsyncMock) as single:
+        results = await categorizer.categorize_many([_request("A"), _request("B")])
+
+    assert [r.category for r in results] == ["Uncategorized", "Uncategorized"]
+    assert "LLM Failed" in results[0].reasoning
+    single.assert_not_called()
@@ -0,0 +1,97 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from ml.core.models import CategorizeRequest, CategorizeResponse
+from ml.services.categorizer.cache import MerchantCache
+from ml.services.categorizer.keyword import KeywordCategorizer
+from ml.services.categorizer.normalizer import canonical_merchant
+from ml.services.categorizer.service import CategorizerService
+
+@pytest.mark.parametrize("raw, expected", [
+    ("STARBUCKS #1234 SEATTLE WA", "starbucks"),
+    ("Starbucks", "starbucks"),
+    ("Check #1234", "check"),
+    ("SQ *BLUE BOTTLE COFFEE", "blue bottle coffee"),
+    ("TST* JOES PIZZA", "joes pizza"),
+    ("PAYPAL *NETFLIX.COM", "netflix"),
+    ("POS DEBIT TARGET 00012345", "target"),
+    ("AMAZON.COM XXXX4321", "amazon"),
+    ("WALGREENS STORE 0456 NEW YORK NY 10001", "walgreens"),
+    ("7-ELEVEN", "7-eleven"),
+    ("ACME PAINT CO", "acme paint co"),
+    ("STARBUCKS SEATTLE WA 98101", "starbucks"),
+    ("UBER *TRIP SAN FRANCISCO CA", "uber trip"),
+    # A two-letter tail is a state only next to a known city, a zip or a store number
+    ("HOME DEPOT IN", "home depot in"),
+    ("HOME DEPOT IN 46201", "home depot"),
+    ("APPLE STORE PA", "apple store pa"),
+    # Text after a store number is kept unless it reads as a location
+    ("VENMO PAYMENT #123 NETFLIX", "venmo payment netflix"),
+])
+def test_canonical_merchant(raw, expected):
+    assert canonical_merchant(raw) == expected
+
+@pytest.mark.parametrize("a, b", [
+    ("SUPER WALMART IN", "SUPER TARGET MN"),
+    ("APPLE STORE PA", "APPLE MUSIC OK"),
+    ("VENMO PAYMENT #123 NETFLIX", "VENMO PAYMENT #456 SPOTIFY"),
+])
+def test_different_merchants_never_share_a_key(a, b):
+    assert canonical_merchant(a) != canonical_merchant(b)
+
+def test_never_normalizes_to_empty():
+    assert canonical_merchant("  #1234  ") == "#1234"
+
+def test_memoized_per_raw_string():
+    raw = "UBER *TRIP 8291 memo-test"
+    canonical_merchant(raw)
+    hits = canonical_merchant.cache_info().hits
+
+    canonical_merchant(raw)
+
+    assert canonical_merchant.cache_info().hits == hits + 1
+
+def test_keyword_matches_through_noise():
+    res = KeywordCategorizer().categorize_merchant("SQ *STARBUCKS #1234 SEATTLE WA")
+    assert res.category == "Food"
+
+@pytest.mark.parametrize("merchant, category", [
+    ("HOME DEPOT IN", "Housing"),
+    ("SUPER WALMART IN", "Shopping"),
+    ("APPLE STORE PA", "Shopping"),
+    ("VENMO PAYMENT #123 NETFLIX", "Entertainment"),
+])
+def test_keyword_hits_survive_normalization(merchant, category):
+    assert KeywordCategorizer().categorize_merchant(merchant).category == category
+
+def test_keyword_falls_back_to_raw_string():
+    # "co #7" is a store number to the normalizer, but the keyword spans it
+    categorizer = KeywordCategorizer(keyword_map={"co #7": "Shopping"})
+    assert categorizer.categorize_merchant("ACME CO #7").category == "Shopping"
+
+def _request(merchant: str) -> CategorizeRequest:
+    return CategorizeRequest(merchant=merchant, amount=10.0, date="2024-01-01T10:00:00", user_id="test_user")
+
+def _llm_response() -> CategorizeResponse:
+    return CategorizeResponse(
+        category="Shopping", confidence=0.9, is_cached=False, processing_time_ms=1, reasoning="Mocked AI"
+    )
+
+@pytest.mark.asyncio
+async def test_variants_share_one_result():
+    service = CategorizerService(cache=MerchantCache())
+    requests = [_request("ZOOMART #0042 AUSTIN TX"), _request("POS DEBIT ZOOMART 0099"), _request("Zoomart")]
+
+    with patch("ml.services.categorizer.llm.LLMCategorizer.categorize_many", new_callable=AsyncMock) as mock:
+        mock.side_effect = lambda reqs: [_llm_response() for _ in reqs]
+        results = dict([item async for item in service.categorize_batch(requests)])
+
+    mock.assert_called_once()
+    assert [r.merchant for r in mock.call_args.args[0]] == ["ZOOMART #0042 AUSTIN TX"]
+    assert {results[i].merchant_key for i in range(3)} == {"zoomart"}
+
+    with patch("ml.services.categorizer.llm.LLMCategorizer.categorize", new_callable=AsyncMock) as single:
+        res = await service.categorize(_request("ZOOMART STORE 7 DALLAS TX"))
+
+    single.assert_not_called()
+    assert res.is_cached
+    assert res.merchant_key == "zoomart"